@@ -0,0 +1,68 @@
+"""
+命令行工具（flask <命令>）
+"""
+import click
+from flask import current_app
+
+
+@click.command('import-books')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'jsonl']),
+              help='文件格式，默认按扩展名识别')
+@click.option('--batch-size', type=int, help='每批写入的行数，默认取 IMPORT_BATCH_SIZE 配置')
+def import_books_command(path, file_format, batch_size):
+    """从 CSV / JSONL 文件批量导入图书"""
+    from app.utils.book_import import detect_format, import_books
+
+    file_format = file_format or detect_format(path)
+    if file_format is None:
+        raise click.BadParameter('无法根据扩展名识别文件格式，请使用 --format 指定', param_hint='PATH')
+
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        report = import_books(stream, file_format,
+                              batch_size=batch_size or current_app.config['IMPORT_BATCH_SIZE'])
+
+    click.echo(f"共 {report.total} 行：导入 {report.imported}，重复 {report.duplicates}，失败 {report.failed}")
+    click.echo(f"耗时 {report.elapsed:.2f} 秒，{report.rows_per_second:.0f} 行/秒")
+    for line_number, message in report.errors:
+        click.echo(f"  第 {line_number} 行：{message}", err=True)
+    if len(report.errors) < report.duplicates + report.failed:
+        click.echo(f"  ……其余 {report.duplicates + report.failed - len(report.errors)} 条未列出", err=True)
+
+
+@click.command('seed')
+@click.option('--check', is_flag=True, help='只检查默认数据是否为最新，不写入（未初始化时退出码为1）')
+def seed_command(check):
+    """创建数据表并写入默认管理员、读者、分类与图书（可重复执行）"""
+    from app.utils.seed import is_seeded, seed_database
+
+    if check:
+        seeded = is_seeded()
+        click.echo('默认数据已是最新' if seeded else '默认数据尚未初始化或已有更新')
+        raise SystemExit(0 if seeded else 1)
+
+    counts = seed_database()
+    click.echo(f"新增管理员 {counts['admins']}，读者 {counts['users']}，"
+               f"分类 {counts['categories']}，图书 {counts['books']}")
+
+
+@click.command('sync-replica')
+def sync_replica_command():
+    """把 SQLite 主库完整复制到 DATABASE_REPLICA_URL 指定的副本文件（本地模拟只读副本）"""
+    from app import db
+    from app.utils.db_routing import REPLICA_BIND, sync_sqlite_replica
+
+    replica = db.engines.get(REPLICA_BIND)
+    if replica is None:
+        raise click.UsageError('未配置只读副本，请设置 DATABASE_REPLICA_URL')
+    if db.engine.dialect.name != 'sqlite' or replica.dialect.name != 'sqlite':
+        raise click.UsageError('只支持 SQLite 主库与副本；服务器数据库请使用数据库自身的复制')
+    pages = sync_sqlite_replica(db.engine, replica)
+    click.echo(f"已复制 {pages} 页到 {replica.url.database}")
+
+
+def register_commands(app):
+    """注册命令行工具"""
+    app.cli.add_command(import_books_command)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(sync_replica_command)
@@ -4,6 +4,9 @@ from .book import Book
 from .category import Category
 from .borrow_record import BorrowRecord
 from .favorite import Favorite
+from .book_search_key import BookSearchKey
+from .category_closure import CategoryClosure
+from .app_meta import AppMeta
 
 __all__ = [
     'User',
@@ -12,5 +15,8 @@ __all__ = [
     'Category',
     'BorrowRecord',
     'Favorite',
+    'BookSearchKey',
+    'CategoryClosure',
+    'AppMeta',
 ]
 
@@ -1,7 +1,7 @@
 import pytz
-from werkzeug.security import generate_password_hash, check_password_hash
 
 from app import db
+from app.utils.passwords import password_hasher
 from datetime import datetime
 
 class Admin(db.Model):
@@ -34,11 +34,15 @@ class Admin(db.Model):
     @password.setter
     def password(self, password):
         """密码属性设置器"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def verify_password(self, password):
-        """验证密码"""
-        return check_password_hash(self.password_hash, password)
+        """验证密码，通过且哈希已过时时按当前配置重新哈希（由调用方提交）"""
+        if not password_hasher.verify(self.password_hash, password):
+            return False
+        if password_hasher.needs_rehash(self.password_hash):
+            self.password = password
+        return True
 
     # ========== 业务方法 ==========
     def is_super_admin(self):
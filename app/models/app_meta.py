@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from app import db
+
+
+class AppMeta(db.Model):
+    """
+    应用元数据模型
+    保存少量键值形式的系统状态，如默认数据的指纹
+    """
+    __tablename__ = 'app_meta'  # 数据库表名
+
+    # ========== 字段定义 ==========
+    key = db.Column(db.String(50), primary_key=True, comment='键')
+    value = db.Column(db.String(255), nullable=False, comment='值')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment='更新时间')
+
+    def __repr__(self):
+        """对象字符串表示"""
+        return f'<AppMeta {self.key}={self.value}>'
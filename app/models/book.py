@@ -1,4 +1,6 @@
 import pytz
+from sqlalchemy import and_
+from sqlalchemy.ext.hybrid import hybrid_property
 
 from app import db
 from datetime import datetime
@@ -49,8 +51,12 @@ class Book(db.Model):
                                      lazy='dynamic', cascade='all, delete-orphan'
                                      )
 
+    # ========== 检索结果附加值 ==========
+    # 检索相关度（BM25 得分，越小越相关），不是映射列：按相关度检索时由 search_page 从结果行中的得分列赋值，其余情况为None
+    search_rank = None
+
     # ========== 计算属性 ==========
-    @property
+    @hybrid_property
     def is_available(self):
         """
         检查图书是否可借
@@ -58,6 +64,11 @@ class Book(db.Model):
         """
         return self.status == 1 and self.available_copies > 0
 
+    @is_available.expression
+    def is_available(cls):
+        """可借条件的SQL表达式，用于查询筛选和分组统计"""
+        return and_(cls.status == 1, cls.available_copies > 0)
+
     @property
     def borrowed_count(self):
         """
@@ -143,6 +154,37 @@ class Book(db.Model):
         """
         return [record.user for record in self.favorited_by_records.filter_by(is_active=True).all()]
 
+    @classmethod
+    def find_by_isbn(cls, isbn):
+        """
+        按ISBN精确查找图书（走 isbn 唯一索引）
+        ISBN-10、ISBN-13 及带连字符的写法均可匹配
+        :param isbn: ISBN字符串
+        :return: 图书对象，不存在时返回None
+        """
+        from app.utils.isbn import isbn_lookup_values
+        values = isbn_lookup_values(isbn) or [isbn.strip()]
+        return cls.query.filter(cls.isbn.in_(values)).first()
+
+    def to_dict(self):
+        """
+        转换为字典格式，便于API返回
+        :return: 字典格式的图书信息
+        """
+        return {
+            'id': self.id,
+            'isbn': self.isbn,
+            'title': self.title,
+            'author': self.author,
+            'publisher': self.publisher,
+            'cover_image': self.cover_image,
+            'category_id': self.category_id,
+            'total_copies': self.total_copies,
+            'available_copies': self.available_copies,
+            'status': self.status,
+            'is_available': self.is_available
+        }
+
     def __repr__(self):
         """对象字符串表示"""
         return f'<Book id:{self.id}, title:{self.title}, isbn:{self.isbn}>'
\ No newline at end of file
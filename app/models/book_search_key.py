@@ -0,0 +1,26 @@
+from app import db
+
+
+class BookSearchKey(db.Model):
+    """
+    图书检索键表模型
+    预先计算的书名、作者检索键（汉字二元组、全拼、拼音首字母），用于拼音检索和索引探测
+    """
+    __tablename__ = 'book_search_keys'  # 数据库表名
+
+    # ========== 字段定义 ==========
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='检索键ID，主键，自增长')
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id'),
+                        nullable=False, index=True, comment='图书ID')
+    key = db.Column(db.String(100), nullable=False, comment='检索键')
+    kind = db.Column(db.String(10), nullable=False, comment='类型：bigram-汉字二元组，pinyin-全拼，initials-拼音首字母')
+
+    # ========== 表级约束 ==========
+    # 复合索引：按检索键前缀做范围探测后直接取出图书ID
+    __table_args__ = (
+        db.Index('ix_book_search_keys_key_book', 'key', 'book_id'),
+    )
+
+    def __repr__(self):
+        """对象字符串表示"""
+        return f'<BookSearchKey book:{self.book_id}, key:{self.key}, kind:{self.kind}>'
@@ -153,6 +153,55 @@ class BorrowRecord(db.Model):
         }
         return status_map.get(self.status, '未知状态')
 
+    # ========== 批量查询 ==========
+    @classmethod
+    def count_by_status(cls):
+        """
+        一次分组统计各状态的借阅记录数量
+        :return: {状态: 数量}，没有记录的状态不出现在字典中
+        """
+        rows = db.session.query(cls.status, db.func.count(cls.id)).group_by(cls.status).all()
+        return {status: count for status, count in rows}
+
+    @classmethod
+    def get_borrow_status_map(cls, user_id, book_ids):
+        """
+        批量获取用户对一组图书的借阅状态，一次查询得出
+        同一本书同时存在借阅请求和借阅中记录时以借阅请求（审核中）为准
+        :param user_id: 用户ID
+        :param book_ids: 图书ID列表（通常为当前页的图书）
+        :return: {图书ID: 状态}，状态取值 3-借阅请求审核中、0-借阅中，无相关记录的图书不出现在字典中
+        """
+        if not book_ids:
+            return {}
+        rows = db.session.query(cls.book_id, cls.status).filter(
+            cls.user_id == user_id,
+            cls.book_id.in_(list(book_ids)),
+            cls.status.in_([0, 3])
+        ).distinct().all()
+        status_map = {}
+        for book_id, status in rows:
+            if status_map.get(book_id) != 3:
+                status_map[book_id] = status
+        return status_map
+
+    @classmethod
+    def get_request_queue(cls, status=3, cursor=None, per_page=20):
+        """
+        获取待处理的请求队列（按提交先后游标分页）
+        用户和图书随记录一次联结加载，渲染时不再逐条查询
+        :param status: 记录状态，默认3-借阅图书请求
+        :param cursor: 上一页返回的游标，None表示第一页
+        :param per_page: 每页数量
+        :return: KeysetPage 对象
+        """
+        from app.utils.pagination import keyset_paginate
+        query = cls.query.filter_by(status=status).options(
+            db.joinedload(cls.user),
+            db.joinedload(cls.book)
+        )
+        return keyset_paginate(query, (cls.id,), cursor=cursor, per_page=per_page)
+
     def __repr__(self):
         """对象字符串表示"""
         return f'<BorrowRecord id:{self.id}, user:{self.user_id}, book:{self.book_id}, status:{self.status}>'
\ No newline at end of file
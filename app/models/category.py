@@ -34,24 +34,30 @@ class Category(db.Model):
     # ========== 业务方法 ==========
     def get_all_children(self):
         """
-        递归获取所有子分类（包括孙子分类等）
+        获取所有子分类（包括孙子分类等），通过闭包表一次查询得出
         :return: 所有子分类ID列表
         """
-        children_ids = []
-        for child in self.children:
-            children_ids.append(child.id)
-            children_ids.extend(child.get_all_children())
-        return children_ids
+        from app.models.category_closure import CategoryClosure
+        rows = db.session.query(CategoryClosure.descendant_id).filter(
+            CategoryClosure.ancestor_id == self.id,
+            CategoryClosure.depth > 0
+        ).order_by(CategoryClosure.depth, CategoryClosure.descendant_id).all()
+        return [row.descendant_id for row in rows]
+
+    def get_path(self):
+        """
+        获取从顶级分类到本分类的分类列表（面包屑），通过闭包表一次查询得出
+        :return: 分类对象列表
+        """
+        from app.utils.category_tree import category_path
+        return category_path(self.id)
 
     def get_full_path(self):
         """
         获取分类的完整路径（如：计算机科学/编程语言/Python）
         :return: 分类路径字符串
         """
-        if self.parent_id == 0:
-            return self.name
-        parent = Category.query.get(self.parent_id)
-        return f"{parent.get_full_path()}/{self.name}"
+        return '/'.join(category.name for category in self.get_path())
 
     def is_root(self):
         """检查是否是顶级分类"""
@@ -0,0 +1,28 @@
+from app import db
+
+
+class CategoryClosure(db.Model):
+    """
+    分类闭包表模型
+    存储每个分类与其所有祖先（含自身）之间的关系，
+    子树筛选和分类路径查询都只需一次索引查找，无需逐层递归
+    """
+    __tablename__ = 'category_closure'  # 数据库表名
+
+    # ========== 字段定义 ==========
+    ancestor_id = db.Column(db.Integer, db.ForeignKey('categories.id'),
+                            primary_key=True, comment='祖先分类ID')
+    descendant_id = db.Column(db.Integer, db.ForeignKey('categories.id'),
+                              primary_key=True, comment='后代分类ID')
+    depth = db.Column(db.Integer, nullable=False, default=0, comment='层级距离：0表示自身，1表示直接子分类')
+
+    # ========== 表级约束 ==========
+    # 主键 (ancestor_id, descendant_id) 用于子树筛选；
+    # 复合索引 (descendant_id, depth) 用于按层级取出祖先路径
+    __table_args__ = (
+        db.Index('ix_category_closure_descendant_depth', 'descendant_id', 'depth'),
+    )
+
+    def __repr__(self):
+        """对象字符串表示"""
+        return f'<CategoryClosure ancestor:{self.ancestor_id}, descendant:{self.descendant_id}, depth:{self.depth}>'
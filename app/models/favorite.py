@@ -109,6 +109,23 @@ class Favorite(db.Model):
             is_active=True
         ).first()
 
+    @classmethod
+    def get_favorited_book_ids(cls, user_id, book_ids):
+        """
+        批量检查用户收藏了哪些图书（一次查询）
+        :param user_id: 用户ID
+        :param book_ids: 图书ID列表
+        :return: 已收藏的图书ID集合
+        """
+        if not book_ids:
+            return set()
+        rows = db.session.query(cls.book_id).filter(
+            cls.user_id == user_id,
+            cls.book_id.in_(book_ids),
+            cls.is_active == True
+        ).all()
+        return {row.book_id for row in rows}
+
     @classmethod
     def add_favorite(cls, user_id, book_id, note=None):
         """
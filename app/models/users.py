@@ -6,11 +6,11 @@ from datetime import datetime
 
 import pytz
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
 
 from app.models.book import Book
 from app.models.borrow_record import BorrowRecord
 from app import db
+from app.utils.passwords import password_hasher
 
 class User(db.Model):
     """
@@ -131,15 +131,20 @@ class User(db.Model):
         密码属性设置器
         自动对密码进行哈希加密
         """
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def verify_password(self, password):
         """
         验证密码
+        验证通过且哈希的算法或强度与当前配置不同时，按当前配置重新哈希（由调用方提交）
         :param password: 待验证的明文密码
         :return: 验证结果 True/False
         """
-        return check_password_hash(self.password_hash, password)
+        if not password_hasher.verify(self.password_hash, password):
+            return False
+        if password_hasher.needs_rehash(self.password_hash):
+            self.password = password
+        return True
 
     # ========== 业务方法 ==========
     def get_active_borrows(self):
@@ -161,6 +166,33 @@ class User(db.Model):
                 return True
         return False
 
+    @classmethod
+    def get_borrow_summaries(cls, user_ids):
+        """
+        批量统计用户的借阅情况，一次分组查询得出
+        :param user_ids: 用户ID列表（通常为当前页的用户）
+        :return: {用户ID: {'active': 在借数量, 'overdue': 逾期数量, 'pending': 待审核数量}}，
+                 统计口径与 get_active_borrows、has_overdue_books 一致
+        """
+        summaries = {user_id: {'active': 0, 'overdue': 0, 'pending': 0} for user_id in user_ids}
+        if not summaries:
+            return summaries
+        now = datetime.utcnow()
+        rows = db.session.query(
+            BorrowRecord.user_id,
+            db.func.count(BorrowRecord.id),
+            db.func.sum(db.case((db.and_(BorrowRecord.status == 0,
+                                         BorrowRecord.return_date.is_(None),
+                                         BorrowRecord.due_date < now), 1), else_=0)),
+            db.func.sum(db.case((BorrowRecord.status == 3, 1), else_=0))
+        ).filter(
+            BorrowRecord.user_id.in_(list(summaries)),
+            BorrowRecord.status.in_([0, 3, 4])
+        ).group_by(BorrowRecord.user_id).all()
+        for user_id, active, overdue, pending in rows:
+            summaries[user_id] = {'active': active, 'overdue': overdue or 0, 'pending': pending or 0}
+        return summaries
+
     def get_borrow_history(self):
         """
         获取用户的借阅历史
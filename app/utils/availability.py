@@ -0,0 +1,182 @@
+"""
+用户名 / 邮箱可用性检查
+进程内指纹过滤器保存全部已注册的用户名与邮箱的64位散列指纹（有序数组，每个值8字节）：
+指纹不存在时该值一定未被注册，直接返回可用；
+指纹存在（已注册，或极小概率的散列冲突）时才按唯一索引查询数据库确认，输入过程中的大多数检查不访问数据库。
+启动时全量构建，读者新增或修改用户名、邮箱时同步加入；
+不删除指纹，删除读者或修改前的旧值只会造成误判，由数据库查询纠正。
+其他进程中的注册最多延迟 rebuild_seconds 秒可见（到期后下一次检查时重建），
+注册表单提交时的校验仍以数据库为准。
+检查接口无需登录，按客户端IP限制频率（availability_limiter），避免被用来批量探测已注册的用户名与邮箱
+"""
+import time
+from array import array
+from bisect import bisect_left
+from itertools import repeat
+from threading import Lock
+
+from sqlalchemy import event, inspect, select
+
+from app import db
+from app.models import User
+from app.utils.db_routing import primary_reads
+from app.utils.rate_limit import RateLimiter
+
+# 参与检查的字段
+FIELDS = ('username', 'email')
+
+
+def fingerprint(field, value):
+    """值的指纹（进程内 hash()，不持久化，无需跨进程稳定）"""
+    return hash((field, value))
+
+
+class FingerprintFilter:
+    """
+    已注册用户名 / 邮箱的指纹过滤器及命中统计
+    """
+
+    def __init__(self, rebuild_seconds=600):
+        self.rebuild_seconds = rebuild_seconds
+        self._fingerprints = None
+        self._built_at = 0
+        self._pending = None
+        self._lock = Lock()
+        self._build_lock = Lock()
+        self.checks = 0
+        self.database_checks = 0
+        self.false_positives = 0
+
+    def __len__(self):
+        return len(self._fingerprints or ())
+
+    @property
+    def built(self):
+        return self._fingerprints is not None
+
+    def configure(self, rebuild_seconds=None):
+        """根据配置调整重建间隔"""
+        if rebuild_seconds is not None:
+            self.rebuild_seconds = rebuild_seconds
+
+    def stale(self):
+        """尚未构建或超过重建间隔时需要重建"""
+        if self._fingerprints is None:
+            return True
+        return bool(self.rebuild_seconds) and time.monotonic() - self._built_at > self.rebuild_seconds
+
+    def begin_build(self):
+        """开始全量构建：此后加入的值先记下，构建完成后重放，避免读取数据库之后的注册被遗漏"""
+        with self._lock:
+            self._pending = []
+
+    def build(self, rows):
+        """
+        全量构建（构建完成后再替换，构建期间的检查仍使用旧数据）
+        :param rows: (用户名, 邮箱) 列表
+        """
+        fingerprints = []
+        for index, field in enumerate(FIELDS):
+            fingerprints.extend(map(hash, zip(repeat(field), (row[index] for row in rows))))
+        with self._lock:
+            fingerprints.extend(fingerprint(field, value) for field, value in self._pending or ())
+            self._fingerprints = array('q', sorted(set(fingerprints)))
+            self._pending = None
+            self._built_at = time.monotonic()
+
+    def add(self, field, value):
+        """加入一个已注册的值；尚未构建时忽略（构建时会从数据库读取）"""
+        if not value:
+            return
+        key = fingerprint(field, value)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((field, value))
+            fingerprints = self._fingerprints
+            if fingerprints is not None:
+                position = bisect_left(fingerprints, key)
+                if position == len(fingerprints) or fingerprints[position] != key:
+                    fingerprints.insert(position, key)
+
+    def might_exist(self, field, value):
+        """是否可能已存在；False 表示一定不存在"""
+        key = fingerprint(field, value)
+        with self._lock:
+            self.checks += 1
+            fingerprints = self._fingerprints
+            position = bisect_left(fingerprints, key)
+            return position < len(fingerprints) and fingerprints[position] == key
+
+
+availability_filter = FingerprintFilter()
+availability_limiter = RateLimiter()
+
+
+def _build():
+    availability_filter.begin_build()
+    with primary_reads():
+        rows = db.session.execute(select(User.username, User.email)).all()
+    availability_filter.build(rows)
+    return len(rows)
+
+
+def build_availability_filter():
+    """
+    从数据库全量构建过滤器（只查询用户名与邮箱两列）
+    需在应用上下文中调用
+    :return: 读者数量
+    """
+    with availability_filter._build_lock:
+        return _build()
+
+
+def ensure_availability_filter():
+    """
+    过滤器尚未构建或到期时重建；其他请求正在重建时不等待，继续使用旧数据
+    需在应用上下文中调用
+    """
+    if availability_filter.stale() and availability_filter._build_lock.acquire(blocking=False):
+        try:
+            _build()
+        finally:
+            availability_filter._build_lock.release()
+
+
+def is_available(field, value):
+    """
+    用户名或邮箱是否可用（未被注册）
+    过滤器判定不存在时直接返回，可能存在时按唯一索引查询确认
+    需在应用上下文中调用
+    :param field: 'username' 或 'email'
+    :param value: 待检查的值
+    :return: True/False
+    """
+    if field not in FIELDS:
+        raise ValueError(f'不支持检查的字段: {field}')
+    ensure_availability_filter()
+    if availability_filter.built and not availability_filter.might_exist(field, value):
+        return True
+
+    availability_filter.database_checks += 1
+    exists = db.session.execute(
+        select(User.id).where(getattr(User, field) == value).limit(1)
+    ).first() is not None
+    if not exists:
+        availability_filter.false_positives += 1
+    return not exists
+
+
+# ========== 新注册与修改同步加入 ==========
+# 在刷新时加入而不是提交后：事务回滚时多出的值只造成误判，由数据库查询纠正，已提交的值不会漏掉
+@event.listens_for(User, 'after_insert')
+def _add_registered(mapper, connection, target):
+    for field in FIELDS:
+        availability_filter.add(field, getattr(target, field))
+
+
+@event.listens_for(User, 'after_update')
+def _add_changed(mapper, connection, target):
+    state = inspect(target)
+    for field in FIELDS:
+        if state.attrs[field].history.has_changes():
+            availability_filter.add(field, getattr(target, field))
@@ -0,0 +1,250 @@
+"""
+图书批量导入
+逐行流式读取 CSV / JSONL 文件，按 BookForm 的规则校验每一行，
+分类名称一次性解析为ID，ISBN 与内存中的已有ISBN集合去重，
+校验通过的行按批次 executemany 写入，并同步全文索引、检索键与目录变更通知
+"""
+import csv
+import io
+import json
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import insert, select
+from werkzeug.datastructures import MultiDict
+
+from app import db
+from app.forms import BookForm
+from app.models import Book, Category
+from app.utils import search_index, search_keys
+from app.utils.catalog_events import notify_catalog_change
+from app.utils.isbn import isbn_lookup_values
+
+# 支持的文件格式（按扩展名识别）
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+# 参与校验和写入的字段（对应 BookForm 字段）
+IMPORT_FIELDS = ('title', 'author', 'isbn', 'publisher', 'publish_date', 'edition', 'language',
+                 'pages', 'price', 'category_id', 'total_copies', 'available_copies', 'status',
+                 'description')
+
+# 报告中最多保留的行级错误条数（错误总数仍完整统计）
+MAX_REPORTED_ERRORS = 1000
+
+
+def detect_format(filename):
+    """
+    根据文件扩展名识别导入格式
+    :param filename: 文件名
+    :return: 'csv' / 'jsonl'，无法识别时返回None
+    """
+    extension = (filename or '').rsplit('.', 1)[-1].lower()
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if extension == 'csv':
+        return 'csv'
+    return None
+
+
+def iter_records(stream, file_format):
+    """
+    逐行读取导入文件
+    :param stream: 文本流
+    :param file_format: 'csv' 或 'jsonl'
+    :return: 生成器，产出 (行号, 记录字典 或 错误信息字符串)
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, f'JSON格式错误: {e}'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, 'JSON行必须是对象'
+            continue
+        yield line_number, record
+
+
+class ImportReport:
+    """
+    导入结果报告
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        """导入吞吐量（每秒处理的行数）"""
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add_error(self, line_number, message):
+        """记录一条校验失败的行级错误"""
+        self.failed += 1
+        self._append(line_number, message)
+
+    def add_duplicate(self, line_number, isbn):
+        """记录一条因ISBN重复而跳过的行"""
+        self.duplicates += 1
+        self._append(line_number, f'ISBN已存在: {isbn}')
+
+    def _append(self, line_number, message):
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_number, message))
+
+    def to_dict(self):
+        """转换为字典格式，便于API返回"""
+        return {
+            'total': self.total,
+            'imported': self.imported,
+            'duplicates': self.duplicates,
+            'failed': self.failed,
+            'elapsed': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'errors': [{'line': line, 'message': message} for line, message in self.errors],
+        }
+
+
+class BookImporter:
+    """
+    图书批量导入器
+    分类名称与已有ISBN在开始时各用一次查询载入内存，之后逐行校验、按批次写入
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.category_ids = {}
+        self.valid_category_ids = set()
+        self.existing_isbns = set()
+        self._batch = []
+        self._form = None
+
+    def _load_lookups(self):
+        categories = db.session.execute(select(Category.id, Category.name)).all()
+        self.category_ids = {name: category_id for category_id, name in categories}
+        self.valid_category_ids = set(self.category_ids.values())
+        self.existing_isbns = set()
+        for (isbn,) in db.session.execute(select(Book.isbn)):
+            self.existing_isbns.update(isbn_lookup_values(isbn) or [isbn])
+
+    def _resolve_category(self, record):
+        """分类可用名称（category）或ID（category_id）指定"""
+        name = str(record.get('category') or '').strip()
+        if name:
+            return self.category_ids.get(name)
+        category_id = str(record.get('category_id') or '').strip()
+        return int(category_id) if category_id.isdigit() else None
+
+    def _validate(self, record):
+        """
+        按 BookForm 规则校验一行
+        :return: (写入用的字段字典, None) 或 (None, 错误信息)
+        """
+        category_id = self._resolve_category(record)
+        if category_id not in self.valid_category_ids:
+            return None, f"分类不存在: {record.get('category') or record.get('category_id') or '(空)'}"
+
+        formdata = MultiDict()
+        for field in IMPORT_FIELDS:
+            value = record.get(field)
+            if value is not None and value != '':
+                formdata[field] = str(value).strip()
+        formdata['category_id'] = str(category_id)
+        # 未提供可用副本数时与总副本数一致
+        formdata.setdefault('available_copies', formdata.get('total_copies', '1'))
+        formdata.setdefault('total_copies', '1')
+
+        # 表单对象只构造一次，逐行重新载入数据后校验
+        if self._form is None:
+            self._form = BookForm(formdata=None, meta={'csrf': False})
+        form = self._form
+        form.process(formdata)
+        form.category_id.choices = [(category_id, '')]
+        if not form.validate():
+            messages = [f'{form[name].label.text.lstrip("*")}: {errors[0]}'
+                        for name, errors in form.errors.items()]
+            return None, '；'.join(messages)
+
+        values = {field: form[field].data for field in IMPORT_FIELDS}
+        if values['available_copies'] > values['total_copies']:
+            return None, '可用副本数不能大于总副本数'
+        return values, None
+
+    def _flush(self, report):
+        if not self._batch:
+            return
+        result = db.session.execute(
+            insert(Book.__table__).returning(Book.id, sort_by_parameter_order=True), self._batch
+        )
+        books = [SimpleNamespace(id=book_id, **values)
+                 for book_id, values in zip(result.scalars(), self._batch)]
+        # executemany 不触发ORM映射事件，派生数据在同一事务内手动维护
+        search_index.index_books(books)
+        search_keys.add_search_keys(books)
+        db.session.commit()
+        notify_catalog_change([('insert', book.id, vars(book)) for book in books])
+        report.imported += len(books)
+        self._batch = []
+
+    def run(self, records):
+        """
+        执行导入
+        :param records: iter_records 产出的 (行号, 记录) 序列
+        :return: ImportReport 对象
+        """
+        report = ImportReport()
+        started = time.perf_counter()
+        self._load_lookups()
+        for line_number, record in records:
+            report.total += 1
+            if isinstance(record, str):
+                report.add_error(line_number, record)
+                continue
+
+            values, error = self._validate(record)
+            if error:
+                report.add_error(line_number, error)
+                continue
+
+            isbn_values = isbn_lookup_values(values['isbn']) or [values['isbn']]
+            if self.existing_isbns.intersection(isbn_values):
+                report.add_duplicate(line_number, values['isbn'])
+                continue
+            self.existing_isbns.update(isbn_values)
+
+            self._batch.append(values)
+            if len(self._batch) >= self.batch_size:
+                self._flush(report)
+        self._flush(report)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+
+def import_books(stream, file_format, batch_size=1000):
+    """
+    从文件流导入图书
+    需在应用上下文中调用
+    :param stream: 文本流或二进制流（二进制流按 UTF-8 解码，兼容BOM）
+    :param file_format: 'csv' 或 'jsonl'
+    :param batch_size: 每批写入的行数
+    :return: ImportReport 对象
+    """
+    if file_format not in IMPORT_FORMATS:
+        raise ValueError(f'不支持的导入格式: {file_format}')
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    return BookImporter(batch_size=batch_size).run(iter_records(stream, file_format))
@@ -0,0 +1,102 @@
+"""
+图书目录变更通知
+Book 的新增、修改、删除以及分类层级的调整在事务提交后递增目录版本号，并通知已注册的监听函数
+（检索结果缓存等依赖目录内容的进程内数据据此失效或增量更新）
+"""
+from threading import Lock
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.models.book import Book
+from app.models.category import Category
+
+_SESSION_KEY = 'catalog_changes'
+
+_version = 0
+_version_lock = Lock()
+_listeners = []
+
+
+def catalog_version():
+    """获取当前目录版本号"""
+    return _version
+
+
+def on_catalog_change(func):
+    """
+    注册目录变更监听函数（可作装饰器使用）
+    监听函数在事务提交后调用，参数为变更列表 [(操作, 图书ID, 字段值), ...]，
+    操作取值 'insert' / 'update' / 'delete'，字段值为刷新到数据库时 Book 各列的取值字典；
+    仅分类层级变化（图书本身未变）时变更列表为空
+    """
+    _listeners.append(func)
+    return func
+
+
+def notify_catalog_change(changes):
+    """
+    递增目录版本号并通知监听函数
+    批量写入等绕过ORM映射事件的操作需手动调用
+    :param changes: 变更列表 [(操作, 图书ID, 字段值), ...]
+    """
+    global _version
+    with _version_lock:
+        _version += 1
+    for listener in _listeners:
+        listener(changes)
+
+
+# ========== 收集本事务内的变更 ==========
+def _record(mapper, target, operation):
+    # 提交后对象会过期，这里先记录已加载的各列取值，监听函数无需再查询数据库
+    session = object_session(target)
+    if session is not None:
+        values = {attr.key: target.__dict__.get(attr.key) for attr in mapper.column_attrs}
+        session.info.setdefault(_SESSION_KEY, []).append((operation, target.id, values))
+
+
+@event.listens_for(Book, 'after_insert')
+def _record_insert(mapper, connection, target):
+    _record(mapper, target, 'insert')
+
+
+@event.listens_for(Book, 'after_update')
+def _record_update(mapper, connection, target):
+    _record(mapper, target, 'update')
+
+
+@event.listens_for(Book, 'after_delete')
+def _record_delete(mapper, connection, target):
+    _record(mapper, target, 'delete')
+
+
+def _mark_changed(target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_SESSION_KEY, [])
+
+
+# 分类移动或删除会改变子树筛选的结果，只需递增版本号，不产生图书变更
+@event.listens_for(Category, 'after_update')
+def _record_category_move(mapper, connection, target):
+    if inspect(target).attrs.parent_id.history.has_changes():
+        _mark_changed(target)
+
+
+@event.listens_for(Category, 'after_delete')
+def _record_category_delete(mapper, connection, target):
+    _mark_changed(target)
+
+
+# ========== 事务结束时发布或丢弃 ==========
+@event.listens_for(Session, 'after_commit')
+def _publish_changes(session):
+    changes = session.info.pop(_SESSION_KEY, None)
+    if changes is not None:
+        notify_catalog_change(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop(_SESSION_KEY, None)
@@ -0,0 +1,161 @@
+"""
+分类层级（闭包表）
+category_closure 表为每个分类记录其所有祖先（含自身，depth=0），随分类的新增、移动、删除同步维护：
+    - 子树筛选：ancestor_id = 分类ID 即可取出整棵子树，走主键索引
+    - 分类路径：descendant_id = 分类ID 按 depth 倒序即为从根到自身的路径
+"""
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.models.book import Book
+from app.models.category import Category
+from app.models.category_closure import CategoryClosure
+
+
+# ========== 初始化与重建 ==========
+def _closure_rows(parents):
+    """
+    由 {分类ID: 父分类ID} 计算闭包表的全部行
+    父分类不存在（顶级分类的 parent_id 为0或空）时停止向上查找，遇到环时截断
+    """
+    rows = []
+    for category_id in parents:
+        ancestor_id, depth, seen = category_id, 0, set()
+        while ancestor_id in parents and ancestor_id not in seen:
+            seen.add(ancestor_id)
+            rows.append({'ancestor_id': ancestor_id, 'descendant_id': category_id, 'depth': depth})
+            ancestor_id, depth = parents[ancestor_id], depth + 1
+    return rows
+
+
+def init_category_closure():
+    """
+    闭包表为空而分类表不为空时（如首次升级）全量生成
+    需在应用上下文中调用
+    """
+    has_rows = db.session.execute(select(CategoryClosure.ancestor_id).limit(1)).first()
+    if has_rows is None and db.session.query(func.count(Category.id)).scalar():
+        rebuild_category_closure()
+
+
+def rebuild_category_closure(commit=True):
+    """
+    清空并重建分类闭包表
+    :param commit: 是否立即提交（在外层事务中重建时传 False）
+    :return: 生成的闭包行数量
+    """
+    parents = dict(db.session.execute(select(Category.id, Category.parent_id)).all())
+    rows = _closure_rows(parents)
+    db.session.execute(delete(CategoryClosure))
+    if rows:
+        db.session.execute(insert(CategoryClosure), rows)
+    if commit:
+        db.session.commit()
+    print(f"✅ 分类闭包表重建完成，共 {len(rows)} 行")
+    return len(rows)
+
+
+# ========== 查询 ==========
+def subtree_ids(category_id):
+    """
+    构造分类子树（含自身）的分类ID子查询
+    :param category_id: 分类ID
+    :return: 可用于 in_() 的子查询
+    """
+    return select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+
+
+def filter_by_subtree(query, category_id, column=Book.category_id):
+    """
+    将查询限定在分类子树内：与闭包表做一次联结，按 (ancestor_id, descendant_id) 主键查找
+    :param query: ORM 查询对象
+    :param category_id: 分类ID
+    :param column: 查询中的分类ID列，默认为 Book.category_id
+    :return: 新的查询对象
+    """
+    closure = aliased(CategoryClosure)
+    return query.join(closure, closure.descendant_id == column).filter(
+        closure.ancestor_id == category_id
+    )
+
+
+def ancestor_map(category_ids):
+    """
+    批量获取分类的祖先（含自身）
+    :param category_ids: 分类ID集合
+    :return: {分类ID: [祖先分类ID, ...]}，按从近到远排列
+    """
+    if not category_ids:
+        return {}
+    rows = db.session.execute(
+        select(CategoryClosure.descendant_id, CategoryClosure.ancestor_id)
+        .where(CategoryClosure.descendant_id.in_(list(category_ids)))
+        .order_by(CategoryClosure.descendant_id, CategoryClosure.depth)
+    ).all()
+    ancestors = {}
+    for descendant_id, ancestor_id in rows:
+        ancestors.setdefault(descendant_id, []).append(ancestor_id)
+    return ancestors
+
+
+def category_path(category_id):
+    """
+    获取从顶级分类到指定分类的路径（面包屑）
+    :param category_id: 分类ID
+    :return: 分类对象列表，从顶级分类开始
+    """
+    return Category.query.join(
+        CategoryClosure, CategoryClosure.ancestor_id == Category.id
+    ).filter(
+        CategoryClosure.descendant_id == category_id
+    ).order_by(CategoryClosure.depth.desc()).all()
+
+
+# ========== 与Category表同步 ==========
+@event.listens_for(Category, 'after_insert')
+def _add_closure_on_insert(mapper, connection, target):
+    # 父分类的每个祖先都是新分类的祖先，再加上自身
+    parent_rows = connection.execute(
+        select(CategoryClosure.ancestor_id, CategoryClosure.depth)
+        .where(CategoryClosure.descendant_id == target.parent_id)
+    ).all() if target.parent_id else []
+    rows = [{'ancestor_id': target.id, 'descendant_id': target.id, 'depth': 0}]
+    rows.extend(
+        {'ancestor_id': ancestor_id, 'descendant_id': target.id, 'depth': depth + 1}
+        for ancestor_id, depth in parent_rows
+    )
+    connection.execute(insert(CategoryClosure), rows)
+
+
+@event.listens_for(Category, 'after_update')
+def _move_closure_on_update(mapper, connection, target):
+    if not inspect(target).attrs.parent_id.history.has_changes():
+        return
+    subtree = [row.descendant_id for row in connection.execute(subtree_ids(target.id))]
+    if target.parent_id in subtree:
+        raise ValueError('不能将分类移动到其自身或子分类之下')
+
+    # 断开子树与原祖先之间的关系，保留子树内部关系
+    connection.execute(delete(CategoryClosure).where(
+        CategoryClosure.descendant_id.in_(subtree),
+        CategoryClosure.ancestor_id.notin_(subtree)
+    ))
+    if not target.parent_id:
+        return
+
+    # 新父分类的每个祖先 × 子树中的每个分类
+    parent = aliased(CategoryClosure)
+    child = aliased(CategoryClosure)
+    connection.execute(insert(CategoryClosure).from_select(
+        ['ancestor_id', 'descendant_id', 'depth'],
+        select(parent.ancestor_id, child.descendant_id, parent.depth + child.depth + 1)
+        .where(parent.descendant_id == target.parent_id, child.ancestor_id == target.id)
+    ))
+
+
+@event.listens_for(Category, 'before_delete')
+def _remove_closure_on_delete(mapper, connection, target):
+    connection.execute(delete(CategoryClosure).where(
+        (CategoryClosure.descendant_id == target.id) | (CategoryClosure.ancestor_id == target.id)
+    ))
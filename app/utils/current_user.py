@@ -0,0 +1,148 @@
+"""
+当前登录读者
+load_current_user() 在一个请求内只解析一次（缓存在 flask.g 上），
+跨请求在进程内缓存读者各列的快照 ttl 秒：命中时用 session.merge(load=False) 挂回当前会话，
+不执行按主键查询；关联关系与业务方法照常按需查询。
+读者资料、状态的修改与删除（个人资料编辑、管理员启用/禁用、删除读者等）提交后立即使对应快照失效；
+其他进程中的修改最多延迟 ttl 秒可见
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from flask import g, session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from app import db
+from app.models import User
+from app.utils.db_routing import primary_reads
+
+_G_KEY = '_current_user'
+_SESSION_KEY = 'current_user_changes'
+
+
+class CurrentUserCache:
+    """
+    读者快照的 TTL + LRU 缓存
+    读取期间发生失效时不写回旧快照
+    """
+
+    def __init__(self, ttl=30, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, ttl=None, max_entries=None):
+        """根据配置调整有效期与容量，并清空已有缓存"""
+        with self._lock:
+            if ttl is not None:
+                self.ttl = ttl
+            if max_entries is not None:
+                self.max_entries = max_entries
+            self._entries.clear()
+            self._generations.clear()
+
+    def get(self, user_id):
+        """
+        读取快照
+        :return: {列名: 值}，未命中或已过期返回None
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or time.monotonic() >= entry[0]:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self, user_id):
+        """读者的失效计数，读取数据库前取得，写回时比对"""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def put(self, user_id, values, generation):
+        """写入快照；generation 与当前失效计数不同（期间被修改）时放弃"""
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            if self._generations.get(user_id, 0) != generation:
+                return
+            self._entries[user_id] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_ids):
+        """使指定读者的快照失效"""
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+
+current_user_cache = CurrentUserCache()
+
+
+def _snapshot(user):
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+
+def _load(user_id):
+    values = current_user_cache.get(user_id)
+    if values is not None:
+        user = User(**values)
+        # 视为刚从数据库加载的已持久化对象，合并进当前会话时不再查询
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+    generation = current_user_cache.generation(user_id)
+    # 快照跨请求复用，从主库读取
+    with primary_reads():
+        user = db.session.get(User, user_id)
+    if user is not None:
+        current_user_cache.put(user_id, _snapshot(user), generation)
+    return user
+
+
+def load_current_user():
+    """
+    获取当前登录的读者（请求内只解析一次）
+    :return: User 对象，未登录或读者不存在时返回None
+    """
+    if _G_KEY not in g:
+        user_id = session.get('user_id')
+        setattr(g, _G_KEY, _load(int(user_id)) if user_id is not None else None)
+    return getattr(g, _G_KEY)
+
+
+# ========== 写操作触发失效 ==========
+def _record(target):
+    session_ = object_session(target)
+    if session_ is not None:
+        session_.info.setdefault(_SESSION_KEY, set()).add(target.id)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _record_change(mapper, connection, target):
+    _record(target)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session_):
+    user_ids = session_.info.pop(_SESSION_KEY, None)
+    if user_ids:
+        current_user_cache.invalidate(user_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session_):
+    session_.info.pop(_SESSION_KEY, None)
@@ -0,0 +1,69 @@
+"""
+数据库引擎配置
+按数据库类型生成引擎参数：
+    - SQLite：每个新连接上依次执行配置的 PRAGMA（WAL、同步级别、页缓存、内存映射、忙等待等）
+    - PostgreSQL / MySQL 等服务器数据库：连接池大小、溢出、取出前检测、定期回收
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# 配置项 -> create_engine 连接池参数
+POOL_OPTIONS = (
+    ('DB_POOL_SIZE', 'pool_size'),
+    ('DB_MAX_OVERFLOW', 'max_overflow'),
+    ('DB_POOL_TIMEOUT', 'pool_timeout'),
+    ('DB_POOL_RECYCLE', 'pool_recycle'),
+    ('DB_POOL_PRE_PING', 'pool_pre_ping'),
+)
+
+
+def is_sqlite(uri):
+    """数据库URI是否为SQLite"""
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def engine_options(config, uri=None):
+    """
+    根据配置生成 SQLALCHEMY_ENGINE_OPTIONS
+    已显式配置的引擎参数优先；SQLite 不使用连接池参数
+    :param config: 应用配置
+    :param uri: 数据库URI，默认为主库 SQLALCHEMY_DATABASE_URI
+    :return: 引擎参数字典
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if is_sqlite(uri or config['SQLALCHEMY_DATABASE_URI']):
+        return options
+    for key, option in POOL_OPTIONS:
+        if config.get(key) is not None:
+            options.setdefault(option, config[key])
+    return options
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """
+    为引擎的每个新连接执行 PRAGMA（需在第一次连接前调用）
+    :param engine: SQLAlchemy 引擎
+    :param pragmas: {名称: 值}，按顺序执行；非SQLite引擎或为空时不做任何事
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    statements = [f'PRAGMA {name}={value}' for name, value in pragmas.items()]
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def sqlite_pragma_values(connection, names):
+    """
+    读取当前连接上的 PRAGMA 值（用于核对配置是否生效）
+    :param connection: SQLAlchemy 连接
+    :param names: PRAGMA 名称序列
+    :return: {名称: 值}
+    """
+    return {name: connection.exec_driver_sql(f'PRAGMA {name}').scalar() for name in names}
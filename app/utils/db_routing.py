@@ -0,0 +1,126 @@
+"""
+读写分离
+配置 DATABASE_REPLICA_URL 后注册名为 replica 的只读副本绑定：
+    - GET / HEAD 请求中的 SELECT 发往副本，其余请求与所有写操作（flush、INSERT/UPDATE/DELETE）发往主库
+    - 请求中一旦发生写操作，本请求之后的查询也改走主库
+    - 用户自己写入后的 READ_YOUR_WRITES_SECONDS 秒内（记录在会话中），其读请求仍走主库，
+      避免副本复制延迟导致刚借阅、归还或收藏的结果“看不到”
+    - primary_reads() 范围内的查询走主库：结果要写入进程内缓存、跨请求复用的查询（检索结果缓存、
+      搜索联想索引等）在其中执行，避免把副本复制延迟期间的旧数据缓存下来
+未配置副本时所有查询走主库，行为与单库相同。
+本地可用另一个 SQLite 文件作副本（flask sync-replica 从主库复制）
+"""
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = 'replica'
+
+# 只读的请求方法
+READ_METHODS = ('GET', 'HEAD')
+
+_G_USE_REPLICA = '_db_use_replica'
+_G_WROTE = '_db_wrote'
+_SESSION_KEY = '_db_write_at'
+
+
+class RoutingSession(Session):
+    """
+    按请求方法与语句类型选择主库或副本的会话
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        # 请求钩子只在配置了副本时设置路由标记
+        if bind is None and has_request_context() and _G_USE_REPLICA in g:
+            if self._flushing or getattr(clause, 'is_dml', False):
+                # 写操作：本请求之后的读也走主库，并在请求结束时记录写入时间
+                setattr(g, _G_WROTE, True)
+                setattr(g, _G_USE_REPLICA, False)
+            elif getattr(clause, 'is_select', False) and getattr(g, _G_USE_REPLICA):
+                return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def primary_reads():
+    """
+    范围内的查询走主库；不在请求中或未配置副本时不做任何事
+    """
+    if not has_request_context() or _G_USE_REPLICA not in g:
+        yield
+        return
+    use_replica = getattr(g, _G_USE_REPLICA)
+    setattr(g, _G_USE_REPLICA, False)
+    try:
+        yield
+    finally:
+        # 范围内发生过写操作时本请求之后仍走主库
+        if not g.get(_G_WROTE):
+            setattr(g, _G_USE_REPLICA, use_replica)
+
+
+def configure_replica(config):
+    """
+    按配置注册副本绑定，需在 db.init_app 之前调用
+    :param config: 应用配置
+    :return: 是否配置了副本
+    """
+    from app.utils.db_engine import engine_options
+
+    replica_url = config.get('DATABASE_REPLICA_URL')
+    if not replica_url:
+        return False
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    binds[REPLICA_BIND] = {'url': replica_url, **engine_options(config, replica_url)}
+    config['SQLALCHEMY_BINDS'] = binds
+    return True
+
+
+def init_app(app, db):
+    """
+    副本连接设置与请求钩子，需在应用上下文中调用；未配置副本时不做任何事
+    :param app: Flask 应用
+    :param db: SQLAlchemy 扩展
+    """
+    from app.utils.db_engine import install_sqlite_pragmas
+
+    engine = db.engines.get(REPLICA_BIND)
+    if engine is None:
+        return
+    # SQLite 副本只读打开，路由出错时立即报错而不是悄悄写入副本
+    install_sqlite_pragmas(engine, {**(app.config.get('SQLITE_PRAGMAS') or {}), 'query_only': 'ON'})
+    window = app.config['READ_YOUR_WRITES_SECONDS']
+
+    @app.before_request
+    def _route_reads():
+        recent_write = time.time() - session.get(_SESSION_KEY, 0) < window
+        setattr(g, _G_USE_REPLICA, request.method in READ_METHODS and not recent_write)
+
+    @app.after_request
+    def _remember_write(response):
+        if g.pop(_G_WROTE, False):
+            session[_SESSION_KEY] = time.time()
+        return response
+
+
+def sync_sqlite_replica(primary_engine, replica_engine):
+    """
+    用 SQLite 在线备份接口把主库完整复制到副本文件（本地模拟复制）
+    :param primary_engine: 主库引擎
+    :param replica_engine: 副本引擎
+    :return: 复制的页数
+    """
+    replica_engine.dispose()
+    source = primary_engine.raw_connection()
+    target = replica_engine.raw_connection()
+    try:
+        # 副本连接为只读（query_only），备份前临时关闭
+        target.driver_connection.execute('PRAGMA query_only=OFF')
+        source.driver_connection.backup(target.driver_connection)
+        return target.driver_connection.execute('PRAGMA page_count').fetchone()[0]
+    finally:
+        target.close()
+        source.close()
+        replica_engine.dispose()
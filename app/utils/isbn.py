@@ -0,0 +1,98 @@
+"""
+ISBN 识别、规范化与 ISBN-10 / ISBN-13 互转
+"""
+import re
+
+_SEPARATORS_RE = re.compile(r'[\s\-]')
+_ISBN10_RE = re.compile(r'^\d{9}[\dX]$')
+_ISBN13_RE = re.compile(r'^97[89]\d{10}$')
+
+
+def normalize_isbn(value):
+    """
+    规范化ISBN：去除连字符和空格，末位 x 转为大写
+    :param value: 用户输入
+    :return: 10位或13位ISBN字符串，不是ISBN格式时返回None
+    """
+    if not value:
+        return None
+    normalized = _SEPARATORS_RE.sub('', value.strip()).upper()
+    if normalized.startswith('ISBN'):
+        normalized = normalized[4:].lstrip(':')
+    if _ISBN10_RE.match(normalized) or _ISBN13_RE.match(normalized):
+        return normalized
+    return None
+
+
+def isbn10_check_digit(first9):
+    """计算ISBN-10校验位"""
+    total = sum((10 - i) * int(digit) for i, digit in enumerate(first9))
+    check = (11 - total % 11) % 11
+    return 'X' if check == 10 else str(check)
+
+
+def isbn13_check_digit(first12):
+    """计算ISBN-13校验位"""
+    total = sum(int(digit) * (1 if i % 2 == 0 else 3) for i, digit in enumerate(first12))
+    return str((10 - total % 10) % 10)
+
+
+def is_valid_isbn(value):
+    """
+    校验ISBN（含校验位）
+    :param value: ISBN字符串，可带连字符
+    :return: True/False
+    """
+    isbn = normalize_isbn(value)
+    if isbn is None:
+        return False
+    if len(isbn) == 10:
+        return isbn10_check_digit(isbn[:9]) == isbn[9]
+    return isbn13_check_digit(isbn[:12]) == isbn[12]
+
+
+def to_isbn13(value):
+    """
+    转换为ISBN-13
+    :param value: ISBN-10或ISBN-13
+    :return: ISBN-13字符串，无法识别时返回None
+    """
+    isbn = normalize_isbn(value)
+    if isbn is None:
+        return None
+    if len(isbn) == 13:
+        return isbn
+    first12 = '978' + isbn[:9]
+    return first12 + isbn13_check_digit(first12)
+
+
+def to_isbn10(value):
+    """
+    转换为ISBN-10（仅 978 前缀的ISBN-13可转换）
+    :param value: ISBN-10或ISBN-13
+    :return: ISBN-10字符串，无法转换时返回None
+    """
+    isbn = normalize_isbn(value)
+    if isbn is None:
+        return None
+    if len(isbn) == 10:
+        return isbn
+    if not isbn.startswith('978'):
+        return None
+    first9 = isbn[3:12]
+    return first9 + isbn10_check_digit(first9)
+
+
+def isbn_lookup_values(value):
+    """
+    生成精确查询ISBN时需要匹配的全部写法
+    包括原始输入、规范化结果及其 ISBN-10 / ISBN-13 对应形式
+    :param value: 用户输入
+    :return: ISBN写法列表，输入不是ISBN格式时返回空列表
+    """
+    isbn = normalize_isbn(value)
+    if isbn is None:
+        return []
+    values = {value.strip(), isbn, to_isbn13(isbn), to_isbn10(isbn)}
+    values.discard(None)
+    return sorted(values)
@@ -0,0 +1,128 @@
+"""
+游标（keyset）分页
+按 (排序键, id) 定位下一页的起点，每页只取 per_page + 1 行，
+翻页代价与结果集大小、页码深度无关
+"""
+import base64
+import json
+import math
+from decimal import Decimal
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(values):
+    """
+    将最后一行的排序键编码为URL安全的游标字符串
+    :param values: 排序键取值序列，如 (title, id)
+    :return: 游标字符串
+    """
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _accepts(column, value):
+    """游标中的取值是否与排序列的类型相符（数字列只接受数字，文本列只接受字符串，均可为null）"""
+    if value is None:
+        return True
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return False
+    # 超出数据库整数范围或非有限的数字无法作为查询参数
+    if isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63:
+        return False
+    if isinstance(value, float) and not math.isfinite(value):
+        return False
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return True
+    if issubclass(python_type, (int, float, Decimal)):
+        return isinstance(value, (int, float))
+    if issubclass(python_type, str):
+        return isinstance(value, str)
+    return True
+
+
+def decode_cursor(cursor, order_columns):
+    """
+    解码游标字符串，并按排序列校验取值类型
+    :param cursor: 游标字符串
+    :param order_columns: 排序列序列
+    :return: 排序键取值列表，无效或被篡改的游标返回None（按第一页处理）
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError):
+        return None
+    if not isinstance(values, list) or len(values) != len(order_columns):
+        return None
+    if not all(_accepts(column, value) for column, value in zip(order_columns, values)):
+        return None
+    return values
+
+
+def _after(columns, values):
+    """构造 (c1, c2, ...) > (v1, v2, ...) 的行比较条件"""
+    column, value = columns[0], values[0]
+    if len(columns) == 1:
+        return column > value
+    return or_(column > value, and_(column == value, _after(columns[1:], values[1:])))
+
+
+class KeysetPage:
+    """
+    游标分页结果
+    items 为本页对象，next_cursor 为下一页游标（没有下一页时为None）
+    """
+
+    def __init__(self, items, next_cursor, per_page):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.per_page = per_page
+
+    @property
+    def has_next(self):
+        """是否还有下一页"""
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def cursor_for(item, order_columns):
+    """
+    生成指向某一行之后的游标
+    :param item: 本页最后一个对象
+    :param order_columns: 排序列序列
+    :return: 游标字符串
+    """
+    return encode_cursor(getattr(item, column.key) for column in order_columns)
+
+
+def keyset_paginate(query, order_columns, cursor=None, per_page=20, load=None):
+    """
+    对查询做游标分页
+    :param query: ORM 查询对象
+    :param order_columns: 排序列序列，最后一列必须唯一（通常为主键），如 (Book.title, Book.id)
+    :param cursor: 上一页返回的游标，None表示第一页
+    :param per_page: 每页数量
+    :param load: 将查询结果行列表转换为本页对象列表的函数（查询带有附加列时使用），默认原样返回
+    :return: KeysetPage 对象
+    """
+    values = decode_cursor(cursor, order_columns)
+    if values is not None:
+        query = query.filter(_after(order_columns, values))
+
+    rows = query.order_by(*order_columns).limit(per_page + 1).all()
+    items = rows[:per_page]
+    if load is not None:
+        items = load(items)
+
+    next_cursor = cursor_for(items[-1], order_columns) if len(rows) > per_page else None
+    return KeysetPage(items, next_cursor, per_page)
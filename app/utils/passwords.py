@@ -0,0 +1,110 @@
+"""
+密码哈希
+算法与强度由 PASSWORD_HASH_METHOD 配置（werkzeug 格式：pbkdf2:sha256:600000、scrypt:32768:8:1 等），
+验证时按哈希值自带的算法前缀计算，旧算法或旧强度的哈希仍可验证，登录成功时按当前配置重新哈希。
+哈希与验证在有界线程池中执行（hashlib 计算期间释放 GIL）：同时计算的数量不超过线程数，
+登录高峰时其余请求不会因全部 worker 都在计算哈希而饿死；排队超过上限时抛出 PasswordHasherBusy
+"""
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from threading import BoundedSemaphore
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+# 各算法的默认参数（与 werkzeug 一致），用于把简写的方法名补全为哈希值中的前缀
+_METHOD_DEFAULTS = {
+    'pbkdf2': ('sha256', str(DEFAULT_PBKDF2_ITERATIONS)),
+    'scrypt': (str(2 ** 15), '8', '1'),
+}
+
+
+class PasswordHasherBusy(Exception):
+    """等待哈希计算的请求过多或等待超时"""
+
+
+def normalize_method(method):
+    """
+    补全哈希方法的默认参数，如 pbkdf2 -> pbkdf2:sha256:600000
+    :param method: werkzeug 哈希方法
+    :return: 与哈希值前缀一致的完整方法名
+    """
+    name, *params = method.split(':')
+    if name not in _METHOD_DEFAULTS:
+        raise ValueError(f"不支持的密码哈希算法: {name}，可选 {', '.join(_METHOD_DEFAULTS)}")
+    defaults = _METHOD_DEFAULTS[name]
+    return ':'.join([name, *params, *defaults[len(params):]])
+
+
+class PasswordHasher:
+    """
+    可配置的密码哈希器
+    workers 为0时在调用线程中直接计算
+    """
+
+    def __init__(self, method='pbkdf2', workers=0, queue_limit=64, timeout=10.0):
+        self.method = normalize_method(method)
+        self.workers = 0
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self._executor = None
+        self._slots = None
+        self.configure(workers=workers)
+
+    def configure(self, method=None, workers=None, queue_limit=None, timeout=None):
+        """根据配置调整算法、线程数、排队上限与等待超时（重建线程池）"""
+        if method is not None:
+            self.method = normalize_method(method)
+        if workers is not None:
+            self.workers = workers
+        if queue_limit is not None:
+            self.queue_limit = queue_limit
+        if timeout is not None:
+            self.timeout = timeout
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._slots = None
+        if self.workers:
+            # 线程在第一次提交任务时才创建
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hasher')
+            self._slots = BoundedSemaphore(self.workers + self.queue_limit)
+
+    def _run(self, func, *args):
+        executor, slots = self._executor, self._slots
+        if executor is None:
+            return func(*args)
+        if not slots.acquire(blocking=False):
+            raise PasswordHasherBusy('等待密码校验的请求过多')
+        try:
+            future = executor.submit(func, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # 名额在计算结束（或排队中被取消）时才归还：等待超时后计算仍在线程池中进行，仍占用名额
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHasherBusy('密码校验等待超时') from None
+
+    def hash(self, password):
+        """
+        按当前配置计算密码哈希
+        :param password: 明文密码
+        :return: 哈希值
+        """
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        """
+        验证密码（按哈希值自带的算法与参数计算）
+        :return: True/False
+        """
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """哈希值的算法或强度与当前配置不同时返回True"""
+        return password_hash.split('$', 1)[0] != self.method
+
+
+password_hasher = PasswordHasher()
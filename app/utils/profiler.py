@@ -0,0 +1,179 @@
+"""
+按需请求性能剖析
+开启（PROFILER_ENABLED=True）后，以下请求会被剖析：
+    - 管理员会话且带有查询参数 PROFILER_QUERY_PARAM（如 ?_profile=1）的请求
+    - 按 PROFILER_SAMPLE_RATE 比例随机抽样的请求（可用 PROFILER_ENDPOINTS 限定端点）
+每个被剖析的请求同时做两件事：
+    - cProfile 统计函数级耗时，跨请求累加，可下载为 pstats 文件；
+      同一时刻进程内只能有一个 cProfile 在运行（Python 3.12 起并发启用会报错），
+      其他请求正在剖析时本请求只做调用栈采样
+    - 后台线程按 PROFILER_SAMPLE_INTERVAL 采样请求线程的调用栈，累加为 collapsed stacks（火焰图输入）
+未开启时不注册任何钩子，没有额外开销
+"""
+import cProfile
+import marshal
+import pstats
+import random
+import sys
+import threading
+from collections import Counter
+
+from flask import g, request, session
+
+_G_KEY = '_profiler'
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})'
+
+
+class _StackSampler(threading.Thread):
+    """定时采样指定线程调用栈的后台线程"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class RequestProfiler:
+    """
+    请求剖析器
+    累加所有被剖析请求的 cProfile 统计与调用栈采样
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.query_param = '_profile'
+        self.sample_rate = 0.0
+        self.endpoints = ()
+        self.interval = 0.005
+        self._stats = None
+        self._stacks = Counter()
+        self._requests = Counter()
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        按配置注册请求钩子
+        :param app: Flask 应用
+        """
+        self.enabled = app.config.get('PROFILER_ENABLED', False)
+        if not self.enabled:
+            return
+        self.query_param = app.config.get('PROFILER_QUERY_PARAM', '_profile')
+        self.sample_rate = app.config.get('PROFILER_SAMPLE_RATE', 0.0)
+        self.endpoints = tuple(app.config.get('PROFILER_ENDPOINTS', ()))
+        self.interval = app.config.get('PROFILER_SAMPLE_INTERVAL', 0.005)
+        app.before_request(self._start)
+        app.teardown_request(self._stop)
+
+    def _should_profile(self):
+        if request.args.get(self.query_param) and session.get('is_admin') == 'True':
+            return True
+        if self.sample_rate <= 0:
+            return False
+        if self.endpoints and request.endpoint not in self.endpoints:
+            return False
+        return random.random() < self.sample_rate
+
+    def _start(self):
+        if not self._should_profile():
+            return
+        sampler = _StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        profile = None
+        if self._profile_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # 进程内已有其他剖析器（如外部工具）在运行
+                profile = None
+                self._profile_lock.release()
+        setattr(g, _G_KEY, (profile, sampler, request.endpoint))
+
+    def _stop(self, exc=None):
+        state = g.pop(_G_KEY, None)
+        if state is None:
+            return
+        profile, sampler, endpoint = state
+        if profile is not None:
+            profile.disable()
+            self._profile_lock.release()
+        sampler.stop()
+        with self._lock:
+            if profile is not None:
+                if self._stats is None:
+                    self._stats = pstats.Stats(profile)
+                else:
+                    self._stats.add(profile)
+            self._stacks.update(sampler.stacks)
+            self._requests[endpoint or request.path] += 1
+
+    # ========== 结果查看与导出 ==========
+    def summary(self, limit=30, sort='tottime'):
+        """
+        最热的函数
+        :param limit: 返回条数
+        :param sort: 排序依据，'tottime'（自身耗时）或 'cumtime'（含子调用耗时）
+        :return: {'requests': {端点: 次数}, 'functions': [{'function','calls','tottime','cumtime'}, ...]}
+        """
+        with self._lock:
+            stats = dict(self._stats.stats) if self._stats is not None else {}
+            requests = dict(self._requests)
+        index = 3 if sort == 'cumtime' else 2
+        rows = sorted(stats.items(), key=lambda item: item[1][index], reverse=True)[:limit]
+        functions = [{
+            'function': pstats.func_std_string(func),
+            'calls': primitive_calls if primitive_calls == calls else f'{calls}/{primitive_calls}',
+            'tottime': tottime,
+            'cumtime': cumtime,
+        } for func, (primitive_calls, calls, tottime, cumtime, _callers) in rows]
+        return {'requests': requests, 'functions': functions}
+
+    def dump_pstats(self):
+        """
+        导出累计的 pstats 数据（可用 pstats.Stats(文件) / snakeviz 等工具打开）
+        :return: 字节串，尚无数据时返回None
+        """
+        with self._lock:
+            if self._stats is None:
+                return None
+            return marshal.dumps(self._stats.stats)
+
+    def dump_collapsed(self):
+        """
+        导出 collapsed stacks 文本（每行“栈;帧 次数”，可直接输入 flamegraph.pl / speedscope）
+        :return: 字符串
+        """
+        with self._lock:
+            return ''.join(f'{stack} {count}\n' for stack, count in self._stacks.most_common())
+
+    def clear(self):
+        """清空累计结果"""
+        with self._lock:
+            self._stats = None
+            self._stacks.clear()
+            self._requests.clear()
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,61 @@
+"""
+进程内请求频率限制
+固定时间窗口计数：每个客户端（键）在 window 秒内最多 limit 次，超过后到窗口结束前一律拒绝。
+计数保存在进程内，多进程部署时每个进程各自计数（实际上限为 limit × 进程数）
+"""
+import time
+from threading import Lock
+
+
+class RateLimiter:
+    """
+    固定窗口频率限制
+    limit 为0时不限制
+    """
+
+    def __init__(self, limit=30, window=60, max_keys=10000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._windows = {}
+        self._lock = Lock()
+        self.rejected = 0
+
+    def configure(self, limit=None, window=None):
+        """根据配置调整次数上限与窗口秒数，并清空已有计数"""
+        with self._lock:
+            if limit is not None:
+                self.limit = limit
+            if window is not None:
+                self.window = window
+            self._windows.clear()
+
+    def allow(self, key):
+        """
+        记录一次请求并判断是否允许
+        :param key: 客户端标识（如IP地址）
+        :return: True/False
+        """
+        if self.limit <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            started, count = self._windows.get(key, (now, 0))
+            if now - started >= self.window:
+                started, count = now, 0
+            if count >= self.limit:
+                self.rejected += 1
+                return False
+            if key not in self._windows and len(self._windows) >= self.max_keys:
+                self._prune(now)
+            self._windows[key] = (started, count + 1)
+            return True
+
+    def _prune(self, now):
+        # 先丢弃已过期的窗口，仍然过多时丢弃最早开始的一半
+        expired = [key for key, (started, _) in self._windows.items() if now - started >= self.window]
+        for key in expired:
+            del self._windows[key]
+        if len(self._windows) >= self.max_keys:
+            for key in sorted(self._windows, key=lambda key: self._windows[key][0])[:len(self._windows) // 2]:
+                del self._windows[key]
@@ -0,0 +1,305 @@
+"""
+图书检索服务
+users.search、users.favorites 与 admin.book_management 共用的检索入口
+"""
+from sqlalchemy import Float, and_, case, func, literal_column, or_
+
+from app.models import Book, Category
+from app.utils import search_index, search_keys
+from app.utils.category_tree import ancestor_map, filter_by_subtree
+from app.utils.catalog_events import catalog_version
+from app.utils.db_routing import primary_reads
+from app.utils.isbn import isbn_lookup_values
+from app.utils.pagination import KeysetPage, cursor_for, decode_cursor, keyset_paginate
+from app.utils.search_cache import normalize_query, search_cache
+
+
+def parse_category_id(category_id):
+    """
+    解析并校验分类筛选参数
+    :param category_id: 请求中的分类ID字符串
+    :return: 存在的分类ID，无效或为空时返回None
+    """
+    if not category_id:
+        return None
+    try:
+        category_id_int = int(category_id)
+    except (TypeError, ValueError):
+        # 无效的分类ID，忽略
+        return None
+    # 验证分类是否存在
+    if Category.query.get(category_id_int) is None:
+        return None
+    return category_id_int
+
+
+def exact_isbn_values(query):
+    """
+    输入为ISBN-10/ISBN-13格式（可带连字符）且图书表中存在该ISBN时，返回精确匹配的全部写法；
+    不校验校验位（已有馆藏数据中不少ISBN的校验位并不正确，按录入的写法应能查到）。
+    库中没有对应图书的10位、13位数字串按普通关键词做全文检索。
+    需要一次唯一索引查询，同一检索中算出后传给 keyword_condition / search_books，避免重复查询
+    :param query: 搜索关键词（已去除首尾空白）
+    :return: ISBN写法列表，不走精确匹配时返回空列表
+    """
+    values = isbn_lookup_values(query)
+    if not values:
+        return []
+    exists = Book.query.with_entities(Book.id).filter(Book.isbn.in_(values)).first()
+    return values if exists is not None else []
+
+
+def _text_condition(query):
+    """
+    全文检索条件：全文索引不可用时回退为书名、作者、ISBN、描述的多字段模糊匹配
+    :param query: 搜索关键词
+    :return: 可用于 filter() 的条件表达式
+    """
+    matched_ids = search_index.match_book_ids(query)
+    if matched_ids is not None:
+        return Book.id.in_(matched_ids)
+    return or_(
+        Book.title.ilike(f'%{query}%'),
+        Book.author.ilike(f'%{query}%'),
+        Book.isbn.ilike(f'%{query}%'),
+        Book.description.ilike(f'%{query}%')
+    )
+
+
+def keyword_condition(query, isbn_values=None):
+    """
+    构造关键词检索条件
+    全文检索条件与拼音/二元组检索键命中的图书取并集；
+    汉字与字母、数字混合的输入（如“三国 2019”），检索键命中的图书还需匹配汉字以外的词，保持所有词均匹配；
+    输入为库中存在的ISBN时直接走 isbn 唯一索引精确匹配，见 exact_isbn_values
+    :param query: 搜索关键词
+    :param isbn_values: 已算出的 exact_isbn_values(query)，None表示在此查询
+    :return: 可用于 filter() 的条件表达式
+    """
+    if isbn_values is None:
+        isbn_values = exact_isbn_values(query)
+    if isbn_values:
+        return Book.isbn.in_(isbn_values)
+
+    condition = _text_condition(query)
+    key_matched_ids = search_keys.match_book_ids(query)
+    if key_matched_ids is None:
+        return condition
+
+    key_condition = Book.id.in_(key_matched_ids)
+    residual = search_keys.residual_query(query)
+    if residual:
+        key_condition = and_(key_condition, _text_condition(residual))
+    return or_(condition, key_condition)
+
+
+def parse_facet_filters(args):
+    """
+    解析分面筛选参数
+    :param args: 请求参数（request.args）
+    :return: 筛选条件字典，可包含 language、publisher、available
+    """
+    filters = {}
+    for field in ('language', 'publisher'):
+        value = args.get(field, '').strip()
+        if value:
+            filters[field] = value
+    available = args.get('available', '').strip()
+    if available in ('0', '1'):
+        filters['available'] = available == '1'
+    return filters
+
+
+def facet_query_args(filters):
+    """
+    将分面筛选条件转换回URL参数，用于生成分面链接
+    :param filters: 分面筛选条件，见 parse_facet_filters
+    :return: URL参数字典
+    """
+    args = dict(filters)
+    if 'available' in args:
+        args['available'] = '1' if args['available'] else '0'
+    return args
+
+
+def search_books(query='', category_id=None, filters=None, isbn_values=None):
+    """
+    按关键词、分类和分面条件检索图书
+    :param query: 搜索关键词
+    :param category_id: 分类ID（已校验），None表示不限分类；包含其所有子分类下的图书
+    :param filters: 分面筛选条件，见 parse_facet_filters
+    :param isbn_values: 已算出的 exact_isbn_values(query)，None表示在构造条件时查询
+    :return: 图书查询对象
+    """
+    books_query = Book.query
+    filters = filters or {}
+
+    # 处理分类筛选（整棵子树）
+    if category_id:
+        books_query = filter_by_subtree(books_query, category_id)
+
+    # 处理分面筛选
+    if 'language' in filters:
+        books_query = books_query.filter_by(language=filters['language'])
+    if 'publisher' in filters:
+        books_query = books_query.filter_by(publisher=filters['publisher'])
+    if 'available' in filters:
+        books_query = books_query.filter(
+            Book.is_available if filters['available'] else ~Book.is_available
+        )
+
+    # 处理关键词搜索
+    query = (query or '').strip()
+    if query:
+        books_query = books_query.filter(keyword_condition(query, isbn_values))
+
+    return books_query
+
+
+# 无关键词时的排序：书名，id 保证排序唯一
+SEARCH_ORDER = (Book.title, Book.id)
+
+
+def ranked_search(query='', category_id=None, filters=None):
+    """
+    构造按相关度排序的检索查询，结果行为 (图书, 得分)，用 _with_rank 取出图书并写入 Book.search_rank
+    有关键词时联结全文索引的 BM25 得分，按 (得分, id) 排序；
+    仅由拼音/二元组检索键命中的图书没有全文得分，排在全文命中之后；
+    无关键词、ISBN精确查询或全文索引不可用时得分为空，按 (书名, id) 排序。
+    得分作为单独的列查询，不挂在图书对象的加载选项上：会话中的图书对象之后刷新时不会带上全文索引子查询
+    :param query: 搜索关键词
+    :param category_id: 分类ID（已校验），None表示不限分类
+    :param filters: 分面筛选条件，见 parse_facet_filters
+    :return: (查询对象, 排序列)
+    """
+    query = (query or '').strip()
+    isbn_values = exact_isbn_values(query) if query else []
+    books_query = search_books(query, category_id, filters, isbn_values)
+    ranked = search_index.ranked_book_ids(query) if query and not isbn_values else None
+    if ranked is None:
+        return books_query.add_columns(literal_column('NULL', Float).label('search_rank')), SEARCH_ORDER
+
+    rank = func.coalesce(ranked.c.score, 0.0).label('search_rank')
+    books_query = books_query.outerjoin(ranked, ranked.c.book_id == Book.id).add_columns(rank)
+    return books_query, (rank, Book.id)
+
+
+def _with_rank(rows):
+    """把 ranked_search 的结果行 (图书, 得分) 转换为图书列表，得分写入 book.search_rank（普通属性）"""
+    books = []
+    for book, rank in rows:
+        book.search_rank = rank
+        books.append(book)
+    return books
+
+
+def _cache_key(query, category_id, filters):
+    return normalize_query(query), category_id, tuple(sorted((filters or {}).items()))
+
+
+def search_page(query='', category_id=None, cursor=None, per_page=20, filters=None):
+    """
+    按相关度（无关键词时按书名）游标分页检索图书
+    先查检索结果缓存中的有序图书ID列表，未命中时查询并回填缓存；
+    结果过多的宽泛查询以及关闭缓存时直接在数据库中游标分页，只取排在最前的一页
+    :param query: 搜索关键词
+    :param category_id: 分类ID（已校验），None表示不限分类
+    :param cursor: 上一页返回的游标，None表示第一页
+    :param per_page: 每页数量
+    :param filters: 分面筛选条件，见 parse_facet_filters
+    :return: KeysetPage 对象
+    """
+    books_query, order_columns = ranked_search(query, category_id, filters)
+    if not search_cache.enabled:
+        return keyset_paginate(books_query, order_columns, cursor=cursor, per_page=per_page, load=_with_rank)
+
+    key = _cache_key(query, category_id, filters)
+    book_ids = search_cache.get(key)
+    if book_ids is None:
+        version = catalog_version()
+        # 结果按当前目录版本写入缓存，从主库读取，避免缓存副本上尚未复制的旧结果
+        with primary_reads():
+            rows = books_query.with_entities(Book.id).order_by(
+                *order_columns
+            ).limit(search_cache.max_ids + 1).all()
+        book_ids = [row.id for row in rows]
+        search_cache.put(key, book_ids, version)
+        if len(book_ids) > search_cache.max_ids:
+            book_ids = search_cache.OVERFLOW
+
+    if book_ids != search_cache.OVERFLOW:
+        page = _page_from_ids(books_query, order_columns, book_ids, cursor, per_page)
+        if page is not None:
+            return page
+    return keyset_paginate(books_query, order_columns, cursor=cursor, per_page=per_page, load=_with_rank)
+
+
+def _page_from_ids(books_query, order_columns, book_ids, cursor, per_page):
+    """
+    在缓存的有序图书ID列表上分页，只加载本页图书
+    :return: KeysetPage 对象，游标不在列表中时返回None
+    """
+    start = 0
+    values = decode_cursor(cursor, order_columns)
+    if values is not None:
+        try:
+            start = book_ids.index(values[-1]) + 1
+        except ValueError:
+            return None
+
+    page_ids = book_ids[start:start + per_page]
+    books = _with_rank(books_query.filter(Book.id.in_(page_ids))) if page_ids else []
+    books_by_id = {book.id: book for book in books}
+    items = [books_by_id[book_id] for book_id in page_ids if book_id in books_by_id]
+
+    next_cursor = None
+    if items and start + per_page < len(book_ids):
+        next_cursor = cursor_for(items[-1], order_columns)
+    return KeysetPage(items, next_cursor, per_page)
+
+
+def search_facets(query='', category_id=None, filters=None):
+    """
+    统计当前检索结果的分面计数（分类、是否可借、语言、出版社）
+    在匹配结果上做一次分组聚合，四个维度一并得出；
+    分类计数按闭包表累加到各级祖先分类，与子树筛选的结果数一致；
+    结果与同一查询的图书ID列表一起缓存在检索结果缓存中，目录变更时一并失效
+    :param query: 搜索关键词
+    :param category_id: 分类ID（已校验），None表示不限分类
+    :param filters: 分面筛选条件，见 parse_facet_filters
+    :return: {'total': 总数, 'category': {分类ID: 数量}, 'available': {True/False: 数量},
+              'language': {语言: 数量}, 'publisher': {出版社: 数量}}
+    """
+    if not search_cache.enabled:
+        return _compute_facets(query, category_id, filters)
+
+    key = _cache_key(query, category_id, filters)
+    facets = search_cache.get(('facets', key))
+    if facets is None:
+        version = catalog_version()
+        with primary_reads():
+            facets = _compute_facets(query, category_id, filters)
+        search_cache.put_facets(key, facets, version)
+    return facets
+
+
+def _compute_facets(query, category_id, filters):
+    available = case((Book.is_available, 1), else_=0)
+    rows = search_books(query, category_id, filters).with_entities(
+        Book.category_id, available, Book.language, Book.publisher, func.count(Book.id)
+    ).group_by(Book.category_id, available, Book.language, Book.publisher).all()
+
+    facets = {'total': 0, 'category': {}, 'available': {}, 'language': {}, 'publisher': {}}
+    for row_category_id, is_available, language, publisher, count in rows:
+        facets['total'] += count
+        for name, value in (('category', row_category_id), ('available', bool(is_available)),
+                            ('language', language), ('publisher', publisher)):
+            if value is not None and value != '':
+                facets[name][value] = facets[name].get(value, 0) + count
+
+    category_counts = {}
+    for descendant_id, ancestors in ancestor_map(facets['category']).items():
+        for ancestor_id in ancestors:
+            category_counts[ancestor_id] = category_counts.get(ancestor_id, 0) + facets['category'][descendant_id]
+    facets['category'] = category_counts
+    return facets
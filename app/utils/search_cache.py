@@ -0,0 +1,135 @@
+"""
+检索结果缓存
+以（规范化关键词, 分类ID, 分面筛选）为键缓存有序的图书ID列表及分面计数，LRU 淘汰，
+目录版本号变化（任意 Book 增删改提交）时整体失效。
+目录版本号只在本进程内递增，每条缓存另有 ttl 秒有效期：
+多进程部署时其他进程中的图书变更最多延迟 ttl 秒可见
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from app.utils.catalog_events import catalog_version, on_catalog_change
+
+
+def normalize_query(query):
+    """规范化关键词：去除首尾空白、合并连续空白并转为小写"""
+    return ' '.join((query or '').split()).lower()
+
+
+class SearchResultCache:
+    """
+    检索结果LRU缓存
+    max_entries 限制缓存的查询条数；结果超过 max_ids 条的宽泛查询只缓存 OVERFLOW 标记，
+    命中后直接走数据库游标分页，避免每次重复取出超长ID列表
+    """
+
+    OVERFLOW = 'overflow'
+
+    def __init__(self, max_entries=256, max_ids=5000, ttl=60):
+        self.max_entries = max_entries
+        self.max_ids = max_ids
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        """容量为0时关闭缓存"""
+        return self.max_entries > 0
+
+    def configure(self, max_entries=None, max_ids=None, ttl=None):
+        """根据配置调整容量与有效期，并清空已有缓存"""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_ids is not None:
+                self.max_ids = max_ids
+            if ttl is not None:
+                self.ttl = ttl
+            self._entries.clear()
+
+    def get(self, key):
+        """
+        读取缓存
+        :param key: 缓存键
+        :return: 有序图书ID元组、OVERFLOW 标记或分面计数，未命中返回None
+        """
+        version = catalog_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            expired = entry is not None and entry[1] is not None and time.monotonic() >= entry[1]
+            if entry is None or entry[0] != version or expired:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, book_ids, version):
+        """
+        写入缓存
+        :param key: 缓存键
+        :param book_ids: 有序图书ID序列，超过 max_ids 条时记为 OVERFLOW
+        :param version: 计算结果时的目录版本号，已过期则不写入
+        """
+        self._store(key, self.OVERFLOW if len(book_ids) > self.max_ids else tuple(book_ids), version)
+
+    def put_facets(self, key, facets, version):
+        """
+        写入分面计数（与同一查询的图书ID列表分别缓存，键为 ('facets', 缓存键)）
+        :param key: 缓存键
+        :param facets: 分面计数字典，读取方不得修改
+        :param version: 计算结果时的目录版本号，已过期则不写入
+        """
+        self._store(('facets', key), facets, version)
+
+    def _store(self, key, value, version):
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            if version != catalog_version():
+                return
+            self._entries[key] = (version, expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        获取缓存统计信息
+        :return: 命中、未命中、淘汰次数及容量等信息
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'max_ids': self.max_ids,
+                'ttl': self.ttl,
+                'catalog_version': catalog_version()
+            }
+
+
+search_cache = SearchResultCache()
+
+
+@on_catalog_change
+def _invalidate(changes):
+    search_cache.clear()
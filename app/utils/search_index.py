@@ -0,0 +1,211 @@
+"""
+图书全文检索索引
+基于 SQLite FTS5 虚拟表（books_fts）建立倒排索引，rowid 与 books.id 一一对应，
+通过 ORM 映射事件与 Book 的增删改保持同步
+"""
+import re
+
+from sqlalchemy import Float, Integer, event, func, inspect, literal_column, select, table, text
+
+from app import db
+from app.models.book import Book
+
+FTS_TABLE = 'books_fts'
+
+# 参与全文检索的字段（顺序即 FTS5 中的列顺序）
+FTS_COLUMNS = ('title', 'author', 'isbn', 'description')
+
+# BM25 相关度的列权重，顺序与 FTS_COLUMNS 一致：书名命中最重要，描述命中最次要
+BM25_WEIGHTS = (10.0, 5.0, 3.0, 1.0)
+
+# 中日韩统一表意文字（含扩展A区、兼容区）
+CJK_CHARS = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_CJK_RE = re.compile(f'[{CJK_CHARS}]')
+# 单个汉字作为一个词元；字母数字连续串作为一个词元
+_TOKEN_RE = re.compile(f'[{CJK_CHARS}]|(?:(?![{CJK_CHARS}])[^\\W_])+')
+
+# 当前进程是否启用了FTS5索引（非SQLite数据库或SQLite未编译FTS5时为False）
+_fts_enabled = False
+
+
+# ========== 分词 ==========
+def tokenize(value):
+    """
+    将文本切分为检索词元
+    汉字逐字切分，英文和数字按连续串切分，统一转为小写
+    :param value: 原始文本
+    :return: 词元列表
+    """
+    if not value:
+        return []
+    return _TOKEN_RE.findall(str(value).lower())
+
+
+def is_cjk_token(token):
+    """检查词元是否为汉字"""
+    return bool(_CJK_RE.fullmatch(token))
+
+
+def build_match_expression(query):
+    """
+    将用户输入转换为 FTS5 MATCH 表达式
+    每个空白分隔的词构成一个短语（保证汉字相邻，等价于子串匹配），
+    以字母数字结尾的短语追加前缀匹配，多个短语之间为 AND 关系
+    :param query: 用户输入的搜索关键词
+    :return: MATCH 表达式，无有效词元时返回None
+    """
+    phrases = []
+    for word in query.split():
+        tokens = tokenize(word)
+        if not tokens:
+            continue
+        phrase = '"' + ' '.join(tokens) + '"'
+        if not is_cjk_token(tokens[-1]):
+            phrase += '*'
+        phrases.append(phrase)
+    return ' '.join(phrases) or None
+
+
+def _index_row(book):
+    """生成写入FTS表的一行数据（已分词、空格分隔）"""
+    return {
+        'rowid': book.id,
+        'title': ' '.join(tokenize(book.title)),
+        'author': ' '.join(tokenize(book.author)),
+        'isbn': ' '.join(tokenize(book.isbn)),
+        'description': ' '.join(tokenize(book.description)),
+    }
+
+
+_INSERT_SQL = text(
+    f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+    f"VALUES (:rowid, {', '.join(':' + c for c in FTS_COLUMNS)})"
+)
+_DELETE_SQL = text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid")
+
+
+# ========== 初始化与重建 ==========
+def is_enabled():
+    """当前是否使用FTS5索引检索"""
+    return _fts_enabled
+
+
+def init_search_index():
+    """
+    创建FTS5虚拟表，若索引行数与图书数不一致则重建
+    需在应用上下文中调用
+    :return: 是否启用FTS5
+    """
+    global _fts_enabled
+    if db.engine.dialect.name != 'sqlite':
+        _fts_enabled = False
+        return False
+
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5({', '.join(FTS_COLUMNS)}, tokenize='unicode61')"
+            ))
+    except Exception as e:
+        print(f"⚠️  FTS5不可用，图书检索回退为模糊匹配: {e}")
+        _fts_enabled = False
+        return False
+
+    _fts_enabled = True
+    indexed = db.session.execute(text(f"SELECT COUNT(*) FROM {FTS_TABLE}")).scalar()
+    total = db.session.query(func.count(Book.id)).scalar()
+    if indexed != total:
+        rebuild_search_index()
+    return True
+
+
+def rebuild_search_index(batch_size=1000):
+    """
+    清空并重建全文索引
+    :param batch_size: 每批写入的图书数量
+    :return: 索引的图书数量
+    """
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    count = 0
+    last_id = 0
+    while True:
+        books = Book.query.filter(Book.id > last_id).order_by(Book.id).limit(batch_size).all()
+        if not books:
+            break
+        db.session.execute(_INSERT_SQL, [_index_row(book) for book in books])
+        count += len(books)
+        last_id = books[-1].id
+    db.session.commit()
+    print(f"✅ 图书全文索引重建完成，共索引 {count} 本图书")
+    return count
+
+
+def index_books(books):
+    """
+    将一批新图书写入全文索引（批量导入等绕过ORM映射事件的写入需手动调用）
+    :param books: 带 id 及各检索字段属性的对象序列
+    """
+    if _fts_enabled and books:
+        db.session.execute(_INSERT_SQL, [_index_row(book) for book in books])
+
+
+# ========== 检索条件 ==========
+def match_book_ids(query):
+    """
+    构造匹配关键词的图书ID子查询
+    :param query: 用户输入的搜索关键词
+    :return: 可用于 Book.id.in_() 的子查询；FTS未启用或无有效词元时返回None
+    """
+    if not _fts_enabled:
+        return None
+    expression = build_match_expression(query)
+    if expression is None:
+        return None
+    return select(literal_column('rowid')).select_from(
+        table(FTS_TABLE)
+    ).where(text(f"{FTS_TABLE} MATCH :fts_query").bindparams(fts_query=expression))
+
+
+def ranked_book_ids(query):
+    """
+    构造带 BM25 相关度的匹配子查询，得分由 FTS5 在索引内计算
+    :param query: 用户输入的搜索关键词
+    :return: 子查询，列为 book_id、score（越小越相关）；FTS未启用或无有效词元时返回None
+    """
+    if not _fts_enabled:
+        return None
+    expression = build_match_expression(query)
+    if expression is None:
+        return None
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    return select(
+        literal_column('rowid', Integer).label('book_id'),
+        literal_column(f"bm25({FTS_TABLE}, {weights})", Float).label('score')
+    ).select_from(
+        table(FTS_TABLE)
+    ).where(text(f"{FTS_TABLE} MATCH :fts_query").bindparams(fts_query=expression)).subquery()
+
+
+# ========== 与Book表同步 ==========
+@event.listens_for(Book, 'after_insert')
+def _index_book_on_insert(mapper, connection, target):
+    if _fts_enabled:
+        connection.execute(_INSERT_SQL, _index_row(target))
+
+
+@event.listens_for(Book, 'after_update')
+def _index_book_on_update(mapper, connection, target):
+    if not _fts_enabled:
+        return
+    state = inspect(target)
+    if not any(state.attrs[column].history.has_changes() for column in FTS_COLUMNS):
+        return
+    connection.execute(_DELETE_SQL, {'rowid': target.id})
+    connection.execute(_INSERT_SQL, _index_row(target))
+
+
+@event.listens_for(Book, 'after_delete')
+def _index_book_on_delete(mapper, connection, target):
+    if _fts_enabled:
+        connection.execute(_DELETE_SQL, {'rowid': target.id})
@@ -0,0 +1,193 @@
+"""
+图书拼音与二元组检索键
+为每本图书的书名、作者预先生成检索键写入 book_search_keys 表：
+    - bigram：相邻汉字二元组，如“三国”“国演”
+    - pinyin：从每个音节起始的全拼后缀，如“sanguoyanyi”“guoyanyi”
+    - initials：从每个音节起始的首字母后缀，如“sgyy”“gyy”
+检索时对 (key, book_id) 复合索引做等值或前缀范围探测，不扫描图书表
+"""
+import re
+from functools import lru_cache
+
+from sqlalchemy import delete, event, func, insert, inspect, select
+
+from app import db
+from app.models.book import Book
+from app.models.book_search_key import BookSearchKey
+from app.utils.search_index import CJK_CHARS
+
+_CJK_RUN_RE = re.compile(f'[{CJK_CHARS}]+')
+_PINYIN_QUERY_RE = re.compile(r'^[a-z\s]+$')
+_WORD_RE = re.compile(r'[^\W_]')
+
+# 检索键最大长度，与 BookSearchKey.key 字段长度一致
+MAX_KEY_LENGTH = 100
+
+# 参与生成检索键的字段
+KEY_FIELDS = ('title', 'author')
+
+
+@lru_cache(maxsize=4096)
+def _pinyin(text):
+    """
+    获取汉字串的全拼与首字母音节序列
+    pypinyin 较重，首次使用时才导入；未安装时不生成拼音检索键。
+    作者名、丛书名等重复度高，结果按汉字串缓存，批量生成时避免重复转换
+    :param text: 连续汉字串
+    :return: (全拼音节元组, 首字母元组)
+    """
+    try:
+        from pypinyin import Style, lazy_pinyin
+    except ImportError:
+        return (), ()
+    return tuple(lazy_pinyin(text)), tuple(lazy_pinyin(text, style=Style.FIRST_LETTER))
+
+
+def _bigrams(run):
+    """生成连续汉字串的相邻二元组"""
+    return {run[i:i + 2] for i in range(len(run) - 1)}
+
+
+def _suffix_keys(syllables):
+    """由音节列表生成从每个音节起始的后缀检索键"""
+    return {''.join(syllables[i:])[:MAX_KEY_LENGTH] for i in range(len(syllables))}
+
+
+def build_keys(*values):
+    """
+    为若干文本生成检索键
+    :param values: 书名、作者等文本
+    :return: {(key, kind)} 集合
+    """
+    keys = set()
+    for value in values:
+        for run in _CJK_RUN_RE.findall(value or ''):
+            keys.update((key, 'bigram') for key in _bigrams(run))
+            full, initials = _pinyin(run)
+            keys.update((key, 'pinyin') for key in _suffix_keys(full))
+            keys.update((key, 'initials') for key in _suffix_keys(initials))
+    return keys
+
+
+def _key_rows(book):
+    """生成一本图书的检索键行"""
+    return [
+        {'book_id': book.id, 'key': key, 'kind': kind}
+        for key, kind in build_keys(*(getattr(book, field) for field in KEY_FIELDS))
+    ]
+
+
+# ========== 初始化与重建 ==========
+def init_search_keys():
+    """
+    检索键表为空而图书表不为空时（如首次升级）全量生成检索键
+    需在应用上下文中调用
+    """
+    has_keys = db.session.execute(select(BookSearchKey.id).limit(1)).first()
+    if has_keys is None and db.session.query(func.count(Book.id)).scalar():
+        rebuild_search_keys()
+
+
+def rebuild_search_keys(batch_size=1000):
+    """
+    清空并重建全部图书的检索键
+    :param batch_size: 每批处理的图书数量
+    :return: 生成的检索键数量
+    """
+    db.session.execute(delete(BookSearchKey))
+    count = 0
+    last_id = 0
+    while True:
+        books = db.session.execute(
+            select(Book.id, *(getattr(Book, field) for field in KEY_FIELDS))
+            .where(Book.id > last_id).order_by(Book.id).limit(batch_size)
+        ).all()
+        if not books:
+            break
+        rows = [row for book in books for row in _key_rows(book)]
+        if rows:
+            db.session.execute(insert(BookSearchKey), rows)
+        count += len(rows)
+        last_id = books[-1].id
+    db.session.commit()
+    print(f"✅ 图书检索键重建完成，共生成 {count} 个检索键")
+    return count
+
+
+def add_search_keys(books):
+    """
+    为一批新图书生成检索键（批量导入等绕过ORM映射事件的写入需手动调用）
+    :param books: 带 id、title、author 属性的对象序列
+    :return: 生成的检索键数量
+    """
+    rows = [row for book in books for row in _key_rows(book)]
+    if rows:
+        db.session.execute(insert(BookSearchKey.__table__), rows)
+    return len(rows)
+
+
+# ========== 检索条件 ==========
+def match_book_ids(query):
+    """
+    构造检索键匹配的图书ID子查询
+        - 纯字母输入：按全拼、首字母前缀做范围探测，如“sanguo”“sgyy”
+        - 含两个及以上汉字：要求所有汉字二元组均命中；汉字以外的词不参与，见 residual_query
+    :param query: 用户输入的搜索关键词
+    :return: 可用于 Book.id.in_() 的子查询，不适用时返回None
+    """
+    normalized = query.strip().lower()
+    if _PINYIN_QUERY_RE.match(normalized):
+        prefix = re.sub(r'\s+', '', normalized)[:MAX_KEY_LENGTH]
+        return select(BookSearchKey.book_id).where(
+            BookSearchKey.key >= prefix,
+            BookSearchKey.key < prefix + '\uffff',
+            BookSearchKey.kind.in_(['pinyin', 'initials'])
+        )
+
+    bigrams = set()
+    for run in _CJK_RUN_RE.findall(normalized):
+        bigrams.update(_bigrams(run))
+    if not bigrams:
+        return None
+    return select(BookSearchKey.book_id).where(
+        BookSearchKey.key.in_(bigrams)
+    ).group_by(BookSearchKey.book_id).having(
+        func.count(func.distinct(BookSearchKey.key)) == len(bigrams)
+    )
+
+
+def residual_query(query):
+    """
+    检索键未覆盖的部分：汉字与字母、数字混合的输入去掉汉字后剩余的词，
+    检索键命中的图书还需匹配这些词才满足“所有词均匹配”；纯汉字或纯字母输入返回空串
+    :param query: 用户输入的搜索关键词
+    :return: 剩余的关键词（空白分隔）
+    """
+    normalized = query.strip().lower()
+    if _PINYIN_QUERY_RE.match(normalized):
+        return ''
+    return ' '.join(word for word in _CJK_RUN_RE.sub(' ', normalized).split() if _WORD_RE.search(word))
+
+
+# ========== 与Book表同步 ==========
+@event.listens_for(Book, 'after_insert')
+def _add_keys_on_insert(mapper, connection, target):
+    rows = _key_rows(target)
+    if rows:
+        connection.execute(insert(BookSearchKey), rows)
+
+
+@event.listens_for(Book, 'after_update')
+def _refresh_keys_on_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in KEY_FIELDS):
+        return
+    connection.execute(delete(BookSearchKey).where(BookSearchKey.book_id == target.id))
+    rows = _key_rows(target)
+    if rows:
+        connection.execute(insert(BookSearchKey), rows)
+
+
+@event.listens_for(Book, 'before_delete')
+def _remove_keys_on_delete(mapper, connection, target):
+    connection.execute(delete(BookSearchKey).where(BookSearchKey.book_id == target.id))
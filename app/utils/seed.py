@@ -0,0 +1,467 @@
+"""
+默认数据初始化
+默认管理员、读者、分类、图书在一个事务内批量写入，按唯一键（用户名/邮箱、分类名称、ISBN）
+冲突时跳过已存在的行，可重复执行；写入后记录默认数据的指纹，
+应用启动时只需一次查询比对指纹即可判断是否需要初始化
+"""
+import hashlib
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app import db
+from app.models import Admin, AppMeta, Book, Category, User
+from app.utils import search_index, search_keys
+from app.utils.catalog_events import notify_catalog_change
+from app.utils.category_tree import rebuild_category_closure
+from app.utils.passwords import password_hasher
+
+# 默认数据或写入规则变化时递增，使已记录的指纹失效
+SEED_VERSION = 1
+
+# 指纹在 app_meta 表中的键
+FINGERPRINT_KEY = 'seed_fingerprint'
+
+# 默认管理员
+DEFAULT_ADMINS = [
+    {
+        'username': 'superadmin',
+        'email': 'superadmin@library.com',
+        'password': '123456',
+        'real_name': '系统超级管理员',
+        'role': 'super_admin'
+    },
+    {
+        'username': 'libadmin',
+        'email': 'admin@library.com',
+        'password': '123456',
+        'real_name': '图书管理员',
+        'role': 'admin'
+    }
+]
+
+# 默认读者
+DEFAULT_USERS = [
+    {
+        'username': 'student1',
+        'email': 'student1@example.com',
+        'password': 'Student123',
+        'phone': '13800138001',
+        'address': '计算机科学学院 2020级1班'
+    },
+    {
+        'username': 'student2',
+        'email': 'student2@example.com',
+        'password': 'Student456',
+        'phone': '13800138002',
+        'address': '信息工程学院 2021级2班'
+    },
+    {
+        'username': 'teacher1',
+        'email': 'teacher1@example.com',
+        'password': 'Teacher789',
+        'phone': '13900139001',
+        'address': '文学院 教授办公室'
+    },
+    {
+        'username': 'staff1',
+        'email': 'staff1@example.com',
+        'password': 'Staff123',
+        'phone': '13700137001',
+        'address': '图书馆办公室'
+    },
+    {
+        'username': 'testuser',
+        'email': 'test@library.com',
+        'password': 'Test123456',
+        'phone': '13600136001',
+        'address': '测试用户地址'
+    }
+]
+
+# 默认分类（按层级排列，父分类在前；parent 为父分类名称，None 表示顶级分类）
+DEFAULT_CATEGORIES = [
+    {'name': '文学艺术', 'parent': None, 'description': '小说、散文、诗歌等文学作品', 'sort_order': 1},
+    {'name': '科学技术', 'parent': None, 'description': '自然科学、工程技术等专业书籍', 'sort_order': 2},
+    {'name': '社会科学', 'parent': None, 'description': '经济、管理、法律等社会科学书籍', 'sort_order': 3},
+    {'name': '教育学习', 'parent': None, 'description': '教材、教辅、学习方法类书籍', 'sort_order': 4},
+    {'name': '生活休闲', 'parent': None, 'description': '生活、健康、旅游、美食等休闲类书籍', 'sort_order': 5},
+    # 文学艺术 - 子分类
+    {'name': '中国文学', 'parent': '文学艺术', 'description': '中国作家创作的文学作品', 'sort_order': 1},
+    {'name': '外国文学', 'parent': '文学艺术', 'description': '外国作家创作的文学作品', 'sort_order': 2},
+    {'name': '科幻奇幻', 'parent': '文学艺术', 'description': '科幻、奇幻、魔幻等类型小说', 'sort_order': 3},
+    {'name': '历史小说', 'parent': '文学艺术', 'description': '以历史为背景的小说作品', 'sort_order': 4},
+    # 科学技术 - 子分类
+    {'name': '计算机科学', 'parent': '科学技术', 'description': '编程、算法、软件开发等计算机相关书籍', 'sort_order': 1},
+    {'name': '数学物理', 'parent': '科学技术', 'description': '数学、物理学等基础科学书籍', 'sort_order': 2},
+    {'name': '工程技术', 'parent': '科学技术', 'description': '电子、机械、建筑等工程技术书籍', 'sort_order': 3},
+    {'name': '医学健康', 'parent': '科学技术', 'description': '医学、健康、养生类书籍', 'sort_order': 4},
+    # 社会科学 - 子分类
+    {'name': '经济管理', 'parent': '社会科学', 'description': '经济学、管理学、金融等商业类书籍', 'sort_order': 1},
+    {'name': '历史地理', 'parent': '社会科学', 'description': '历史、地理、文化类书籍', 'sort_order': 2},
+    {'name': '哲学心理', 'parent': '社会科学', 'description': '哲学、心理学、社会学类书籍', 'sort_order': 3},
+    {'name': '政治法律', 'parent': '社会科学', 'description': '政治学、法律、国际关系类书籍', 'sort_order': 4},
+    # 计算机科学 - 子分类
+    {'name': '编程语言', 'parent': '计算机科学', 'description': '各种编程语言学习书籍', 'sort_order': 1},
+    {'name': '算法与数据结构', 'parent': '计算机科学', 'description': '算法、数据结构、计算机理论', 'sort_order': 2},
+    {'name': '人工智能', 'parent': '计算机科学', 'description': '机器学习、深度学习、人工智能', 'sort_order': 3},
+    {'name': '软件开发', 'parent': '计算机科学', 'description': '软件工程、系统设计、项目管理', 'sort_order': 4},
+]
+
+# 默认图书（category 为分类名称）
+DEFAULT_BOOKS = [
+    {
+        'isbn': '9787020002207',
+        'title': '红楼梦',
+        'author': '曹雪芹',
+        'publisher': '人民文学出版社',
+        'publish_date': datetime(2008, 7, 1),
+        'edition': '第3版',
+        'language': '中文',
+        'pages': 1606,
+        'price': 59.70,
+        'cover_image': '',
+        'description': '中国古典小说巅峰之作，以贾、史、王、薛四大家族的兴衰为背景，描绘了一批举止见识出于须眉之上的闺阁佳人的人生百态。',
+        'total_copies': 10,
+        'available_copies': 8,
+        'category': '中国文学',
+        'status': 1
+    },
+    {
+        'isbn': '9787020002208',
+        'title': '三国演义',
+        'author': '罗贯中',
+        'publisher': '人民文学出版社',
+        'publish_date': datetime(1998, 5, 1),
+        'edition': '第2版',
+        'language': '中文',
+        'pages': 990,
+        'price': 39.50,
+        'cover_image': '',
+        'description': '中国第一部长篇章回体历史演义小说，描写了从东汉末年到西晋初年之间近百年的历史风云。',
+        'total_copies': 8,
+        'available_copies': 6,
+        'category': '历史小说',
+        'status': 1
+    },
+    {
+        'isbn': '9787530216714',
+        'title': '活着',
+        'author': '余华',
+        'publisher': '作家出版社',
+        'publish_date': datetime(2012, 8, 1),
+        'edition': '第1版',
+        'language': '中文',
+        'pages': 191,
+        'price': 28.00,
+        'cover_image': '',
+        'description': '讲述在大时代背景下，徐福贵的人生和家庭不断经受着苦难，到了最后所有亲人都先后离他而去。',
+        'total_copies': 15,
+        'available_copies': 12,
+        'category': '中国文学',
+        'status': 1
+    },
+    {
+        'isbn': '9787532760298',
+        'title': '三体',
+        'author': '刘慈欣',
+        'publisher': '重庆出版社',
+        'publish_date': datetime(2008, 1, 1),
+        'edition': '第1版',
+        'language': '中文',
+        'pages': 302,
+        'price': 23.00,
+        'cover_image': '',
+        'description': '讲述了地球人类文明和三体文明的信息交流、生死搏杀及两个文明在宇宙中的兴衰历程。',
+        'total_copies': 12,
+        'available_copies': 9,
+        'category': '科幻奇幻',
+        'status': 1
+    },
+    {
+        'isbn': '9787544253994',
+        'title': '百年孤独',
+        'author': '加西亚·马尔克斯',
+        'publisher': '南海出版公司',
+        'publish_date': datetime(2011, 6, 1),
+        'edition': '第1版',
+        'language': '中文',
+        'pages': 360,
+        'price': 39.50,
+        'cover_image': '',
+        'description': '魔幻现实主义文学的代表作，描写了布恩迪亚家族七代人的传奇故事。',
+        'total_copies': 9,
+        'available_copies': 7,
+        'category': '外国文学',
+        'status': 1
+    },
+    {
+        'isbn': '9787111126768',
+        'title': 'C程序设计语言',
+        'author': 'Brian W. Kernighan, Dennis M. Ritchie',
+        'publisher': '机械工业出版社',
+        'publish_date': datetime(2004, 1, 1),
+        'edition': '第2版',
+        'language': '中文',
+        'pages': 258,
+        'price': 30.00,
+        'cover_image': '',
+        'description': 'C语言程序设计的经典教材，全面、系统地讲述了C语言的各个特性及程序设计的基本方法。',
+        'total_copies': 20,
+        'available_copies': 18,
+        'category': '编程语言',
+        'status': 1
+    },
+    {
+        'isbn': '9787302272064',
+        'title': 'Python编程：从入门到实践',
+        'author': 'Eric Matthes',
+        'publisher': '人民邮电出版社',
+        'publish_date': datetime(2016, 7, 1),
+        'edition': '第1版',
+        'language': '中文',
+        'pages': 459,
+        'price': 89.00,
+        'cover_image': '',
+        'description': '一本针对所有层次的Python读者而作的Python入门书，从最基础的概念开始，逐步引导读者完成复杂的项目。',
+        'total_copies': 25,
+        'available_copies': 22,
+        'category': '编程语言',
+        'status': 1
+    },
+    {
+        'isbn': '9787121318020',
+        'title': '机器学习',
+        'author': '周志华',
+        'publisher': '清华大学出版社',
+        'publish_date': datetime(2016, 1, 1),
+        'edition': '第1版',
+        'language': '中文',
+        'pages': 425,
+        'price': 88.00,
+        'cover_image': '',
+        'description': '机器学习领域经典教材，系统全面地介绍了机器学习的基础概念、经典方法和前沿进展。',
+        'total_copies': 15,
+        'available_copies': 12,
+        'category': '人工智能',
+        'status': 1
+    },
+    {
+        'isbn': '9787544291170',
+        'title': '经济学原理',
+        'author': 'N. Gregory Mankiw',
+        'publisher': '北京大学出版社',
+        'publish_date': datetime(2015, 5, 1),
+        'edition': '第7版',
+        'language': '中文',
+        'pages': 850,
+        'price': 128.00,
+        'cover_image': '',
+        'description': '世界上最流行的经济学入门教材，以浅显易懂的语言和生动有趣的案例介绍了经济学的基本原理。',
+        'total_copies': 18,
+        'available_copies': 15,
+        'category': '经济管理',
+        'status': 1
+    },
+    {
+        'isbn': '9787510840984',
+        'title': '人类简史：从动物到上帝',
+        'author': '尤瓦尔·赫拉利',
+        'publisher': '中信出版社',
+        'publish_date': datetime(2014, 11, 1),
+        'edition': '第1版',
+        'language': '中文',
+        'pages': 440,
+        'price': 68.00,
+        'cover_image': '',
+        'description': '讲述了人类从石器时代至21世纪的演化与发展史，并将人类历史分为四个阶段。',
+        'total_copies': 14,
+        'available_copies': 11,
+        'category': '历史地理',
+        'status': 1
+    },
+    {
+        'isbn': '9787108041531',
+        'title': '中国哲学简史',
+        'author': '冯友兰',
+        'publisher': '北京大学出版社',
+        'publish_date': datetime(2013, 1, 1),
+        'edition': '第1版',
+        'language': '中文',
+        'pages': 320,
+        'price': 38.00,
+        'cover_image': '',
+        'description': '系统介绍中国哲学发展历史的经典著作，从先秦诸子到近现代思想家的哲学思想。',
+        'total_copies': 12,
+        'available_copies': 10,
+        'category': '哲学心理',
+        'status': 1
+    },
+    {
+        'isbn': '9787301217076',
+        'title': '高等数学',
+        'author': '同济大学数学系',
+        'publisher': '高等教育出版社',
+        'publish_date': datetime(2014, 7, 1),
+        'edition': '第7版',
+        'language': '中文',
+        'pages': 456,
+        'price': 42.80,
+        'cover_image': '',
+        'description': '高等学校理工科专业高等数学课程的经典教材，内容全面，讲解清晰。',
+        'total_copies': 30,
+        'available_copies': 25,
+        'category': '数学物理',
+        'status': 1
+    }
+]
+
+def seed_fingerprint():
+    """
+    默认数据的指纹
+    :return: 十六进制摘要字符串
+    """
+    payload = json.dumps([SEED_VERSION, DEFAULT_ADMINS, DEFAULT_USERS, DEFAULT_CATEGORIES, DEFAULT_BOOKS],
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def stored_fingerprint():
+    """
+    数据库中记录的指纹（一次查询）
+    需在应用上下文中调用
+    :return: 指纹字符串，尚未初始化（含表不存在）时返回None
+    """
+    try:
+        return db.session.execute(
+            select(AppMeta.value).where(AppMeta.key == FINGERPRINT_KEY)
+        ).scalar()
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        return None
+
+
+def is_seeded():
+    """默认数据是否已按当前版本写入"""
+    return stored_fingerprint() == seed_fingerprint()
+
+
+def _insert_ignore(model):
+    """唯一键冲突时跳过的批量 INSERT 语句"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert(model.__table__).on_conflict_do_nothing()
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert(model.__table__).on_conflict_do_nothing()
+    if dialect in ('mysql', 'mariadb'):
+        from sqlalchemy import insert
+        return insert(model.__table__).prefix_with('IGNORE')
+    raise RuntimeError(f'不支持的数据库类型: {dialect}')
+
+
+# ========== 各类默认数据 ==========
+def _seed_accounts(model, accounts, **extra):
+    """
+    写入默认账户，只为尚不存在的用户名计算密码哈希
+    :return: 新增的账户数量
+    """
+    usernames = [account['username'] for account in accounts]
+    existing = set(db.session.execute(
+        select(model.username).where(model.username.in_(usernames))
+    ).scalars())
+    rows = [
+        dict({key: value for key, value in account.items() if key != 'password'},
+             password_hash=password_hasher.hash(account['password']), **extra)
+        for account in accounts if account['username'] not in existing
+    ]
+    if not rows:
+        return 0
+    return len(db.session.execute(_insert_ignore(model).returning(model.id), rows).all())
+
+
+def _seed_categories():
+    """
+    逐层写入默认分类（父分类先写入，子分类的 parent_id 按名称解析）
+    :return: 新增的分类数量
+    """
+    category_ids = dict(db.session.execute(select(Category.name, Category.id)).all())
+    pending = list(DEFAULT_CATEGORIES)
+    created = 0
+    while pending:
+        ready = [item for item in pending if item['parent'] is None or item['parent'] in category_ids]
+        if not ready:
+            raise ValueError(f"默认分类的父分类不存在: {', '.join(item['parent'] for item in pending)}")
+        rows = [{
+            'name': item['name'],
+            'parent_id': category_ids[item['parent']] if item['parent'] else 0,
+            'description': item['description'],
+            'sort_order': item['sort_order'],
+        } for item in ready if item['name'] not in category_ids]
+        if rows:
+            inserted = db.session.execute(
+                _insert_ignore(Category).returning(Category.name, Category.id), rows
+            ).all()
+            category_ids.update(inserted)
+            created += len(inserted)
+        pending = [item for item in pending if item not in ready]
+
+    if created:
+        # executemany 不触发映射事件，闭包表在同一事务内重建
+        rebuild_category_closure(commit=False)
+    return created
+
+
+def _seed_books():
+    """
+    写入默认图书，并同步全文索引与检索键
+    :return: 新增图书的 SimpleNamespace 列表
+    """
+    category_ids = dict(db.session.execute(select(Category.name, Category.id)).all())
+    rows = []
+    for item in DEFAULT_BOOKS:
+        category_id = category_ids.get(item['category'])
+        if category_id is None:
+            print(f"⚠️  图书 '{item['title']}' 的分类不存在，跳过")
+            continue
+        rows.append(dict({key: value for key, value in item.items() if key != 'category'},
+                         category_id=category_id))
+
+    inserted = db.session.execute(_insert_ignore(Book).returning(Book.id, Book.isbn), rows).all()
+    rows_by_isbn = {row['isbn']: row for row in rows}
+    books = [SimpleNamespace(id=book_id, **rows_by_isbn[isbn]) for book_id, isbn in inserted]
+    search_index.index_books(books)
+    search_keys.add_search_keys(books)
+    return books
+
+
+def seed_database():
+    """
+    创建缺失的数据表并写入默认数据，全部写入在一个事务内完成，可重复执行
+    需在应用上下文中调用
+    :return: 各类数据新增数量 {'admins', 'users', 'categories', 'books'}
+    """
+    db.create_all()
+    # 全文索引虚拟表不在模型元数据中，随数据表一起创建
+    search_index.init_search_index()
+    try:
+        counts = {
+            'admins': _seed_accounts(Admin, DEFAULT_ADMINS, status=1),
+            'users': _seed_accounts(User, DEFAULT_USERS, status=1),
+            'categories': _seed_categories(),
+        }
+        books = _seed_books()
+        counts['books'] = len(books)
+        db.session.merge(AppMeta(key=FINGERPRINT_KEY, value=seed_fingerprint()))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if counts['categories'] or books:
+        notify_catalog_change([('insert', book.id, vars(book)) for book in books])
+    return counts
@@ -0,0 +1,153 @@
+"""
+请求级SQL性能统计
+挂接 SQLAlchemy 引擎事件与 Flask 请求钩子，记录每个请求执行的语句数、数据库耗时，
+并按“语句形状”（参数占位、IN 列表长度归一后的SQL）统计重复次数，
+同一形状重复执行达到阈值的标记为疑似 N+1 查询。
+结果写入响应头 X-DB-Queries / X-DB-Time，最近的请求保存在内存中供 /admin/debug/perf 查看。
+未开启（SQL_PERF_ENABLED=False）时不注册任何事件和钩子，没有额外开销
+"""
+import re
+import time
+from collections import Counter, deque
+from threading import Lock
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+_IN_LIST_RE = re.compile(r'\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))+\s*\)')
+_NUMBER_RE = re.compile(r'\b\d+\b')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_G_KEY = '_sql_perf'
+
+
+def statement_shape(statement):
+    """
+    归一化SQL语句：合并空白、将 IN 列表与数字字面量统一为占位符
+    :param statement: SQL语句
+    :return: 语句形状字符串
+    """
+    shape = _WHITESPACE_RE.sub(' ', statement).strip()
+    shape = _IN_LIST_RE.sub('(?)', shape)
+    return _NUMBER_RE.sub('N', shape)
+
+
+class RequestPerf:
+    """
+    单个请求的SQL统计
+    """
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.status_code = None
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.query_count = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+        self.shape_times = Counter()
+
+    def record(self, statement, duration):
+        """记录一条语句的执行"""
+        shape = statement_shape(statement)
+        self.query_count += 1
+        self.db_time += duration
+        self.shapes[shape] += 1
+        self.shape_times[shape] += duration
+
+    def suspects(self, threshold):
+        """
+        疑似 N+1 的语句形状
+        :param threshold: 同一形状重复执行的次数阈值
+        :return: [(形状, 次数, 总耗时秒数), ...]，按次数倒序
+        """
+        return [(shape, count, self.shape_times[shape])
+                for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+class SqlPerfMonitor:
+    """
+    SQL性能监视器
+    保存最近 history 个请求的统计结果
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.n1_threshold = 5
+        self._history = deque(maxlen=100)
+        self._lock = Lock()
+
+    def init_app(self, app, *engines):
+        """
+        按配置注册引擎事件与请求钩子
+        :param app: Flask 应用
+        :param engines: SQLAlchemy 引擎（主库及只读副本）
+        """
+        self.enabled = app.config.get('SQL_PERF_ENABLED', False)
+        if not self.enabled:
+            return
+        self.n1_threshold = app.config.get('SQL_PERF_N1_THRESHOLD', 5)
+        self._history = deque(maxlen=app.config.get('SQL_PERF_HISTORY', 100))
+
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(engine, 'handle_error', _discard_timer)
+        app.before_request(_start_request)
+        app.after_request(self._finish_request)
+
+    def _finish_request(self, response):
+        perf = g.pop(_G_KEY, None)
+        if perf is None:
+            return response
+        perf.status_code = response.status_code
+        perf.elapsed = time.perf_counter() - perf.started
+        response.headers['X-DB-Queries'] = str(perf.query_count)
+        response.headers['X-DB-Time'] = f'{perf.db_time * 1000:.1f}ms'
+        suspects = perf.suspects(self.n1_threshold)
+        if suspects:
+            response.headers['X-DB-N1-Suspects'] = str(len(suspects))
+        with self._lock:
+            self._history.append(perf)
+        return response
+
+    def recent(self):
+        """
+        最近的请求统计
+        :return: RequestPerf 列表，最新的在前
+        """
+        with self._lock:
+            return list(reversed(self._history))
+
+    def clear(self):
+        """清空已保存的统计"""
+        with self._lock:
+            self._history.clear()
+
+
+sql_perf = SqlPerfMonitor()
+
+
+# ========== 请求钩子与引擎事件 ==========
+def _start_request():
+    setattr(g, _G_KEY, RequestPerf(request.method, request.full_path.rstrip('?')))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('sql_perf_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['sql_perf_started'].pop()
+    if has_request_context():
+        perf = g.get(_G_KEY)
+        if perf is not None:
+            perf.record(statement, time.perf_counter() - started)
+
+
+def _discard_timer(exception_context):
+    # 语句执行失败时不会触发 after_cursor_execute，丢弃对应的计时起点
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('sql_perf_started'):
+        connection.info['sql_perf_started'].pop()
@@ -0,0 +1,125 @@
+"""
+仪表盘统计快照
+两个仪表盘共用的全局计数（图书、读者、借阅中、待审核请求等）一次查询全部得出，
+在进程内缓存 ttl 秒；图书、读者、借阅记录的增删及借阅状态变化提交后立即失效，
+页面访问不再直接执行 COUNT 统计
+"""
+import time
+from threading import Lock
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models import Book, BorrowRecord, User
+from app.utils.catalog_events import on_catalog_change
+from app.utils.db_routing import primary_reads
+
+_SESSION_KEY = 'stats_changed'
+
+
+def compute_stats():
+    """
+    一次查询计算全部仪表盘计数（各计数为同一条 SELECT 中的标量子查询）
+    需在应用上下文中调用
+    :return: 计数字典
+    """
+    def count(column, *conditions):
+        return select(func.count(column)).where(*conditions).scalar_subquery()
+
+    row = db.session.execute(select(
+        count(Book.id).label('total_books'),
+        select(func.coalesce(func.sum(Book.available_copies), 0)).scalar_subquery().label('available_copies'),
+        count(User.id).label('total_users'),
+        count(User.id, User.status == 2).label('pending_registrations'),
+        count(BorrowRecord.id, BorrowRecord.status == 0).label('active_borrows'),
+        count(BorrowRecord.id, BorrowRecord.status == 3).label('pending_borrow_requests'),
+    )).one()
+    return dict(row._mapping)
+
+
+class StatsSnapshot:
+    """
+    统计快照缓存
+    过期或被写操作失效后，下一次读取时重新计算；
+    计算期间发生失效时不写回旧结果
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._values = None
+        self._expires_at = 0
+        self._generation = 0
+        self._lock = Lock()
+
+    def configure(self, ttl=None):
+        """根据配置调整有效期，并清空已有快照"""
+        if ttl is not None:
+            self.ttl = ttl
+        self.invalidate()
+
+    def get(self):
+        """
+        获取统计快照
+        :return: 计数字典，见 compute_stats
+        """
+        with self._lock:
+            if self._values is not None and time.monotonic() < self._expires_at:
+                return self._values
+            generation = self._generation
+
+        # 快照跨请求复用，从主库读取
+        with primary_reads():
+            values = compute_stats()
+        with self._lock:
+            if generation == self._generation and self.ttl > 0:
+                self._values = values
+                self._expires_at = time.monotonic() + self.ttl
+        return values
+
+    def invalidate(self):
+        """使当前快照失效"""
+        with self._lock:
+            self._generation += 1
+            self._values = None
+
+
+dashboard_stats = StatsSnapshot()
+
+
+# ========== 写操作触发失效 ==========
+def _mark_changed(target):
+    session = object_session(target)
+    if session is not None:
+        session.info[_SESSION_KEY] = True
+
+
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_delete')
+@event.listens_for(BorrowRecord, 'after_insert')
+@event.listens_for(BorrowRecord, 'after_delete')
+def _record_row_change(mapper, connection, target):
+    _mark_changed(target)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(BorrowRecord, 'after_update')
+def _record_status_change(mapper, connection, target):
+    if inspect(target).attrs.status.history.has_changes():
+        _mark_changed(target)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    if session.info.pop(_SESSION_KEY, False):
+        dashboard_stats.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop(_SESSION_KEY, None)
+
+
+@on_catalog_change
+def _invalidate_on_catalog_change(changes):
+    dashboard_stats.invalidate()
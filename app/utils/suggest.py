@@ -0,0 +1,204 @@
+"""
+搜索联想（输入即提示）
+进程内前缀索引：书名、作者、ISBN 规范化后存入有序数组，用 bisect 定位前缀区间，
+第一次联想请求时（或开启 SUGGEST_PRELOAD 时在启动时）全量构建，之后随本进程的目录变更增量维护，
+联想请求不访问数据库。
+其他进程中的图书变更不会通知本进程，索引构建超过 max_age 秒后在下一次联想请求时重建，
+多进程部署时这些变更最多延迟 max_age 秒可见
+"""
+import time
+from bisect import bisect_left, insort
+from threading import Lock
+
+from sqlalchemy import select
+
+from app import db
+from app.models.book import Book
+from app.utils.catalog_events import on_catalog_change
+from app.utils.db_routing import primary_reads
+
+# 参与联想的字段
+SUGGEST_FIELDS = ('title', 'author', 'isbn')
+
+
+def normalize_key(value):
+    """规范化联想键：去除首尾空白、连字符和空格并转为小写"""
+    return (value or '').strip().lower().replace('-', '').replace(' ', '')
+
+
+class PrefixIndex:
+    """
+    有序数组前缀索引
+    _keys 中每一项为 (规范化键, 字段, 原文)，相同项只存一份，
+    _refs 记录每一项被哪些图书引用，引用为空时才从数组中移除；
+    全量构建期间发生的增量变更先记下，构建完成后重放，避免被构建结果覆盖
+    """
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._built_at = 0
+        self._keys = []
+        self._refs = {}
+        self._book_entries = {}
+        self._pending = None
+        self.built = False
+        self._lock = Lock()
+        self._build_lock = Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def configure(self, max_age=None):
+        """根据配置调整重建间隔"""
+        if max_age is not None:
+            self.max_age = max_age
+
+    def stale(self):
+        """已构建且超过重建间隔时需要重建"""
+        return self.built and bool(self.max_age) and time.monotonic() - self._built_at > self.max_age
+
+    @staticmethod
+    def _entries(values):
+        """由图书字段值生成索引项"""
+        entries = []
+        for field in SUGGEST_FIELDS:
+            text = (values.get(field) or '').strip()
+            key = normalize_key(text)
+            if key:
+                entries.append((key, field, text))
+        return entries
+
+    def _add(self, book_id, values):
+        entries = self._entries(values)
+        for entry in entries:
+            refs = self._refs.get(entry)
+            if refs is None:
+                self._refs[entry] = refs = set()
+                insort(self._keys, entry)
+            refs.add(book_id)
+        self._book_entries[book_id] = entries
+
+    def _remove(self, book_id):
+        for entry in self._book_entries.pop(book_id, ()):
+            refs = self._refs.get(entry)
+            if refs is None:
+                continue
+            refs.discard(book_id)
+            if not refs:
+                del self._refs[entry]
+                position = bisect_left(self._keys, entry)
+                if position < len(self._keys) and self._keys[position] == entry:
+                    del self._keys[position]
+
+    def build(self, rows):
+        """
+        全量构建索引
+        :param rows: 可迭代的 (图书ID, 书名, 作者, ISBN)
+        """
+        with self._lock:
+            self._pending = []
+        refs = {}
+        book_entries = {}
+        for book_id, *field_values in rows:
+            entries = self._entries(dict(zip(SUGGEST_FIELDS, field_values)))
+            for entry in entries:
+                refs.setdefault(entry, set()).add(book_id)
+            book_entries[book_id] = entries
+        keys = sorted(refs)
+        with self._lock:
+            self._keys, self._refs, self._book_entries = keys, refs, book_entries
+            pending, self._pending = self._pending, None
+            for book_id, values in pending:
+                self._remove(book_id)
+                if values is not None:
+                    self._add(book_id, values)
+            self.built = True
+            self._built_at = time.monotonic()
+
+    def upsert(self, book_id, values):
+        """新增或更新一本图书的索引项"""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((book_id, values))
+            self._remove(book_id)
+            self._add(book_id, values)
+
+    def remove(self, book_id):
+        """移除一本图书的索引项"""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((book_id, None))
+            self._remove(book_id)
+
+    def suggest(self, prefix, limit=10):
+        """
+        前缀联想
+        :param prefix: 用户已输入的内容
+        :param limit: 最多返回的联想条数
+        :return: 联想列表 [{'text': 原文, 'type': 字段, 'book_id': 图书ID}, ...]
+        """
+        key = normalize_key(prefix)
+        if not key:
+            return []
+        results = []
+        with self._lock:
+            position = bisect_left(self._keys, (key,))
+            while position < len(self._keys) and len(results) < limit:
+                entry_key, field, text = self._keys[position]
+                if not entry_key.startswith(key):
+                    break
+                results.append({
+                    'text': text,
+                    'type': field,
+                    'book_id': next(iter(self._refs[self._keys[position]]))
+                })
+                position += 1
+        return results
+
+
+suggest_index = PrefixIndex()
+
+
+def _build():
+    # 构建结果之后只做增量维护，从主库读取
+    with primary_reads():
+        suggest_index.build(db.session.execute(select(Book.id, Book.title, Book.author, Book.isbn)))
+
+
+def build_suggest_index():
+    """
+    从数据库全量构建联想索引（只查询所需的三列）
+    需在应用上下文中调用
+    :return: 索引项数量
+    """
+    with suggest_index._build_lock:
+        _build()
+    return len(suggest_index)
+
+
+def ensure_suggest_index():
+    """
+    获取联想索引，尚未构建时先全量构建（并发请求只构建一次）；
+    超过重建间隔时重建，其他请求正在重建时不等待，继续使用旧索引
+    需在应用上下文中调用
+    :return: PrefixIndex 对象
+    """
+    if not suggest_index.built:
+        with suggest_index._build_lock:
+            if not suggest_index.built:
+                _build()
+    elif suggest_index.stale() and suggest_index._build_lock.acquire(blocking=False):
+        try:
+            _build()
+        finally:
+            suggest_index._build_lock.release()
+    return suggest_index
+
+
+@on_catalog_change
+def _apply_changes(changes):
+    for operation, book_id, values in changes:
+        if operation == 'delete':
+            suggest_index.remove(book_id)
+        else:
+            suggest_index.upsert(book_id, values)
@@ -1,14 +1,19 @@
+from datetime import datetime
 from functools import wraps
-from time import sleep
 
-
-from flask import Blueprint, render_template, jsonify, request, flash, url_for, session
+from flask import Blueprint, render_template, jsonify, request, flash, url_for, session, current_app, abort, Response
 from sqlalchemy.sql.elements import or_
 from werkzeug.utils import redirect
 
 from app.models import Book, User, BorrowRecord, Category
-from app.views.users import borrow_book
 from app.forms import BookForm
+from app.utils.book_import import detect_format, import_books as import_book_file
+from app.utils.pagination import keyset_paginate
+from app.utils.search import search_page, parse_category_id
+from app.utils.search_cache import search_cache
+from app.utils.profiler import request_profiler
+from app.utils.sql_perf import sql_perf
+from app.utils.stats import dashboard_stats
 
 admin_bp = Blueprint('admin', __name__,template_folder='templates/admin')
 
@@ -26,69 +31,110 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def admin_required(f):
+    """
+    管理员验证装饰器
+    仅允许以管理员身份登录的会话访问，用于调试等敏感页面
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if session.get('is_admin') != 'True':
+            abort(403)
+        return f(*args, **kwargs)
+    return decorated_function
+
 @admin_bp.route('/dashboard',methods=['POST','GET'])
 @login_required
 def dashboard():
-    book_query = Book.query
-    user_query = User.query
-    borrow_query = BorrowRecord.query
+    # 全局计数取自统计快照，不在页面中直接 COUNT
+    stats = dashboard_stats.get()
     return render_template('admin/dashboard.html',
-                            book_query=book_query,
-                           user_query=user_query,
-                           borrow_query=borrow_query
+                           stats=stats
                            )
 
 @admin_bp.route('/book_management',methods=['POST','GET'])
 @login_required
 def book_management():
-    book_query = Book.query
+    per_page = current_app.config['BOOKS_PER_PAGE']
     if request.method == 'GET':
         # 获取所有分类
         categories = Category.query.all()
         # 获取查询参数
         query = request.args.get('q', '').strip()  # 搜索关键词（GET方式）
         category_id = request.args.get('category', '').strip()  # 分类ID（GET方式）
+        cursor = request.args.get('cursor')  # 分页游标
 
-        # 初始化查询
-        books_query = Book.query
-        # 定义是否是查询
-
-        # 处理分类筛选
-        if category_id:
-            try:
-                category_id_int = int(category_id)
-                # 验证分类是否存在
-                category = Category.query.get(category_id_int)
-                if category:
-                    books_query = books_query.filter_by(category_id=category_id_int)
-            except ValueError:
-                # 无效的分类ID，忽略
-                pass
-
-        # 处理关键词搜索
-        if query:
-            # 多字段模糊搜索：书名、作者、ISBN、描述
-            books_query = books_query.filter(
-                or_(
-                    Book.title.ilike(f'%{query}%'),
-                    Book.author.ilike(f'%{query}%'),
-                    Book.isbn.ilike(f'%{query}%'),
-                    Book.description.ilike(f'%{query}%')
-                )
-            )
-
-        # 执行查询并获取结果
-        books = books_query
+        # 关键词与分类检索（全文索引），按游标分页
+        books = search_page(query, parse_category_id(category_id), cursor, per_page)
         return render_template('admin/book_management.html',
                                categories=categories,
-                               book_query=books,
+                               books=books,
+                               next_cursor=books.next_cursor,
+                               is_first_page=not cursor,
                                current_query=query,
                                selected_category=category_id,
                                )
+    books = search_page(per_page=per_page)
     return render_template('admin/book_management.html',
-                           book_query=book_query
+                           books=books,
+                           next_cursor=books.next_cursor,
+                           is_first_page=True
+                           )
+
+@admin_bp.route('/api/search_cache_stats',methods=['GET'])
+@login_required
+@admin_required
+def search_cache_stats():
+    """检索结果缓存的命中统计，用于评估缓存容量"""
+    return jsonify({'success': True, 'stats': search_cache.stats()})
+
+@admin_bp.route('/debug/perf',methods=['GET'])
+@admin_required
+def debug_perf():
+    """最近请求的SQL语句数、数据库耗时与疑似N+1查询"""
+    if request.args.get('clear'):
+        sql_perf.clear()
+        return redirect(url_for('admin.debug_perf'))
+    return render_template('admin/debug_perf.html',
+                           enabled=sql_perf.enabled,
+                           threshold=sql_perf.n1_threshold,
+                           requests=sql_perf.recent()
+                           )
+
+@admin_bp.route('/debug/profile',methods=['GET'])
+@admin_required
+def debug_profile():
+    """被剖析请求中最热的函数，以及 pstats / collapsed stacks 下载"""
+    if request.args.get('clear'):
+        request_profiler.clear()
+        return redirect(url_for('admin.debug_profile'))
+    sort = 'cumtime' if request.args.get('sort') == 'cumtime' else 'tottime'
+    return render_template('admin/debug_profile.html',
+                           enabled=request_profiler.enabled,
+                           query_param=request_profiler.query_param,
+                           sample_rate=request_profiler.sample_rate,
+                           sort=sort,
+                           summary=request_profiler.summary(sort=sort)
                            )
 
+@admin_bp.route('/debug/profile/download/<string:kind>',methods=['GET'])
+@admin_required
+def download_profile(kind):
+    """下载累计的剖析结果：pstats 二进制文件或 collapsed stacks 文本"""
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    if kind == 'pstats':
+        data = request_profiler.dump_pstats()
+        if data is None:
+            abort(404)
+        return Response(data, mimetype='application/octet-stream', headers={
+            'Content-Disposition': f'attachment; filename=profile-{timestamp}.pstats'
+        })
+    if kind == 'collapsed':
+        return Response(request_profiler.dump_collapsed(), mimetype='text/plain', headers={
+            'Content-Disposition': f'attachment; filename=profile-{timestamp}.collapsed.txt'
+        })
+    abort(404)
+
 @admin_bp.route('/add_book',methods=['POST','GET'])
 @login_required
 def add_book():
@@ -110,7 +156,7 @@ def add_book():
         description = book_form.description.data
         category_id = book_form.category_id.data
 
-        if isbn in [book.isbn for book in Book.query.all()]:
+        if Book.find_by_isbn(isbn):
             flash('该ISBN号的图书已存在，不能重复添加！', 'danger')
             return render_template('admin/add_book.html',
                                    book_form=book_form)
@@ -142,6 +188,26 @@ def add_book():
     return render_template('admin/add_book.html',
                            book_form=book_form)
 
+@admin_bp.route('/import_books',methods=['POST','GET'])
+@login_required
+@admin_required
+def import_books():
+    """上传 CSV / JSONL 文件批量导入图书"""
+    report = None
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        file_format = detect_format(upload.filename) if upload else None
+        if file_format is None:
+            flash('请选择 .csv 或 .jsonl 文件', 'danger')
+        else:
+            report = import_book_file(upload.stream, file_format,
+                                      batch_size=current_app.config['IMPORT_BATCH_SIZE'])
+            flash(f'导入完成：成功 {report.imported} 本，重复 {report.duplicates} 本，失败 {report.failed} 行',
+                  'success' if report.imported else 'warning')
+    return render_template('admin/import_books.html',
+                           report=report
+                           )
+
 @admin_bp.route('/book_information/<int:book_id>',methods=['POST','GET'])
 @login_required
 def book_information(book_id):
@@ -157,37 +223,39 @@ def book_information(book_id):
 @admin_bp.route('/user_management)',methods=['POST','GET'])
 @login_required
 def user_management():
+    query = request.args.get('q', '').strip()
+    status = request.args.get('status', '').strip()
+    cursor = request.args.get('cursor')
+    # 初始化查询
     user_query = User.query
-
-    if request.method == 'GET':
-        query = request.args.get('q', '').strip()
-        status = request.args.get('status', '').strip()
-        # 初始化查询
-        user_query = User.query
-        if query:
-            # 多字段模糊搜索:用户名、邮箱、电话、地址
-            user_query = user_query.filter(
-                or_(
-                    User.username.ilike(f'%{query}%'),
-                    User.email.ilike(f'%{query}%'),
-                    User.phone.ilike(f'%{query}%'),
-                    User.address.ilike(f'%{query}%')
-                )
+    if query:
+        # 多字段模糊搜索:用户名、邮箱、电话、地址
+        user_query = user_query.filter(
+            or_(
+                User.username.ilike(f'%{query}%'),
+                User.email.ilike(f'%{query}%'),
+                User.phone.ilike(f'%{query}%'),
+                User.address.ilike(f'%{query}%')
             )
-        if status:
-            try:
-                status_int = int(status)
-                user_query = user_query.filter_by(status=status_int)
-            except ValueError:
-                pass
-        return render_template('admin/user_management.html',
-                               user_query=user_query,
-                               current_query=query,
-                               selected_status=status
-                               )
+        )
+    if status:
+        try:
+            status_int = int(status)
+            user_query = user_query.filter_by(status=status_int)
+        except ValueError:
+            pass
 
+    # 用户列表游标分页，本页用户的借阅统计一次分组查询得出
+    users = keyset_paginate(user_query, (User.id,), cursor=cursor,
+                            per_page=current_app.config['USERS_PER_PAGE'])
+    borrow_summaries = User.get_borrow_summaries([user.id for user in users])
     return render_template('admin/user_management.html',
-                           user_query=user_query
+                           users=users,
+                           borrow_summaries=borrow_summaries,
+                           next_cursor=users.next_cursor,
+                           is_first_page=not cursor,
+                           current_query=query,
+                           selected_status=status
                            )
 
 @admin_bp.route('/user_profile/<int:user_id>',methods=['POST','GET'])
@@ -209,18 +277,29 @@ def user_profile(user_id):
 @login_required
 def request_management():
     user_query = User.query
-    user_register_count = User.query.filter_by(status=2).count()
-    user_borrow_request_count = BorrowRecord.query.filter_by(status=3).count()
-    user_return_request_count = BorrowRecord.query.filter_by(status=4).count()
-    user_register_requests = User.query.filter_by(status=2).all()
-    user_borrow_requests = BorrowRecord.query.filter_by(status=3).all()
-    user_return_requests = BorrowRecord.query.filter_by(status=4).all()
+    cursor = request.args.get('cursor')
+    register_cursor = request.args.get('register_cursor')  # 注册请求列表的分页游标
+    per_page = current_app.config['REQUESTS_PER_PAGE']
+    # 各状态数量一次分组统计；注册请求与借阅请求队列分别游标分页，借阅请求联结加载用户与图书
+    status_counts = BorrowRecord.count_by_status()
+    register_query = User.query.filter_by(status=2)
+    user_register_requests = keyset_paginate(register_query, (User.id,), cursor=register_cursor,
+                                             per_page=per_page)
+    user_borrow_requests = BorrowRecord.get_request_queue(
+        status=3, cursor=cursor, per_page=per_page
+    )
     return render_template('admin/request_management.html',
                            user_query=user_query,
                            user_register_requests=user_register_requests,
-                           user_register_count=user_register_count,
-                           user_borrow_request_count=user_borrow_request_count,
+                           user_register_count=register_query.count(),
+                           register_cursor=register_cursor,
+                           register_next_cursor=user_register_requests.next_cursor,
+                           is_first_register_page=not register_cursor,
+                           user_borrow_request_count=status_counts.get(3, 0),
                            user_borrow_requests=user_borrow_requests,
+                           cursor=cursor,
+                           next_cursor=user_borrow_requests.next_cursor,
+                           is_first_page=not cursor,
                            )
 
 @admin_bp.route('/delete_book',methods=['POST'])
@@ -1,15 +1,29 @@
-from alembic.util import status
-from flask import Blueprint, render_template, flash, url_for, session
+from flask import Blueprint, render_template, flash, url_for, session, request, jsonify
 from werkzeug.utils import redirect
 
+from app import db
 from app.forms import LoginForm,RegisterForm
 from app.models import User,Admin
+from app.utils.availability import FIELDS as AVAILABILITY_FIELDS, availability_limiter, is_available
+from app.utils.passwords import PasswordHasherBusy
 
 auth_bp = Blueprint('auth', __name__,template_folder='templates/auth')
 
+def _hasher_busy(template, **context):
+    """密码哈希线程池排队已满：提示稍后重试，不占用 worker 等待"""
+    flash('当前登录人数较多，请稍后重试', 'warning')
+    return render_template(template, **context), 503
+
 @auth_bp.route('/login',methods=['POST','GET'])
 def login():
     login_form = LoginForm()
+    try:
+        return _login(login_form)
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return _hasher_busy('auth/login.html', login_form=login_form)
+
+def _login(login_form):
     if login_form.validate_on_submit():
         user_account = login_form.account.data
         user_password = login_form.password.data
@@ -25,6 +39,9 @@ def login():
                 flash("账号还在审核，请等待",'warning')
                 return render_template('auth/login.html', login_form=login_form)
             if user and user.verify_password(user_password):
+                # 旧哈希已按当前配置重新计算时保存
+                if db.session.is_modified(user):
+                    db.session.commit()
                 session.permanent = True
                 session['user_id'] = user.id
                 session['username'] = user.username
@@ -38,6 +55,8 @@ def login():
         elif user_type == 'admin':
             admin = Admin.query.filter_by(username=user_account, status=1).first()
             if admin and admin.verify_password(user_password):
+                if db.session.is_modified(admin):
+                    db.session.commit()
                 session.permanent = True
                 session['user_id'] = admin.id
                 session['username'] = admin.username
@@ -69,10 +88,12 @@ def register():
             address=address,
             status=2  # 新注册用户状态为待审核
         )
-        new_user.password = password  # 使用属性设置器自动哈希密码
+        try:
+            new_user.password = password  # 使用属性设置器自动哈希密码
+        except PasswordHasherBusy:
+            return _hasher_busy('auth/register.html', register_form=register_form)
 
         # 保存到数据库
-        from app import db
         db.session.add(new_user)
         db.session.commit()
         # 延迟跳转
@@ -82,6 +103,27 @@ def register():
                                delay_time=3)
     return render_template('auth/register.html',register_form=register_form)
 
+@auth_bp.route('/api/check_availability',methods=['GET'])
+def check_availability():
+    """
+    注册时的用户名 / 邮箱可用性检查（指纹过滤器判定不存在时不访问数据库）
+    无需登录，按客户端IP限制频率，超过后返回429，页面不再提示，提交注册时仍由后端校验
+    """
+    if not availability_limiter.allow(request.remote_addr):
+        return jsonify({'success': False, 'message': '检查过于频繁，请稍后再试'}), 429
+    field = request.args.get('field', '')
+    value = request.args.get('value', '')
+    if field not in AVAILABILITY_FIELDS or not value:
+        return jsonify({'success': False, 'message': '参数错误'}), 400
+    available = is_available(field, value)
+    label = '用户名' if field == 'username' else '邮箱'
+    return jsonify({
+        'success': True,
+        'field': field,
+        'available': available,
+        'message': f'该{label}可以使用' if available else f'该{label}已被注册'
+    })
+
 @auth_bp.route('/logout')
 def logout():
     """退出登录"""
@@ -1,18 +1,22 @@
 from datetime import datetime, timedelta
 from functools import wraps
-from threading import active_count
 
-from flask import Blueprint, render_template, flash, url_for, session, request, jsonify
+from flask import Blueprint, render_template, flash, url_for, session, request, jsonify, current_app
 from flask_wtf.csrf import validate_csrf
-from sqlalchemy.dialects.oracle.dictionary import all_users
 from werkzeug.routing import ValidationError
 from werkzeug.utils import redirect
-from sqlalchemy import or_
+from sqlalchemy.orm import contains_eager
 
 from app import db
-from app.forms import LoginForm
 from app.forms.user import ProfileForm
-from app.models import User,Admin,Book,Category,BorrowRecord,Favorite
+from app.models import Book,Category,BorrowRecord,Favorite
+from app.utils.search import search_page, search_facets, keyword_condition, parse_category_id, \
+    parse_facet_filters, facet_query_args
+from app.utils.category_tree import filter_by_subtree
+from app.utils.current_user import load_current_user
+from app.utils.pagination import keyset_paginate
+from app.utils.stats import dashboard_stats
+from app.utils.suggest import ensure_suggest_index
 
 users_bp = Blueprint('users', __name__,template_folder='templates/users')
 
@@ -40,8 +44,10 @@ def dashboard():
     active_borrows = user.get_active_borrows()
     #获取我的收藏数量
     my_favorites_count = Favorite.query.filter_by(user_id=user.id,is_active=True).count()
-    all_users_count = User.query.count()
-    all_books_count = Book.query.count()
+    # 全局计数取自统计快照，不在每次访问时 COUNT
+    stats = dashboard_stats.get()
+    all_users_count = stats['total_users']
+    all_books_count = stats['total_books']
 
     now = datetime.utcnow()
     for borrow in active_borrows:
@@ -60,7 +66,7 @@ def dashboard():
 @users_bp.route('/borrowing',methods=['POST','GET'])
 @login_required
 def borrowing():
-    user = User.query.get(session.get('user_id'))
+    user = get_current_user()
     borrow_history = user.get_borrow_history()
     active_borrows = user.get_active_borrows()
 
@@ -79,45 +85,61 @@ def search():
     # 获取查询参数
     query = request.args.get('q', '').strip()  # 搜索关键词（GET方式）
     category_id = request.args.get('category', '').strip()  # 分类ID（GET方式）
+    cursor = request.args.get('cursor')  # 分页游标
+    filters = parse_facet_filters(request.args)  # 分面筛选（语言、出版社、是否可借）
+    category_id_int = parse_category_id(category_id)
 
-    # 初始化查询
-    books_query = Book.query
-
-    # 处理分类筛选
-    if category_id:
-        try:
-            category_id_int = int(category_id)
-            # 验证分类是否存在
-            category = Category.query.get(category_id_int)
-            if category:
-                books_query = books_query.filter_by(category_id=category_id_int)
-        except ValueError:
-            # 无效的分类ID，忽略
-            pass
-
-    # 处理关键词搜索
-    if query:
-        # 多字段模糊搜索：书名、作者、ISBN、描述
-        books_query = books_query.filter(
-            or_(
-                Book.title.ilike(f'%{query}%'),
-                Book.author.ilike(f'%{query}%'),
-                Book.isbn.ilike(f'%{query}%'),
-                Book.description.ilike(f'%{query}%')
-            )
-        )
-
-    # 执行查询并获取结果
-    books = books_query.all()
+    # 关键词与分类检索（全文索引），按游标分页
+    books = search_page(query, category_id_int, cursor,
+                        current_app.config['BOOKS_PER_PAGE'], filters)
+    favorited_ids = Favorite.get_favorited_book_ids(user_id, [book.id for book in books])
+    # 分面计数（一次分组聚合）
+    facets = search_facets(query, category_id_int, filters)
 
     return render_template('users/search.html',
                            categories=categories,
                            books=books,
+                           next_cursor=books.next_cursor,
+                           favorited_ids=favorited_ids,
+                           facets=facets,
+                           facet_args=facet_query_args(filters),
                            current_query=query,
                            selected_category=category_id,
                            user_id=user_id
                            )
 
+@users_bp.route('/api/search',methods=['GET'])
+@login_required
+def api_search():
+    """检索结果的JSON分页接口，供无限滚动加载下一页"""
+    user_id = session.get('user_id')
+    query = request.args.get('q', '').strip()
+    category_id = request.args.get('category', '').strip()
+    cursor = request.args.get('cursor')
+    filters = parse_facet_filters(request.args)
+
+    books = search_page(query, parse_category_id(category_id), cursor,
+                        current_app.config['BOOKS_PER_PAGE'], filters)
+    favorited_ids = Favorite.get_favorited_book_ids(user_id, [book.id for book in books])
+
+    return jsonify({
+        'success': True,
+        'books': [dict(book.to_dict(), is_favorite=book.id in favorited_ids) for book in books],
+        'next_cursor': books.next_cursor
+    })
+
+@users_bp.route('/api/suggest',methods=['GET'])
+@login_required
+def api_suggest():
+    """搜索联想接口：返回书名、作者、ISBN的前缀补全（内存索引，不访问数据库）"""
+    prefix = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', current_app.config['SUGGEST_LIMIT'], type=int),
+                current_app.config['SUGGEST_LIMIT'])
+    return jsonify({
+        'success': True,
+        'suggestions': ensure_suggest_index().suggest(prefix, limit)
+    })
+
 @users_bp.route('/favorites',methods=['POST','GET'])
 @login_required
 def favorites():
@@ -127,64 +149,46 @@ def favorites():
 
     user_id = user.id
 
-    # 获取所有分类
+    # 获取所有分类，子分类按父分类分组，下拉框不再逐个查询子分类
     categories = Category.query.all()
+    category_children = {}
+    for category in categories:
+        category_children.setdefault(category.parent_id, []).append(category)
 
     # 获取查询参数
     query = request.args.get('q', '').strip()
-    category_id = request.args.get('category', '-1')
+    category_id = parse_category_id(request.args.get('category'))
+    cursor = request.args.get('cursor')
 
-    # 基础查询：获取用户的所有收藏记录
-    favorites_query = Favorite.query.filter_by(user_id=user_id)
+    # 单条查询：从用户的收藏记录出发联结图书表，筛选与分页都在数据库中完成，
+    # 同时用 contains_eager 直接填充 favorite.book，渲染时不再逐条加载图书
+    favorites_query = Favorite.query.join(Favorite.book).options(
+        contains_eager(Favorite.book)
+    ).filter(Favorite.user_id == user_id)
 
-    # 如果有搜索条件，需要先过滤收藏记录对应的图书
-    if query or category_id != '-1':
-        # 先获取符合条件的图书ID
-        book_query = Book.query
+    # 分类筛选（整棵子树）
+    if category_id is not None:
+        favorites_query = filter_by_subtree(favorites_query, category_id)
 
-        # 分类筛选
-        if category_id and category_id != '-1':
-            try:
-                category_id_int = int(category_id)
-                book_query = book_query.filter_by(category_id=category_id_int)
-            except ValueError:
-                pass
-
-        # 关键词搜索
-        if query:
-            book_query = book_query.filter(
-                or_(
-                    Book.title.ilike(f'%{query}%'),
-                    Book.author.ilike(f'%{query}%'),
-                    Book.isbn.ilike(f'%{query}%'),
-                    Book.description.ilike(f'%{query}%')
-                )
-            )
-
-        # 获取符合条件的图书ID
-        filtered_books = book_query.all()
-        filtered_book_ids = [book.id for book in filtered_books]
-
-        # 过滤收藏记录，只保留符合条件的图书
-        if filtered_book_ids:
-            favorites_query = favorites_query.filter(Favorite.book_id.in_(filtered_book_ids))
-        else:
-            # 如果没有符合条件的图书，返回空结果
-            return render_template('users/favorites.html',
-                                   favorites_books=[],
-                                   categories=categories,
-                                   query=query,
-                                   selected_category=category_id)
-
-    # 获取收藏记录
-    favorites_books = favorites_query.all()
-    borrow_query = BorrowRecord.query
+    # 关键词搜索
+    if query:
+        favorites_query = favorites_query.filter(keyword_condition(query))
+
+    page = keyset_paginate(favorites_query, (Favorite.id,), cursor=cursor,
+                           per_page=current_app.config['BOOKS_PER_PAGE'])
+    # 本页图书的借阅状态一次查询得出，渲染时不再逐本查询
+    borrow_status = BorrowRecord.get_borrow_status_map(
+        user_id, [favorite.book_id for favorite in page.items]
+    )
     return render_template('users/favorites.html',
-                           favorites_books=favorites_books,
+                           favorites_books=page.items,
+                           next_cursor=page.next_cursor,
+                           is_first_page=not cursor,
                            categories=categories,
+                           category_children=category_children,
                            query=query,
                            selected_category=category_id,
-                           borrow_query=borrow_query,
+                           borrow_status=borrow_status,
                            user_id=user_id
                            )
 
@@ -618,4 +622,5 @@ def delete_book():
     return jsonify({'success':True,'message':'删除成功'})
 
 def get_current_user():
-    return User.query.get(session.get('user_id'))
\ No newline at end of file
+    """当前登录的读者（请求内只查询一次，跨请求使用短时缓存，见 app.utils.current_user）"""
+    return load_current_user()
\ No newline at end of file
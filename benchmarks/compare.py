@@ -0,0 +1,60 @@
+"""
+比较两次基准测试结果
+用法：python -m benchmarks.compare base.json new.json [--metric p95_ms] [--threshold 10]
+逐场景列出指标变化百分比，超过阈值的退化场景使退出码为1，可用于CI
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        report = json.load(f)
+    return report, {result['name']: result for result in report['results']}
+
+
+def compare(base, new, metric='p95_ms'):
+    """
+    :return: [(场景, 基准值, 新值, 变化百分比 或 None), ...]
+    """
+    rows = []
+    for name in list(base) + [name for name in new if name not in base]:
+        old_value = base.get(name, {}).get(metric)
+        new_value = new.get(name, {}).get(metric)
+        change = None
+        if old_value and new_value is not None:
+            change = (new_value - old_value) / old_value * 100
+        rows.append((name, old_value, new_value, change))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='比较两次基准测试结果')
+    parser.add_argument('base', help='基准结果JSON')
+    parser.add_argument('new', help='新结果JSON')
+    parser.add_argument('--metric', default='p95_ms',
+                        help='比较的指标，如 p50_ms、p95_ms、mean_ms、queries_mean')
+    parser.add_argument('--threshold', type=float, default=10.0, help='视为退化的变化百分比')
+    args = parser.parse_args(argv)
+
+    base_report, base = load(args.base)
+    new_report, new = load(args.new)
+    if base_report['dataset']['sizes'] != new_report['dataset']['sizes']:
+        print('警告：两次结果的数据集规模不同', file=sys.stderr)
+
+    print(f"{'场景':<36}{'基准':>12}{'新':>12}{'变化':>10}")
+    regressions = 0
+    for name, old_value, new_value, change in compare(base, new, args.metric):
+        change_text = '-' if change is None else f'{change:+.1f}%'
+        flag = ''
+        if change is not None and change > args.threshold:
+            regressions += 1
+            flag = '  ← 退化'
+        print(f"{name:<36}{old_value if old_value is not None else '-':>12}"
+              f"{new_value if new_value is not None else '-':>12}{change_text:>10}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
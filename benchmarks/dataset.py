@@ -0,0 +1,292 @@
+"""
+基准测试用的合成数据集
+按固定随机种子生成可复现的大规模图书馆数据（分类、图书、读者、借阅记录、收藏），
+全部用 Core executemany 分批写入，图书的全文索引与检索键随批次同步生成，
+写完后重建分类闭包表、联想索引并清空各类缓存
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import func, insert, select
+
+from app import db
+from app.models import Book, BorrowRecord, Category, Favorite, User
+from app.utils import search_index, search_keys
+from app.utils.catalog_events import notify_catalog_change
+from app.utils.category_tree import rebuild_category_closure
+from app.utils.isbn import isbn13_check_digit
+from app.utils.passwords import password_hasher
+from app.utils.suggest import build_suggest_index
+
+# 数据生成规则变化时递增，使旧的缓存数据集失效
+DATASET_VERSION = 1
+
+# 默认规模
+DEFAULT_SIZES = {
+    'categories': 60,
+    'books': 200_000,
+    'users': 50_000,
+    'borrows': 2_000_000,
+    'favorites': 500_000,
+}
+
+# 每批写入的行数
+CHUNK_SIZE = 5000
+
+# 同一读者最多生成的借阅中/待审核记录数（借阅上限为5，留出给基准请求借阅的余量）
+MAX_ACTIVE_PER_USER = 3
+
+# 合成读者的统一密码（只计算一次哈希）
+BENCH_PASSWORD = 'Bench12345'
+
+# 借阅记录状态分布：(状态, 权重)
+BORROW_STATUS_WEIGHTS = ((1, 85), (0, 6), (2, 2), (3, 5), (4, 2))
+
+TITLE_WORDS = (
+    '数据', '算法', '系统', '设计', '原理', '网络', '历史', '文学', '经济', '管理', '艺术', '哲学',
+    '心理', '物理', '化学', '数学', '编程', '人工智能', '机器学习', '分布式', '数据库', '操作系统',
+    '编译器', '中国', '世界', '现代', '古典', '实践', '导论', '基础', '城市', '山河', '星空', '故事',
+    'Python', 'Java', 'Rust', 'Web', 'Design', 'Patterns', 'Data', 'Systems', 'Cloud', 'Linux',
+)
+TITLE_SUFFIXES = ('', '', '', '导论', '精要', '实战', '教程', '入门', '简史', '（第2版）', '（第3版）')
+SURNAMES = ('王', '李', '张', '刘', '陈', '杨', '赵', '黄', '周', '吴', '徐', '孙', '胡', '朱', '高',
+            'Smith', 'Brown', 'Knuth', 'Miller')
+GIVEN_NAMES = ('伟', '芳', '娜', '敏', '静', '强', '磊', '洋', '勇', '军', '杰', '涛', '明', '超', '秀英',
+               'John', 'Anna', 'David', 'Maria')
+PUBLISHERS = ('人民文学出版社', '机械工业出版社', '清华大学出版社', '电子工业出版社', '商务印书馆',
+              '中华书局', '人民邮电出版社', '科学出版社', "O'Reilly Media", 'Addison-Wesley')
+LANGUAGES = ('中文', '中文', '中文', '英文', '日文')
+
+
+def scaled_sizes(scale=1.0, **overrides):
+    """
+    按比例缩放默认规模
+    :param scale: 缩放比例，如 0.01 生成百分之一规模的数据
+    :param overrides: 单独指定的数量（None 表示按比例）
+    :return: 规模字典
+    """
+    sizes = {name: max(1, int(count * scale)) for name, count in DEFAULT_SIZES.items()}
+    sizes.update({name: count for name, count in overrides.items() if count is not None})
+    return sizes
+
+
+def _chunks(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class DatasetGenerator:
+    """
+    合成数据集生成器
+    同一 seed 与规模总是生成相同的数据
+    """
+
+    def __init__(self, sizes, seed=42):
+        self.sizes = sizes
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.now = datetime(2025, 1, 1)
+        self.category_ids = []
+        self.book_ids = []
+        self.user_ids = []
+        self.timings = {}
+
+    def _timed(self, name, func):
+        started = time.perf_counter()
+        count = func()
+        self.timings[name] = {'rows': count, 'seconds': round(time.perf_counter() - started, 3)}
+        return count
+
+    def generate(self):
+        """
+        生成全部数据，需在应用上下文中调用
+        :return: {表: {'rows': 行数, 'seconds': 耗时}}
+        """
+        self._timed('categories', self._generate_categories)
+        self._timed('books', self._generate_books)
+        self._timed('users', self._generate_users)
+        self._timed('borrow_records', self._generate_borrows)
+        self._timed('favorites', self._generate_favorites)
+        self._timed('derived', self._rebuild_derived)
+        return self.timings
+
+    # ========== 分类 ==========
+    def _generate_categories(self):
+        top_level = db.session.execute(
+            select(Category.id, Category.name).where(Category.parent_id == 0).order_by(Category.id)
+        ).all()
+        count = self.sizes['categories']
+        rows = [{
+            'name': f'{top_level[i % len(top_level)].name}·专题{i + 1:04d}',
+            'parent_id': top_level[i % len(top_level)].id,
+            'description': '基准测试合成分类',
+            'sort_order': i,
+        } for i in range(count)]
+        db.session.execute(insert(Category.__table__), rows)
+        db.session.commit()
+        self.category_ids = list(db.session.execute(select(Category.id).order_by(Category.id)).scalars())
+        return count
+
+    # ========== 图书 ==========
+    def _book_row(self, index):
+        rng = self.rng
+        title = ''.join(rng.sample(TITLE_WORDS, rng.randint(2, 3))) + rng.choice(TITLE_SUFFIXES)
+        author = rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES)
+        first12 = f'979{index:09d}'
+        total_copies = rng.randint(1, 10)
+        return {
+            'isbn': first12 + isbn13_check_digit(first12),
+            'title': title,
+            'author': author,
+            'publisher': rng.choice(PUBLISHERS),
+            'publish_date': (self.now - timedelta(days=rng.randint(0, 365 * 30))).date(),
+            'edition': f'第{rng.randint(1, 5)}版',
+            'language': rng.choice(LANGUAGES),
+            'pages': rng.randint(80, 1200),
+            'price': rng.randint(1500, 19900) / 100,
+            'description': f'{title}，{author}著。',
+            'total_copies': total_copies,
+            'available_copies': rng.randint(0, total_copies),
+            'category_id': rng.choice(self.category_ids),
+            'status': 1,
+            'created_at': self.now,
+            'updated_at': self.now,
+        }
+
+    def _generate_books(self):
+        count = 0
+        rows = (self._book_row(index) for index in range(self.sizes['books']))
+        for chunk in _chunks(rows):
+            result = db.session.execute(
+                insert(Book.__table__).returning(Book.id, sort_by_parameter_order=True), chunk
+            )
+            books = [SimpleNamespace(id=book_id, **values) for book_id, values in zip(result.scalars(), chunk)]
+            # 与批量导入相同：executemany 不触发映射事件，派生数据手动同步
+            search_index.index_books(books)
+            search_keys.add_search_keys(books)
+            db.session.commit()
+            count += len(books)
+        self.book_ids = list(db.session.execute(select(Book.id).order_by(Book.id)).scalars())
+        return count
+
+    # ========== 读者 ==========
+    def _generate_users(self):
+        password_hash = password_hasher.hash(BENCH_PASSWORD)
+        rng = self.rng
+
+        def rows():
+            for index in range(self.sizes['users']):
+                yield {
+                    'username': f'bench_user_{index:06d}',
+                    'email': f'bench_user_{index:06d}@example.com',
+                    'password_hash': password_hash,
+                    'phone': f'139{index:08d}',
+                    'address': f'合成地址 {index % 500} 号',
+                    # 约1%待审核，1%禁用
+                    'status': 2 if rng.random() < 0.01 else (0 if rng.random() < 0.01 else 1),
+                    'created_at': self.now,
+                    'updated_at': self.now,
+                }
+
+        count = 0
+        for chunk in _chunks(rows()):
+            db.session.execute(insert(User.__table__), chunk)
+            count += len(chunk)
+        db.session.commit()
+        self.user_ids = list(db.session.execute(
+            select(User.id).where(User.username.like('bench_user_%')).order_by(User.id)
+        ).scalars())
+        return count
+
+    # ========== 借阅记录 ==========
+    def _generate_borrows(self):
+        rng = self.rng
+        statuses = [status for status, _ in BORROW_STATUS_WEIGHTS]
+        weights = [weight for _, weight in BORROW_STATUS_WEIGHTS]
+        active_counts = {}
+
+        def rows():
+            for _ in range(self.sizes['borrows']):
+                user_id = rng.choice(self.user_ids)
+                status = rng.choices(statuses, weights)[0]
+                if status in (0, 3):
+                    if active_counts.get(user_id, 0) >= MAX_ACTIVE_PER_USER:
+                        status = 1
+                    else:
+                        active_counts[user_id] = active_counts.get(user_id, 0) + 1
+                borrow_date = self.now - timedelta(days=rng.randint(0, 730), seconds=rng.randint(0, 86399))
+                returned = status == 1
+                yield {
+                    'user_id': user_id,
+                    'book_id': rng.choice(self.book_ids),
+                    'borrow_date': borrow_date,
+                    'due_date': borrow_date + timedelta(days=30),
+                    'return_date': borrow_date + timedelta(days=rng.randint(1, 30)) if returned else None,
+                    'status': status,
+                    'renew_times': 0,
+                    'created_at': borrow_date,
+                    'updated_at': borrow_date,
+                }
+
+        count = 0
+        for chunk in _chunks(rows()):
+            db.session.execute(insert(BorrowRecord.__table__), chunk)
+            count += len(chunk)
+        db.session.commit()
+        return count
+
+    # ========== 收藏 ==========
+    def _generate_favorites(self):
+        rng = self.rng
+        target = min(self.sizes['favorites'], len(self.user_ids) * len(self.book_ids))
+        seen = set()
+
+        def rows():
+            while len(seen) < target:
+                pair = (rng.choice(self.user_ids), rng.choice(self.book_ids))
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                yield {
+                    'user_id': pair[0],
+                    'book_id': pair[1],
+                    'sort_order': 0,
+                    'is_active': True,
+                    'created_at': self.now,
+                    'updated_at': self.now,
+                }
+
+        count = 0
+        for chunk in _chunks(rows()):
+            db.session.execute(insert(Favorite.__table__), chunk)
+            count += len(chunk)
+        db.session.commit()
+        return count
+
+    # ========== 派生数据 ==========
+    def _rebuild_derived(self):
+        # 分类同样是 executemany 写入，闭包表整体重建
+        rebuild_category_closure()
+        build_suggest_index()
+        # 清空检索缓存与统计快照
+        notify_catalog_change([])
+        return len(self.book_ids)
+
+
+def table_counts():
+    """
+    各表行数，需在应用上下文中调用
+    :return: {表名: 行数}
+    """
+    return {
+        model.__tablename__: db.session.execute(select(func.count()).select_from(model)).scalar()
+        for model in (Category, Book, User, BorrowRecord, Favorite)
+    }
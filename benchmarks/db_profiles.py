@@ -0,0 +1,208 @@
+"""
+数据库引擎配置对比基准
+多个进程（模拟多个 worker）同时对同一个 SQLite 文件发起读写混合请求：
+检索、收藏、仪表盘等读请求，借阅、归还等写请求，
+分别在默认配置（回滚日志、synchronous=FULL）与调优配置（Config.SQLITE_PRAGMAS）下运行，
+比较吞吐量、延迟与 database is locked 错误数，结果以 JSON 输出
+
+用法（在项目根目录执行）：
+    python -m benchmarks.db_profiles --scale 0.05 --workers 4 --duration 10 -o profiles.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.dataset import scaled_sizes
+from benchmarks.run import SEARCH_KEYWORDS, _git_revision, _percentile, _quiet, dataset_path, ensure_dataset, \
+    make_config
+from config import Config
+
+# 对比的 PRAGMA 组合；baseline 为 SQLite 默认行为（busy_timeout 与 Python sqlite3 默认的5秒一致）
+PROFILES = {
+    'baseline': {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 5000},
+    'tuned': dict(Config.SQLITE_PRAGMAS),
+}
+
+# 操作：(名称, 是否写操作, 在读/写请求中的占比)
+OPERATIONS = (
+    ('search', False, 0.5),
+    ('favorites', False, 0.25),
+    ('dashboard', False, 0.25),
+    ('borrow', True, 0.5),
+    ('return', True, 0.5),
+)
+
+
+def operation_weights(write_share):
+    """按写请求占比计算各操作的权重"""
+    return [share * (write_share if is_write else 1 - write_share) for _, is_write, share in OPERATIONS]
+
+
+def _worker(database_path, pragmas, worker_index, workers, duration, write_share, seed, barrier, results):
+    """单个 worker 进程：创建应用后等待全部 worker 就绪，再在限定时间内循环发起请求"""
+    from flask import got_request_exception
+    from sqlalchemy import select
+
+    from app import create_app, db
+    from app.models import Book, BorrowRecord, User
+
+    config = make_config(database_path)
+    config.SQLITE_PRAGMAS = pragmas
+    config.SEED_ON_STARTUP = False
+    with _quiet(False), open(os.devnull, 'w') as devnull:
+        sys.stderr = devnull
+        app = create_app(config)
+        with app.app_context():
+            user_ids = list(db.session.execute(select(User.id).where(User.status == 1)).scalars())
+            book_ids = list(db.session.execute(select(Book.id).where(Book.available_copies > 0)).scalars())
+            # 归还操作只取本 worker 负责的借阅中记录，避免多个进程归还同一条
+            returnable = [tuple(row) for row in db.session.execute(
+                select(BorrowRecord.user_id, BorrowRecord.id)
+                .where(BorrowRecord.status == 0, BorrowRecord.id % workers == worker_index)
+            )]
+            db.session.remove()
+
+        locked = [0]
+
+        def _on_exception(sender, exception, **extra):
+            if 'database is locked' in str(exception):
+                locked[0] += 1
+
+        got_request_exception.connect(_on_exception, app)
+        rng = random.Random(f'{seed}:{worker_index}')
+        names = [name for name, _, _ in OPERATIONS]
+        weights = operation_weights(write_share)
+        writes = {name for name, is_write, _ in OPERATIONS if is_write}
+        latencies = {name: [] for name in names}
+        errors = 0
+        client = app.test_client()
+
+        barrier.wait()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            operation = rng.choices(names, weights)[0]
+            if operation == 'return' and not returnable:
+                operation = 'borrow'
+            form = None
+            if operation == 'return':
+                user_id, borrow_id = returnable.pop()
+                url, form = '/user/return_book', {'borrow_id': borrow_id}
+            else:
+                user_id = rng.choice(user_ids)
+                if operation == 'borrow':
+                    url, form = '/user/borrow_book', {'book_id': rng.choice(book_ids)}
+                elif operation == 'search':
+                    url = f'/user/search?q={rng.choice(SEARCH_KEYWORDS)}'
+                else:
+                    url = f'/user/{operation}'
+            with client.session_transaction() as sess:
+                sess['user_id'] = user_id
+
+            started = time.perf_counter()
+            response = client.open(url, method='POST' if operation in writes else 'GET', data=form)
+            latencies[operation].append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 500:
+                errors += 1
+            response.close()
+
+    results.put({'latencies': latencies, 'errors': errors, 'locked': locked[0]})
+
+
+def run_profile(source_path, name, pragmas, workers, duration, write_share, seed):
+    """
+    在数据集副本上用一组 PRAGMA 运行负载
+    :return: 结果字典
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        database_path = os.path.join(work_dir, 'library.db')
+        shutil.copyfile(source_path, database_path)
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        barrier = context.Barrier(workers)
+        processes = [context.Process(target=_worker, args=(database_path, pragmas, index, workers, duration,
+                                                           write_share, seed, barrier, results))
+                     for index in range(workers)]
+        for process in processes:
+            process.start()
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    writes = {operation for operation, is_write, _ in OPERATIONS if is_write}
+    latencies = {operation: [] for operation, _, _ in OPERATIONS}
+    for outcome in outcomes:
+        for operation, values in outcome['latencies'].items():
+            latencies[operation].extend(values)
+    total = sum(len(values) for values in latencies.values())
+    write_total = sum(len(latencies[operation]) for operation in writes)
+
+    def summary(values):
+        if not values:
+            return None
+        return {'count': len(values), 'mean_ms': round(statistics.fmean(values), 2),
+                'p50_ms': round(_percentile(values, 50), 2), 'p95_ms': round(_percentile(values, 95), 2),
+                'max_ms': round(max(values), 2)}
+
+    return {
+        'profile': name,
+        'pragmas': pragmas,
+        'requests': total,
+        'requests_per_second': round(total / duration, 1),
+        'writes_per_second': round(write_total / duration, 1),
+        'errors': sum(outcome['errors'] for outcome in outcomes),
+        'locked_errors': sum(outcome['locked'] for outcome in outcomes),
+        'operations': {operation: summary(values) for operation, values in latencies.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SQLite 引擎配置对比基准')
+    parser.add_argument('--scale', type=float, default=0.05, help='数据规模相对默认值的比例')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--workers', type=int, default=4, help='并发 worker 进程数')
+    parser.add_argument('--duration', type=float, default=10.0, help='每组配置的运行秒数')
+    parser.add_argument('--write-share', type=float, default=0.2, help='写请求（借阅、归还）占比')
+    parser.add_argument('--profile', action='append', choices=sorted(PROFILES),
+                        help='只运行指定配置，可重复；默认全部')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'book-benchmarks'),
+                        help='数据集缓存目录')
+    parser.add_argument('-o', '--output', help='结果JSON文件，默认输出到标准输出')
+    args = parser.parse_args(argv)
+
+    sizes = scaled_sizes(args.scale)
+    source_path = dataset_path(args.data_dir, sizes, args.seed)
+    print(f'数据集: {source_path}', file=sys.stderr)
+    ensure_dataset(source_path, sizes, args.seed)
+
+    results = []
+    for name in args.profile or list(PROFILES):
+        result = run_profile(source_path, name, PROFILES[name], args.workers, args.duration,
+                             args.write_share, args.seed)
+        results.append(result)
+        print(f"{name:<10} {result['requests_per_second']:>8.1f} req/s  写 {result['writes_per_second']:>6.1f}/s  "
+              f"错误 {result['errors']}（locked {result['locked_errors']}）", file=sys.stderr)
+
+    report = {
+        'git_revision': _git_revision(),
+        'dataset': {'seed': args.seed, 'sizes': sizes},
+        'settings': {'workers': args.workers, 'duration': args.duration, 'write_share': args.write_share},
+        'results': results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
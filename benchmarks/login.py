@@ -0,0 +1,167 @@
+"""
+登录吞吐基准
+模拟登录高峰：多个线程（模拟多线程 worker）持续提交登录表单，同时一个读者线程访问仪表盘，
+分别在不同的哈希算法 / 强度与哈希线程池大小下运行，比较登录吞吐、登录延迟，
+以及高峰期间其他请求（仪表盘）的延迟是否被拖慢。结果以 JSON 输出
+
+用法（在项目根目录执行）：
+    python -m benchmarks.login --method pbkdf2:sha256:600000 --method scrypt:32768:8:1 --pool 0 --pool 1
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import insert
+
+from benchmarks.run import _git_revision, _percentile, _quiet, make_config
+
+BENCH_PASSWORD = 'Login12345'
+
+
+def _summary(values):
+    if not values:
+        return None
+    return {'count': len(values), 'mean_ms': round(statistics.fmean(values), 2),
+            'p50_ms': round(_percentile(values, 50), 2), 'p95_ms': round(_percentile(values, 95), 2),
+            'max_ms': round(max(values), 2)}
+
+
+def _prepare_database(database_path, method, accounts):
+    """新建数据库并写入使用指定哈希方法的读者账号"""
+    from app import create_app, db
+    from app.models import User
+    from app.utils.passwords import password_hasher
+
+    config = make_config(database_path)
+    config.PASSWORD_HASH_METHOD = method
+    config.PASSWORD_HASH_WORKERS = 0
+    app = create_app(config)
+    with app.app_context():
+        password_hash = password_hasher.hash(BENCH_PASSWORD)
+        db.session.execute(insert(User.__table__), [{
+            'username': f'bench{index:05d}',
+            'email': f'bench{index:05d}@example.com',
+            'password_hash': password_hash,
+            'phone': f'137{index:08d}',
+            'status': 1,
+        } for index in range(accounts)])
+        db.session.commit()
+
+
+def run_case(method, pool_size, threads, duration, accounts):
+    """
+    在新数据库上运行一组配置
+    :return: 结果字典
+    """
+    from app import create_app
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        database_path = os.path.join(work_dir, 'login.db')
+        _prepare_database(database_path, method, accounts)
+        config = make_config(database_path)
+        config.PASSWORD_HASH_METHOD = method
+        config.PASSWORD_HASH_WORKERS = pool_size
+        config.SEED_ON_STARTUP = False
+        app = create_app(config)
+
+        login_latencies, reader_latencies = [], []
+        counters = {'failed': 0, 'busy': 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def login_loop(index):
+            client = app.test_client()
+            account = 0
+            while not stop.is_set():
+                username = f'bench{(index + account * threads) % accounts:05d}'
+                account += 1
+                started = time.perf_counter()
+                response = client.post('/login', data={'account': username, 'password': BENCH_PASSWORD,
+                                                       'user_type': 'user'})
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    if response.status_code == 302:
+                        login_latencies.append(elapsed)
+                    elif response.status_code == 503:
+                        counters['busy'] += 1
+                    else:
+                        counters['failed'] += 1
+
+        def reader_loop():
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['user_id'] = 1
+            while not stop.is_set():
+                started = time.perf_counter()
+                client.get('/user/dashboard')
+                reader_latencies.append((time.perf_counter() - started) * 1000)
+
+        workers = [threading.Thread(target=login_loop, args=(index,)) for index in range(threads)]
+        workers.append(threading.Thread(target=reader_loop))
+        for worker in workers:
+            worker.start()
+        time.sleep(duration)
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+    return {
+        'method': method,
+        'pool_size': pool_size,
+        'logins_per_second': round(len(login_latencies) / duration, 1),
+        'busy': counters['busy'],
+        'failed': counters['failed'],
+        'login': _summary(login_latencies),
+        'reader': _summary(reader_latencies),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='登录吞吐基准')
+    parser.add_argument('--method', action='append', help='哈希方法（werkzeug 格式），可重复；默认取当前配置')
+    parser.add_argument('--pool', action='append', type=int,
+                        help='哈希线程池大小，可重复；0表示在请求线程中计算；默认 0 与 CPU 核数')
+    parser.add_argument('--threads', type=int, default=8, help='并发登录线程数')
+    parser.add_argument('--duration', type=float, default=10.0, help='每组配置的运行秒数')
+    parser.add_argument('--accounts', type=int, default=200, help='读者账号数')
+    parser.add_argument('-o', '--output', help='结果JSON文件，默认输出到标准输出')
+    args = parser.parse_args(argv)
+
+    from config import Config
+    methods = args.method or [Config.PASSWORD_HASH_METHOD]
+    pools = args.pool or [0, os.cpu_count() or 1]
+
+    results = []
+    for method in methods:
+        for pool_size in pools:
+            with _quiet(False):
+                result = run_case(method, pool_size, args.threads, args.duration, args.accounts)
+            results.append(result)
+            reader = result['reader'] or {}
+            print(f"{method:<24} pool={pool_size:<3} {result['logins_per_second']:>7.1f} 登录/秒  "
+                  f"登录 p95 {result['login']['p95_ms'] if result['login'] else '-'}ms  "
+                  f"仪表盘 p95 {reader.get('p95_ms', '-')}ms  繁忙 {result['busy']}  失败 {result['failed']}",
+                  file=sys.stderr)
+
+    report = {
+        'git_revision': _git_revision(),
+        'cpu_count': os.cpu_count(),
+        'settings': {'threads': args.threads, 'duration': args.duration, 'accounts': args.accounts},
+        'results': results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,359 @@
+"""
+关键页面基准测试
+在合成数据集上用 Flask 测试客户端逐个计时关键路由，结果以 JSON 输出，便于比较不同版本
+
+用法（在项目根目录执行）：
+    python -m benchmarks.run                          # 默认规模：20万图书、5万读者、200万借阅、50万收藏
+    python -m benchmarks.run --scale 0.01 -o out.json # 百分之一规模，结果写入 out.json
+    python -m benchmarks.compare base.json out.json   # 比较两次结果
+
+同一规模与种子的数据集只生成一次，缓存在 --data-dir 中；
+每次运行在数据集的副本上进行，借阅等写操作不会影响下一次运行
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import flask
+import sqlalchemy
+from sqlalchemy import event, select
+
+from benchmarks.dataset import DATASET_VERSION, DatasetGenerator, scaled_sizes, table_counts
+from config import Config
+
+# 结果格式变化时递增
+RESULT_VERSION = 1
+
+# 检索场景使用的关键词（均出现在合成书名中）
+SEARCH_KEYWORDS = ('数据', '机器学习', 'python', 'shuju', 'jqxx', '历史', 'Design', '操作系统')
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percent / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                              ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_config(database_path, disable_caches=False):
+    """
+    基准测试使用的配置：指向数据集副本，关闭CSRF；可选关闭检索缓存与统计快照
+    """
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.abspath(database_path)
+        WTF_CSRF_ENABLED = False
+        SQL_PERF_ENABLED = False
+        PROFILER_ENABLED = False
+
+    if disable_caches:
+        BenchmarkConfig.SEARCH_CACHE_SIZE = 0
+        BenchmarkConfig.STATS_CACHE_TTL = 0
+    return BenchmarkConfig
+
+
+@contextlib.contextmanager
+def _quiet(verbose):
+    """屏蔽应用初始化与视图中的打印输出（打印本身的开销仍计入耗时）"""
+    if verbose:
+        yield
+        return
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+# ========== 数据集 ==========
+def dataset_path(data_dir, sizes, seed):
+    """按规模、种子与生成规则版本确定数据集文件路径"""
+    key = json.dumps({'sizes': sizes, 'seed': seed, 'version': DATASET_VERSION}, sort_keys=True)
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    return os.path.join(data_dir, f'library-{digest}.db')
+
+
+def ensure_dataset(path, sizes, seed, verbose=False):
+    """
+    数据集不存在时生成
+    :return: 本次生成的各表耗时，已存在时返回None
+    """
+    if os.path.exists(path):
+        return None
+    from app import create_app, db
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    building = path + '.building'
+    if os.path.exists(building):
+        os.remove(building)
+    with _quiet(verbose):
+        app = create_app(make_config(building))
+        with app.app_context():
+            timings = DatasetGenerator(sizes, seed=seed).generate()
+            db.session.remove()
+            db.engine.dispose()
+    os.replace(building, path)
+    return timings
+
+
+# ========== 场景 ==========
+class Scenario:
+    """
+    一个计时场景：端点 + 请求参数生成规则
+    """
+
+    def __init__(self, name, endpoint, role='user', method='GET', params=None):
+        self.name = name
+        self.endpoint = endpoint
+        self.role = role
+        self.method = method
+        self.params = params or (lambda ctx: {})
+
+
+def build_scenarios():
+    """
+    计时场景列表
+    params 接收运行上下文，返回 {'url_args', 'form', 'user_id'}，随机选择均来自带种子的 ctx.rng
+    """
+    def keyword(ctx):
+        return ctx.rng.choice(SEARCH_KEYWORDS)
+
+    def reader(ctx):
+        return ctx.rng.choice(ctx.user_ids)
+
+    return [
+        Scenario('users.search[browse]', 'users.search',
+                 params=lambda ctx: {'user_id': reader(ctx)}),
+        Scenario('users.search[keyword]', 'users.search',
+                 params=lambda ctx: {'user_id': reader(ctx), 'url_args': {'q': keyword(ctx)}}),
+        Scenario('users.search[keyword+category]', 'users.search',
+                 params=lambda ctx: {'user_id': reader(ctx),
+                                     'url_args': {'q': keyword(ctx), 'category': ctx.rng.choice(ctx.top_categories)}}),
+        Scenario('users.favorites', 'users.favorites',
+                 params=lambda ctx: {'user_id': reader(ctx)}),
+        Scenario('users.favorites[keyword]', 'users.favorites',
+                 params=lambda ctx: {'user_id': reader(ctx), 'url_args': {'q': keyword(ctx)}}),
+        Scenario('users.dashboard', 'users.dashboard',
+                 params=lambda ctx: {'user_id': reader(ctx)}),
+        Scenario('users.borrow_book', 'users.borrow_book', method='POST',
+                 params=lambda ctx: {'user_id': reader(ctx),
+                                     'form': {'book_id': ctx.rng.choice(ctx.available_book_ids)}}),
+        Scenario('admin.book_management', 'admin.book_management', role='admin'),
+        Scenario('admin.book_management[keyword]', 'admin.book_management', role='admin',
+                 params=lambda ctx: {'url_args': {'q': keyword(ctx)}}),
+        Scenario('admin.request_management', 'admin.request_management', role='admin'),
+        Scenario('admin.user_management', 'admin.user_management', role='admin'),
+        Scenario('admin.user_management[keyword]', 'admin.user_management', role='admin',
+                 params=lambda ctx: {'url_args': {'q': f'bench_user_{ctx.rng.randint(0, 999):03d}'}}),
+    ]
+
+
+class RunContext:
+    """场景参数生成所需的数据（读者、可借图书、顶级分类）"""
+
+    def __init__(self, seed):
+        from app import db
+        from app.models import Admin, Book, Category, User
+
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.user_ids = list(db.session.execute(
+            select(User.id).where(User.status == 1).order_by(User.id)
+        ).scalars())
+        self.available_book_ids = list(db.session.execute(
+            select(Book.id).where(Book.available_copies > 0).order_by(Book.id)
+        ).scalars())
+        self.top_categories = list(db.session.execute(
+            select(Category.id).where(Category.parent_id == 0).order_by(Category.id)
+        ).scalars())
+        self.admin_id = db.session.execute(select(Admin.id).order_by(Admin.id).limit(1)).scalar()
+
+
+def run_scenario(app, client, scenario, ctx, counter, requests, warmup):
+    """
+    执行一个场景：先预热，再计时 requests 次
+    :return: 结果字典
+    """
+    from flask import url_for
+
+    # 每个场景独立的随机序列，用 --only 单独运行时请求参数不变
+    ctx.rng = random.Random(f'{ctx.seed}:{scenario.name}')
+    timings, query_counts, status_codes, failures = [], [], {}, 0
+    for iteration in range(warmup + requests):
+        spec = scenario.params(ctx)
+        with app.test_request_context():
+            url = url_for(scenario.endpoint, **spec.get('url_args', {}))
+        with client.session_transaction() as sess:
+            sess.clear()
+            if scenario.role == 'admin':
+                sess['user_id'] = ctx.admin_id
+                sess['is_admin'] = 'True'
+            else:
+                sess['user_id'] = spec['user_id']
+
+        counter[0] = 0
+        started = time.perf_counter()
+        response = client.open(url, method=scenario.method, data=spec.get('form'))
+        elapsed = time.perf_counter() - started
+        # JSON 接口业务失败时仍返回200，按 success 字段判断
+        rejected = response.is_json and response.get_json().get('success') is False
+        response.close()
+
+        if iteration < warmup:
+            continue
+        timings.append(elapsed * 1000)
+        query_counts.append(counter[0])
+        status_codes[str(response.status_code)] = status_codes.get(str(response.status_code), 0) + 1
+        if response.status_code >= 400 or rejected:
+            failures += 1
+
+    return {
+        'name': scenario.name,
+        'endpoint': scenario.endpoint,
+        'method': scenario.method,
+        'requests': len(timings),
+        'failures': failures,
+        'status_codes': status_codes,
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p50_ms': round(_percentile(timings, 50), 3),
+        'p95_ms': round(_percentile(timings, 95), 3),
+        'p99_ms': round(_percentile(timings, 99), 3),
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'queries_mean': round(statistics.fmean(query_counts), 2),
+        'queries_max': max(query_counts),
+    }
+
+
+def run_benchmarks(database_path, seed, requests, warmup, only=None, disable_caches=False, verbose=False):
+    """
+    在数据集副本上执行全部场景
+    :return: (场景结果列表, 各表行数, 应用启动耗时)
+    """
+    from app import create_app, db
+
+    started = time.perf_counter()
+    with _quiet(verbose):
+        app = create_app(make_config(database_path, disable_caches))
+    startup_seconds = time.perf_counter() - started
+
+    with app.app_context():
+        counts = table_counts()
+        ctx = RunContext(seed)
+        engines = list(db.engines.values())
+        db.session.remove()
+
+    # 计时的请求不在外层应用上下文中发出：Flask 为每个请求推入新的上下文与数据库会话，
+    # 不会复用前面请求加载到会话中的对象，查询数与耗时与真实请求一致
+    counter = [0]
+
+    def count_query(*args):
+        counter[0] += 1
+
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', count_query)
+    results = []
+    client = app.test_client()
+    try:
+        for scenario in build_scenarios():
+            if only and not any(pattern in scenario.name for pattern in only):
+                continue
+            with _quiet(verbose):
+                result = run_scenario(app, client, scenario, ctx, counter, requests, warmup)
+            results.append(result)
+            print(f"{result['name']:<36} p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+                  f"queries {result['queries_mean']:>6.1f}", file=sys.stderr)
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', count_query)
+            engine.dispose()
+    return results, counts, startup_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='图书管理系统关键页面基准测试')
+    parser.add_argument('--scale', type=float, default=1.0, help='数据规模相对默认值的比例')
+    for name in ('categories', 'books', 'users', 'borrows', 'favorites'):
+        parser.add_argument(f'--{name}', type=int, help=f'单独指定 {name} 数量（覆盖 --scale）')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子（数据集与请求参数）')
+    parser.add_argument('--requests', type=int, default=50, help='每个场景计时的请求数')
+    parser.add_argument('--warmup', type=int, default=5, help='每个场景计时前的预热请求数')
+    parser.add_argument('--only', action='append', help='只运行名称包含该字符串的场景，可重复')
+    parser.add_argument('--no-cache', action='store_true', help='关闭检索结果缓存与统计快照')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'book-benchmarks'),
+                        help='数据集缓存目录')
+    parser.add_argument('-o', '--output', help='结果JSON文件，默认输出到标准输出')
+    parser.add_argument('-v', '--verbose', action='store_true', help='显示应用与视图的打印输出')
+    args = parser.parse_args(argv)
+
+    sizes = scaled_sizes(args.scale, **{name: getattr(args, name) for name in
+                                        ('categories', 'books', 'users', 'borrows', 'favorites')})
+    path = dataset_path(args.data_dir, sizes, args.seed)
+    print(f'数据集: {path}', file=sys.stderr)
+    generation = ensure_dataset(path, sizes, args.seed, verbose=args.verbose)
+    if generation is not None:
+        print(f"数据集生成完成，耗时 {sum(item['seconds'] for item in generation.values()):.1f} 秒",
+              file=sys.stderr)
+
+    # 在副本上运行，写操作不污染缓存的数据集
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_path = os.path.join(work_dir, 'library.db')
+        shutil.copyfile(path, work_path)
+        results, counts, startup_seconds = run_benchmarks(
+            work_path, args.seed, args.requests, args.warmup,
+            only=args.only, disable_caches=args.no_cache, verbose=args.verbose
+        )
+
+    report = {
+        'version': RESULT_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'flask': flask.__version__ if hasattr(flask, '__version__') else None,
+            'sqlalchemy': sqlalchemy.__version__,
+            'sqlite': sqlite3.sqlite_version,
+        },
+        'dataset': {
+            'seed': args.seed,
+            'version': DATASET_VERSION,
+            'sizes': sizes,
+            'table_counts': counts,
+            'generation': generation,
+        },
+        'settings': {
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'caches': not args.no_cache,
+        },
+        'startup_seconds': round(startup_seconds, 3),
+        'results': results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+应用冷启动基准
+每轮在新的 Python 进程中计时 `from app import create_app` 与 `create_app()`，
+取中位数与启动预算比较；同时检查启动后不应被导入的重量级模块（如 alembic、pypinyin）。
+超出预算或导入了禁止的模块时退出码为1，可用于CI
+
+用法（在项目根目录执行）：
+    python -m benchmarks.startup                         # 默认预算与轮数
+    python -m benchmarks.startup --budget-ms 800 -o startup.json
+    python -m benchmarks.startup --database /tmp/library.db   # 在大数据集上测量（使用其副本）
+    python -m benchmarks.startup --importtime 20         # 另外列出导入耗时最多的模块
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.run import _git_revision
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 启动后不应出现在 sys.modules 中的模块（只在命令行或首次使用时按需导入）
+FORBIDDEN_MODULES = ('alembic', 'flask_migrate', 'pypinyin')
+
+# 子进程中执行的计时代码，结果以一行JSON写到标准错误
+_PROBE = '''
+import json, os, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+from benchmarks.run import make_config
+app = create_app(make_config(os.environ['BENCH_STARTUP_DATABASE']))
+created = time.perf_counter()
+sys.stderr.write('BENCH_STARTUP ' + json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'modules': sorted(name for name in sys.modules if '.' not in name),
+}) + '\\n')
+'''
+
+
+def _run_probe(database_path, extra_args=()):
+    env = dict(os.environ, BENCH_STARTUP_DATABASE=database_path,
+               PYTHONPATH=PROJECT_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    env.pop('FLASK_RUN_FROM_CLI', None)
+    completed = subprocess.run(
+        [sys.executable, '-W', 'ignore', *extra_args, '-c', _PROBE],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f'启动失败:\n{completed.stderr}')
+    for line in completed.stderr.splitlines():
+        if line.startswith('BENCH_STARTUP '):
+            return json.loads(line[len('BENCH_STARTUP '):]), completed.stderr
+    raise RuntimeError(f'未获得计时结果:\n{completed.stderr}')
+
+
+def import_profile(database_path, limit):
+    """
+    用 -X importtime 统计导入耗时最多的模块（顶层模块及其直接导入的模块）
+    :return: [{'module', 'depth', 'cumulative_ms'}, ...]
+    """
+    _, stderr = _run_probe(database_path, ('-X', 'importtime'))
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _self, cumulative, name = line[len('import time:'):].split('|')
+        # 模块名前的缩进（每层两个空格）表示导入深度
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if cumulative.strip().isdigit() and depth <= 1:
+            modules.append({'module': name.strip(), 'depth': depth,
+                            'cumulative_ms': round(int(cumulative) / 1000, 1)})
+    return sorted(modules, key=lambda item: item['cumulative_ms'], reverse=True)[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='应用冷启动基准')
+    parser.add_argument('--rounds', type=int, default=7, help='计时轮数（每轮一个新进程）')
+    parser.add_argument('--budget-ms', type=float, default=1000.0,
+                        help='导入 + create_app 的中位耗时预算（毫秒）')
+    parser.add_argument('--database', help='在该数据库的副本上测量，默认使用新建的空库（含默认数据）')
+    parser.add_argument('--importtime', type=int, metavar='N', help='列出导入耗时最多的 N 个模块')
+    parser.add_argument('-o', '--output', help='结果JSON文件，默认输出到标准输出')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        database_path = os.path.join(work_dir, 'library.db')
+        if args.database:
+            shutil.copyfile(args.database, database_path)
+        # 第一轮完成建表与默认数据初始化（及磁盘缓存预热），不计入结果
+        _run_probe(database_path)
+        samples = [_run_probe(database_path)[0] for _ in range(args.rounds)]
+        profile = import_profile(database_path, args.importtime) if args.importtime else None
+
+    totals = [sample['import_ms'] + sample['create_app_ms'] for sample in samples]
+    loaded = set(samples[-1]['modules'])
+    forbidden = [name for name in FORBIDDEN_MODULES if name in loaded]
+    median_total = statistics.median(totals)
+    report = {
+        'git_revision': _git_revision(),
+        'python': sys.version.split()[0],
+        'rounds': args.rounds,
+        'database': args.database,
+        'import_ms': round(statistics.median(sample['import_ms'] for sample in samples), 1),
+        'create_app_ms': round(statistics.median(sample['create_app_ms'] for sample in samples), 1),
+        'total_ms': round(median_total, 1),
+        'max_total_ms': round(max(totals), 1),
+        'budget_ms': args.budget_ms,
+        'forbidden_modules_loaded': forbidden,
+        'import_profile': profile,
+        'passed': median_total <= args.budget_ms and not forbidden,
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    print(f"启动耗时中位数 {median_total:.0f}ms（导入 {report['import_ms']:.0f}ms，"
+          f"create_app {report['create_app_ms']:.0f}ms），预算 {args.budget_ms:.0f}ms", file=sys.stderr)
+    if forbidden:
+        print(f"启动时导入了不应加载的模块: {', '.join(forbidden)}", file=sys.stderr)
+    return 0 if report['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,99 @@ from flask_wtf import CSRFProtect
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-key-123'
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///book.db'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///book.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLite 每个新连接执行的 PRAGMA（按顺序执行；服务器数据库忽略）
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',  # 预写日志：读写互不阻塞，避免借阅/归还高峰时的 database is locked
+        'synchronous': 'NORMAL',  # WAL 模式下只在检查点时 fsync，掉电最多丢失最近提交
+        'cache_size': -64000,  # 页缓存大小，负数表示KB（约64MB）
+        'mmap_size': 268435456,  # 内存映射读取的最大字节数（256MB）
+        'busy_timeout': 5000,  # 遇到写锁时等待的毫秒数，而不是立即报错
+        'temp_store': 'MEMORY',  # 排序、临时表放在内存中
+    }
+    # 服务器数据库（PostgreSQL / MySQL）连接池；SQLite 不使用
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))  # 常驻连接数
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))  # 高峰时允许额外创建的连接数
+    DB_POOL_TIMEOUT = 30  # 等待空闲连接的秒数
+    DB_POOL_RECYCLE = 1800  # 连接使用超过该秒数后重建，避免被数据库或防火墙断开
+    DB_POOL_PRE_PING = True  # 取出连接前先检测是否可用
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')  # 只读副本；设置后 GET 请求中的查询发往副本，未设置时全部走主库
+    READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))  # 用户写入后该秒数内其读请求仍走主库（应大于副本复制延迟）
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')  # 密码哈希算法与强度（werkzeug 格式，如 scrypt:32768:8:1）；旧算法或强度的哈希在登录成功时自动更新
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))  # 同时计算密码哈希的线程数，0表示在请求线程中直接计算
+    PASSWORD_HASH_QUEUE = 64  # 排队等待哈希计算的最大请求数，超过时登录提示系统繁忙
+    PASSWORD_HASH_TIMEOUT = 10  # 等待哈希计算的最长秒数
     PERMANENT_SESSION_LIFETIME = timedelta(minutes=30)  # 设置会话有效时间为30分钟
+    BOOKS_PER_PAGE = 20  # 图书检索结果每页数量（游标分页）
+    SEARCH_CACHE_SIZE = 256  # 检索结果缓存的最大查询条数（LRU淘汰），0表示关闭缓存
+    SEARCH_CACHE_MAX_IDS = 5000  # 单条查询结果超过该数量时不缓存ID列表
+    SEARCH_CACHE_TTL = 60  # 检索结果缓存的有效秒数（多进程部署时其他进程中的图书变更最多延迟该时间可见）；0表示不过期，仅适用于单进程部署
+    SUGGEST_LIMIT = 10  # 搜索联想最多返回条数
+    SUGGEST_PRELOAD = os.environ.get('SUGGEST_PRELOAD', '0') == '1'  # 启动时构建联想索引；默认在第一次联想请求时构建，缩短启动时间
+    SUGGEST_INDEX_TTL = 300  # 搜索联想索引构建后的有效秒数，到期后下一次联想请求时从数据库重建（纳入其他进程中的图书变更）；0表示不重建
+    USERS_PER_PAGE = 50  # 读者管理页每页用户数量（游标分页）
+    REQUESTS_PER_PAGE = 50  # 请求管理页借阅请求队列每页数量（游标分页）
+    IMPORT_BATCH_SIZE = 1000  # 批量导入图书时每批写入的行数
+    SQL_PERF_ENABLED = os.environ.get('SQL_PERF_ENABLED', '0') == '1'  # 是否开启请求级SQL统计（调试用）
+    SQL_PERF_N1_THRESHOLD = 5  # 同一语句形状在一个请求内重复执行达到该次数时标记为疑似N+1
+    SQL_PERF_HISTORY = 100  # /admin/debug/perf 保留的最近请求数
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', '0') == '1'  # 是否允许按需剖析请求（关闭时无任何开销）
+    PROFILER_QUERY_PARAM = '_profile'  # 管理员会话带此查询参数的请求会被剖析
+    PROFILER_SAMPLE_RATE = 0.0  # 随机抽样剖析的请求比例，0表示只剖析手动指定的请求
+    PROFILER_ENDPOINTS = ()  # 抽样限定的端点，如 ('users.borrow_book', 'admin.book_management')，空表示全部
+    PROFILER_SAMPLE_INTERVAL = 0.005  # 调用栈采样间隔（秒）
+    SEED_ON_STARTUP = os.environ.get('SEED_ON_STARTUP', '1') == '1'  # 启动时比对默认数据指纹并按需初始化；关闭后需手动执行 flask seed
+    STATS_CACHE_TTL = 60  # 仪表盘统计快照的缓存秒数，相关数据提交变更时立即失效；0表示不缓存
+    CURRENT_USER_CACHE_TTL = 30  # 当前登录读者的跨请求缓存秒数，资料或状态变更提交时立即失效；0表示不缓存
+    CURRENT_USER_CACHE_SIZE = 1024  # 当前登录读者缓存的最大人数（LRU淘汰）
+    AVAILABILITY_REBUILD_SECONDS = 600  # 用户名/邮箱可用性过滤器定期从数据库重建的间隔秒数（纳入其他进程中的注册）；0表示只在启动时构建
+    AVAILABILITY_RATE_LIMIT = 30  # 每个IP在 AVAILABILITY_RATE_WINDOW 秒内最多检查用户名/邮箱的次数（防止批量探测）；0表示不限制
+    AVAILABILITY_RATE_WINDOW = 60  # 可用性检查频率限制的时间窗口秒数
+
+
+class DevelopmentConfig(Config):
+    """开发环境：本地 SQLite 文件（WAL 与 PRAGMA 调优见 Config.SQLITE_PRAGMAS）"""
+
+
+class TestingConfig(Config):
+    """测试环境：内存 SQLite，关闭CSRF与缓存，不落盘"""
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite://'
+    WTF_CSRF_ENABLED = False
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'MEMORY',
+        'synchronous': 'OFF',
+        'temp_store': 'MEMORY',
+    }
+    DATABASE_REPLICA_URL = os.environ.get('TEST_DATABASE_REPLICA_URL')
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # 测试中使用低强度哈希
+    PASSWORD_HASH_WORKERS = 0
+    SEARCH_CACHE_SIZE = 0
+    STATS_CACHE_TTL = 0
+    CURRENT_USER_CACHE_TTL = 0
+
+
+class ProductionConfig(Config):
+    """生产环境：DATABASE_URL 指向 PostgreSQL 等服务器数据库（未设置时使用调优后的 SQLite）"""
+    SEED_ON_STARTUP = os.environ.get('SEED_ON_STARTUP', '0') == '1'  # 生产环境默认不在启动时初始化，部署时执行 flask seed
+
+
+config_by_name = {
+    'dev': DevelopmentConfig,
+    'test': TestingConfig,
+    'prod': ProductionConfig,
+}
+
+
+def get_config(name=None):
+    """
+    按名称获取配置类
+    :param name: 'dev' / 'test' / 'prod'，默认读取环境变量 APP_CONFIG，未设置时为 'dev'
+    :return: 配置类
+    """
+    name = name or os.environ.get('APP_CONFIG', 'dev')
+    try:
+        return config_by_name[name]
+    except KeyError:
+        raise ValueError(f"未知的配置: {name}，可选 {', '.join(config_by_name)}") from None
@@ -0,0 +1,31 @@
+"""
+测试夹具
+每个测试新建应用（TestingConfig：内存 SQLite，启动时写入默认数据），互不影响。
+不在整个测试中保持应用上下文：测试客户端的每个请求各自推入上下文、使用独立的数据库会话，
+需要直接访问数据库时在测试中使用 app.app_context()
+"""
+import pytest
+
+from app import create_app, db
+
+
+@pytest.fixture
+def app():
+    app = create_app('test')
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def login(client, user_id=1, is_admin=False):
+    """在测试客户端的会话中登录读者（或管理员）"""
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+        if is_admin:
+            sess['is_admin'] = 'True'
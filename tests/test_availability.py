@@ -0,0 +1,52 @@
+from app.utils.availability import availability_limiter
+from app.utils.rate_limit import RateLimiter
+
+URL = '/api/check_availability'
+
+
+def _check(client, value, field='username', ip='10.0.0.1'):
+    return client.get(URL, query_string={'field': field, 'value': value}, environ_base={'REMOTE_ADDR': ip})
+
+
+def test_reports_registered_and_free_names(client):
+    assert _check(client, 'student1').get_json()['available'] is False
+    assert _check(client, 'nobody-here').get_json()['available'] is True
+    assert _check(client, 'nobody@example.com', field='email').get_json()['available'] is True
+    assert _check(client, 'x', field='phone').status_code == 400
+
+
+def test_checks_are_rate_limited_per_client(app, client):
+    availability_limiter.configure(limit=5, window=60)
+    for index in range(5):
+        assert _check(client, f'name{index}').status_code == 200
+    response = _check(client, 'student1')
+    assert response.status_code == 429
+    assert 'available' not in response.get_json()
+    # 其他客户端不受影响
+    assert _check(client, 'student1', ip='10.0.0.2').status_code == 200
+
+
+def test_window_resets(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('app.utils.rate_limit.time.monotonic', lambda: now[0])
+    limiter = RateLimiter(limit=2, window=10)
+    assert limiter.allow('a') and limiter.allow('a')
+    assert not limiter.allow('a')
+    now[0] += 10
+    assert limiter.allow('a')
+    assert limiter.rejected == 1
+
+
+def test_zero_limit_disables_limiting():
+    limiter = RateLimiter(limit=0)
+    assert all(limiter.allow('a') for _ in range(100))
+
+
+def test_tracked_clients_are_bounded(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr('app.utils.rate_limit.time.monotonic', lambda: now[0])
+    limiter = RateLimiter(limit=1, window=10, max_keys=100)
+    for index in range(1000):
+        now[0] += 0.001
+        limiter.allow(f'client{index}')
+    assert len(limiter._windows) <= 100
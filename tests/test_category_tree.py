@@ -0,0 +1,114 @@
+import pytest
+from sqlalchemy import select
+
+from app import db
+from app.models import Book, Category
+from app.models.category_closure import CategoryClosure
+from app.utils.category_tree import _closure_rows, ancestor_map, category_path
+from app.utils.search import search_books, search_facets
+
+
+def _closure():
+    rows = db.session.execute(
+        select(CategoryClosure.ancestor_id, CategoryClosure.descendant_id, CategoryClosure.depth)
+    ).all()
+    return {tuple(row) for row in rows}
+
+
+def _expected_closure():
+    parents = dict(db.session.execute(select(Category.id, Category.parent_id)).all())
+    return {(row['ancestor_id'], row['descendant_id'], row['depth']) for row in _closure_rows(parents)}
+
+
+def _subtree(category_id):
+    return set(db.session.execute(
+        select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+    ).scalars())
+
+
+@pytest.fixture
+def tree(app):
+    """A > B > C 与顶级分类 D，B、C 下各有一本图书"""
+    with app.app_context():
+        a = Category(name='测试A', parent_id=0)
+        d = Category(name='测试D', parent_id=0)
+        db.session.add_all([a, d])
+        db.session.flush()
+        b = Category(name='测试B', parent_id=a.id)
+        db.session.add(b)
+        db.session.flush()
+        c = Category(name='测试C', parent_id=b.id)
+        db.session.add(c)
+        db.session.flush()
+        db.session.add_all([
+            Book(isbn='TREE-B', title='分类树测试图书乙', author='测试', category_id=b.id),
+            Book(isbn='TREE-C', title='分类树测试图书丙', author='测试', category_id=c.id),
+        ])
+        db.session.commit()
+        ids = {'A': a.id, 'B': b.id, 'C': c.id, 'D': d.id}
+        db.session.remove()
+    return ids
+
+
+def test_seeded_closure_matches_parents(app):
+    with app.app_context():
+        assert _closure() == _expected_closure()
+
+
+def test_insert_adds_ancestor_rows(app, tree):
+    with app.app_context():
+        assert ancestor_map([tree['C']])[tree['C']] == [tree['C'], tree['B'], tree['A']]
+        assert _subtree(tree['A']) == {tree['A'], tree['B'], tree['C']}
+        assert _closure() == _expected_closure()
+
+
+def test_move_subtree(app, tree):
+    with app.app_context():
+        db.session.get(Category, tree['B']).parent_id = tree['D']
+        db.session.commit()
+
+        assert ancestor_map([tree['C']])[tree['C']] == [tree['C'], tree['B'], tree['D']]
+        assert [category.id for category in category_path(tree['C'])] == [tree['D'], tree['B'], tree['C']]
+        assert _subtree(tree['A']) == {tree['A']}
+        assert _subtree(tree['D']) == {tree['D'], tree['B'], tree['C']}
+        assert _closure() == _expected_closure()
+
+        assert search_books(category_id=tree['A']).count() == 0
+        assert search_books(category_id=tree['D']).count() == 2
+        assert search_books(category_id=tree['B']).count() == 2
+        facets = search_facets('分类树测试')
+        assert facets['category'].get(tree['A'], 0) == 0
+        assert facets['category'][tree['D']] == 2
+        assert facets['category'][tree['C']] == 1
+
+
+def test_move_subtree_to_top_level(app, tree):
+    with app.app_context():
+        db.session.get(Category, tree['B']).parent_id = 0
+        db.session.commit()
+
+        assert ancestor_map([tree['C']])[tree['C']] == [tree['C'], tree['B']]
+        assert _subtree(tree['A']) == {tree['A']}
+        assert search_books(category_id=tree['B']).count() == 2
+        assert _closure() == _expected_closure()
+
+
+def test_move_into_own_subtree_is_rejected(app, tree):
+    with app.app_context():
+        db.session.get(Category, tree['A']).parent_id = tree['C']
+        with pytest.raises(ValueError):
+            db.session.commit()
+        db.session.rollback()
+        assert _subtree(tree['A']) == {tree['A'], tree['B'], tree['C']}
+        assert _closure() == _expected_closure()
+
+
+def test_delete_category(app, tree):
+    with app.app_context():
+        db.session.delete(db.session.get(Category, tree['C']))
+        db.session.commit()
+
+        assert _subtree(tree['A']) == {tree['A'], tree['B']}
+        assert tree['C'] not in ancestor_map([tree['C']])
+        assert search_books(category_id=tree['A']).count() == 1
+        assert _closure() == _expected_closure()
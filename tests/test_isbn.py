@@ -0,0 +1,80 @@
+import pytest
+
+from app.utils import search
+from app.utils.isbn import (is_valid_isbn, isbn_lookup_values, normalize_isbn, to_isbn10,
+                            to_isbn13)
+from tests.conftest import login
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('9787020002207', '9787020002207'),
+    ('978-7-02-000220-7', '9787020002207'),
+    (' 978 7 02 000220 7 ', '9787020002207'),
+    ('ISBN 978-7-02-000220-7', '9787020002207'),
+    ('isbn:7-02-000220-x', '702000220X'),
+    ('7020002208', '7020002208'),
+    ('9771234567890', None),
+    ('97870200022', None),
+    ('三国演义', None),
+    ('', None),
+    (None, None),
+])
+def test_normalize_isbn(value, expected):
+    assert normalize_isbn(value) == expected
+
+
+def test_is_valid_isbn_checks_the_check_digit():
+    assert is_valid_isbn('978-7-02-000220-7')
+    assert is_valid_isbn('702000220X')
+    assert not is_valid_isbn('9787020002208')
+    assert not is_valid_isbn('7020002208')
+
+
+def test_isbn10_to_isbn13():
+    assert to_isbn13('702000220X') == '9787020002207'
+    assert to_isbn13('0-306-40615-2') == '9780306406157'
+    assert to_isbn13('9787020002207') == '9787020002207'
+    assert to_isbn13('abc') is None
+
+
+def test_isbn13_to_isbn10():
+    assert to_isbn10('9787020002207') == '702000220X'
+    assert to_isbn10('978-0-306-40615-7') == '0306406152'
+    assert to_isbn10('9791234567896') is None
+    assert to_isbn10('702000220X') == '702000220X'
+
+
+def test_conversion_round_trip():
+    for isbn10 in ('0306406152', '702000220X', '7544253996'):
+        assert to_isbn10(to_isbn13(isbn10)) == isbn10
+
+
+def test_lookup_values_cover_all_spellings():
+    assert isbn_lookup_values('978-7-02-000220-7') == [
+        '702000220X', '978-7-02-000220-7', '9787020002207']
+    assert isbn_lookup_values('三国演义') == []
+
+
+def test_stored_isbn_with_bad_check_digit_is_found_exactly(app):
+    with app.app_context():
+        # 默认数据中“三国演义”的ISBN校验位不正确，按录入的写法仍走精确匹配
+        books = search.search_books('978-7-02-000220-8').all()
+        assert [book.title for book in books] == ['三国演义']
+
+
+def test_unknown_isbn_falls_back_to_full_text(app):
+    with app.app_context():
+        assert search.exact_isbn_values('9780000000002') == []
+        assert search.search_books('9780000000002').all() == []
+
+
+def test_exact_isbn_probe_runs_once_per_search(app, client, monkeypatch):
+    calls = []
+    probe = search.exact_isbn_values
+    monkeypatch.setattr(search, 'exact_isbn_values', lambda query: calls.append(query) or probe(query))
+    login(client)
+    response = client.get('/user/search', query_string={'q': '9787020002207'})
+    assert response.status_code == 200
+    assert '红楼梦' in response.get_data(as_text=True)
+    # search_page 一次，search_facets（未缓存）一次
+    assert len(calls) == 2
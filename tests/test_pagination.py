@@ -0,0 +1,76 @@
+import base64
+import json
+
+from app import db
+from app.models import Book, Category
+from app.utils.pagination import _after, decode_cursor, encode_cursor, keyset_paginate
+from tests.conftest import login
+
+ORDER = (Book.title, Book.id)
+
+
+def _raw_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def test_cursor_round_trip():
+    for values in (['三国演义', 12], ['', 1], [None, 7], ['a' * 200, 2 ** 40]):
+        assert decode_cursor(encode_cursor(values), ORDER) == values
+
+
+def test_cursor_round_trip_float_rank():
+    assert decode_cursor(encode_cursor([-3.25, 5]), (Book.price, Book.id)) == [-3.25, 5]
+
+
+def test_empty_cursor():
+    assert decode_cursor(None, ORDER) is None
+    assert decode_cursor('', ORDER) is None
+
+
+def test_malformed_cursor():
+    assert decode_cursor('not base64!', ORDER) is None
+    assert decode_cursor(base64.urlsafe_b64encode(b'\xff\xfe').decode('ascii'), ORDER) is None
+    assert decode_cursor(_raw_cursor({'title': 'a', 'id': 1}), ORDER) is None
+
+
+def test_cursor_wrong_length():
+    assert decode_cursor(_raw_cursor(['a']), ORDER) is None
+    assert decode_cursor(_raw_cursor(['a', 1, 2]), ORDER) is None
+
+
+def test_cursor_wrong_types():
+    for values in ([{'a': 1}, 5], ['a', [1]], ['a', '5'], [5, 5], ['a', True], ['a', 2 ** 70],
+                   ['a', float('inf')]):
+        assert decode_cursor(_raw_cursor(values), ORDER) is None, values
+
+
+def test_after_breaks_ties_on_last_column():
+    sql = str(_after(ORDER, ['b', 3]).compile(compile_kwargs={'literal_binds': True}))
+    assert sql == "books.title > 'b' OR books.title = 'b' AND books.id > 3"
+
+
+def test_keyset_pages_through_duplicate_sort_keys(app):
+    with app.app_context():
+        category_id = Category.query.first().id
+        for index in range(5):
+            db.session.add(Book(isbn=f'TEST-{index}', title='同名图书', author='测试', category_id=category_id))
+        db.session.commit()
+
+        query = Book.query.filter_by(title='同名图书')
+        seen, cursor = [], None
+        while True:
+            page = keyset_paginate(query, ORDER, cursor=cursor, per_page=2)
+            seen.extend(book.id for book in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        assert seen == sorted(book.id for book in query)
+        assert len(seen) == 5
+
+
+def test_tampered_cursor_falls_back_to_first_page(client):
+    login(client)
+    first = client.get('/user/search')
+    response = client.get('/user/search', query_string={'cursor': _raw_cursor([{'a': 1}, 5])})
+    assert response.status_code == 200
+    assert response.get_data() == first.get_data()
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models import Admin, User
+from app.utils.passwords import PasswordHasher, PasswordHasherBusy, normalize_method, password_hasher
+
+OLD_METHOD = 'pbkdf2:sha256:500'
+
+
+def _login(client, account, password, user_type='user'):
+    return client.post('/login', data={'account': account, 'password': password, 'user_type': user_type})
+
+
+def _set_hash(app, model, username, password, method):
+    with app.app_context():
+        account = model.query.filter_by(username=username).first()
+        account.password_hash = generate_password_hash(password, method)
+        db.session.commit()
+
+
+def _stored_hash(app, model, username):
+    with app.app_context():
+        return model.query.filter_by(username=username).first().password_hash
+
+
+def test_normalize_method():
+    assert normalize_method('pbkdf2') == 'pbkdf2:sha256:600000'
+    assert normalize_method('pbkdf2:sha512') == 'pbkdf2:sha512:600000'
+    assert normalize_method('scrypt') == 'scrypt:32768:8:1'
+    with pytest.raises(ValueError):
+        normalize_method('md5')
+
+
+def test_login_upgrades_old_user_hash(app, client):
+    _set_hash(app, User, 'student1', 'Student123', OLD_METHOD)
+    assert password_hasher.needs_rehash(_stored_hash(app, User, 'student1'))
+
+    response = _login(client, 'student1', 'Student123')
+    assert response.status_code == 302
+
+    upgraded = _stored_hash(app, User, 'student1')
+    assert upgraded.startswith(password_hasher.method + '$')
+    assert not password_hasher.needs_rehash(upgraded)
+    assert _login(app.test_client(), 'student1', 'Student123').status_code == 302
+
+
+def test_login_upgrades_old_admin_hash(app, client):
+    _set_hash(app, Admin, 'libadmin', '123456', OLD_METHOD)
+    assert _login(client, 'libadmin', '123456', 'admin').status_code == 302
+    assert not password_hasher.needs_rehash(_stored_hash(app, Admin, 'libadmin'))
+
+
+def test_failed_login_keeps_old_hash(app, client):
+    _set_hash(app, User, 'student1', 'Student123', OLD_METHOD)
+    old_hash = _stored_hash(app, User, 'student1')
+    assert _login(client, 'student1', 'wrong-password').status_code == 200
+    assert _stored_hash(app, User, 'student1') == old_hash
+
+
+@pytest.fixture
+def saturated_hasher(app):
+    """只有一个计算线程、不允许排队的哈希器，名额被一个阻塞任务占满"""
+    password_hasher.configure(workers=1, queue_limit=0, timeout=5)
+    gate = threading.Event()
+    holder = threading.Thread(target=password_hasher._run, args=(gate.wait,))
+    holder.start()
+    while password_hasher._slots._value:
+        time.sleep(0.001)
+    yield password_hasher
+    gate.set()
+    holder.join()
+    password_hasher.configure(workers=0)
+
+
+def test_saturated_pool_rejects_instead_of_blocking(saturated_hasher):
+    started = time.perf_counter()
+    with pytest.raises(PasswordHasherBusy):
+        saturated_hasher.verify('pbkdf2:sha256:1$salt$hash', 'password')
+    assert time.perf_counter() - started < 1
+
+
+def test_saturated_pool_returns_503_on_login(client, saturated_hasher):
+    started = time.perf_counter()
+    response = _login(client, 'student1', 'Student123')
+    assert response.status_code == 503
+    assert time.perf_counter() - started < 1
+
+
+def test_timed_out_hash_keeps_its_slot_until_it_finishes():
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=1, queue_limit=0, timeout=0.01)
+    gate = threading.Event()
+    with pytest.raises(PasswordHasherBusy):
+        hasher._run(gate.wait)
+    # 等待超时后任务仍在计算，名额未归还
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash('password')
+    gate.set()
+    hasher._executor.shutdown(wait=True)
+    assert hasher._slots._value == 1
@@ -0,0 +1,46 @@
+import re
+
+from sqlalchemy import insert
+
+from app import db
+from app.models import User
+from tests.conftest import login
+
+
+def _add_pending_users(app, count):
+    with app.app_context():
+        db.session.execute(insert(User.__table__), [{
+            'username': f'pending{index:03d}',
+            'email': f'pending{index:03d}@example.com',
+            'password_hash': 'x',
+            'status': 2,
+        } for index in range(count)])
+        db.session.commit()
+        return User.query.filter_by(status=2).count()
+
+
+def _register_rows(html):
+    return re.findall(r'class="form-check-input register-checkbox" value="(\d+)"', html)
+
+
+def test_register_requests_are_paginated(app, client):
+    app.config['REQUESTS_PER_PAGE'] = 20
+    total = _add_pending_users(app, 45)
+    login(client, is_admin=True)
+
+    seen, cursor = [], None
+    while True:
+        response = client.get('/admin/request_management', query_string={'register_cursor': cursor} if cursor else {})
+        assert response.status_code == 200
+        html = response.get_data(as_text=True)
+        rows = _register_rows(html)
+        assert len(rows) <= 20
+        assert f'>{total}</h2>' in html
+        seen.extend(rows)
+        match = re.search(r'register_cursor=([\w-]+)[^"]*#register-requests">\s*下一页', html)
+        if match is None:
+            break
+        cursor = match.group(1)
+
+    assert len(seen) == total
+    assert len(set(seen)) == total
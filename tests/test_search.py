@@ -0,0 +1,34 @@
+import warnings
+
+from sqlalchemy import event
+from sqlalchemy.exc import SAWarning
+
+from app import db
+from app.utils.search import search_page
+from app.utils.search_index import FTS_TABLE
+
+
+def test_rank_is_a_plain_attribute(app):
+    with app.app_context():
+        page = search_page('红楼')
+        assert page.items
+        assert all(isinstance(book.search_rank, float) for book in page.items)
+        assert search_page('').items[0].search_rank is None
+
+
+def test_refreshing_ranked_books_does_not_rejoin_the_index(app):
+    with app.app_context():
+        books = search_page('三').items + search_page('红楼').items
+        assert books
+        db.session.commit()  # 提交后对象过期，下一次访问时刷新
+
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', SAWarning)
+            for book in books:
+                assert book.title
+        assert statements
+        assert not any(FTS_TABLE in statement for statement in statements)
+
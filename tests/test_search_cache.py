@@ -0,0 +1,77 @@
+from app import db
+from app.models import Book, Category
+from app.utils.catalog_events import catalog_version
+from app.utils.search import search_facets
+from app.utils.search_cache import SearchResultCache, search_cache
+from tests.conftest import login
+
+
+def _enable_cache():
+    search_cache.configure(max_entries=16, max_ids=5000, ttl=60)
+
+
+def test_stale_version_is_not_cached():
+    cache = SearchResultCache(max_entries=4)
+    cache.put('key', [1, 2], catalog_version() - 1)
+    assert cache.get('key') is None
+
+
+def test_entry_expires_after_ttl(monkeypatch):
+    cache = SearchResultCache(max_entries=4, ttl=10)
+    now = [1000.0]
+    monkeypatch.setattr('app.utils.search_cache.time.monotonic', lambda: now[0])
+    cache.put('key', [1, 2], catalog_version())
+    assert cache.get('key') == (1, 2)
+    now[0] += 11
+    assert cache.get('key') is None
+
+
+def test_catalog_write_invalidates_cached_pages(app, client):
+    _enable_cache()
+    login(client)
+    before = search_cache.stats()
+    first = client.get('/user/search', query_string={'q': '红楼'}).get_data(as_text=True)
+    client.get('/user/search', query_string={'q': '红楼'})
+    # 图书ID列表与分面计数各一条
+    assert search_cache.stats()['hits'] == before['hits'] + 2
+    assert search_cache.stats()['size'] == 2
+    assert '红楼梦续集' not in first
+
+    version = catalog_version()
+    with app.app_context():
+        db.session.add(Book(isbn='TEST-0001', title='红楼梦续集', author='测试',
+                            category_id=Category.query.first().id))
+        db.session.commit()
+    assert catalog_version() == version + 1
+    assert search_cache.stats()['size'] == 0
+
+    response = client.get('/user/search', query_string={'q': '红楼'})
+    assert '红楼梦续集' in response.get_data(as_text=True)
+    assert search_cache.stats()['misses'] == before['misses'] + 4
+
+
+def test_disabled_cache_is_bypassed(client):
+    search_cache.configure(max_entries=0)
+    before = search_cache.stats()
+    login(client)
+    assert client.get('/user/search', query_string={'q': '红楼'}).status_code == 200
+    after = search_cache.stats()
+    assert (after['hits'], after['misses'], after['size']) == (before['hits'], before['misses'], 0)
+
+
+def test_cache_stats_require_admin(client):
+    login(client)
+    assert client.get('/admin/api/search_cache_stats').status_code == 403
+    login(client, is_admin=True)
+    assert client.get('/admin/api/search_cache_stats').status_code == 200
+
+
+def test_facets_are_cached_with_the_result(app):
+    _enable_cache()
+    with app.app_context():
+        facets = search_facets('红楼')
+        assert search_facets('红楼') is facets
+        db.session.add(Book(isbn='TEST-0002', title='红楼梦新解', author='测试',
+                            category_id=Category.query.first().id))
+        db.session.commit()
+        assert search_facets('红楼')['total'] == facets['total'] + 1